@@ -46,17 +46,31 @@ from lark import Lark, Transformer, v_args, tree
 from lark import exceptions
 from parse.larkTransformer import ReadTree, VarTypeCausality
 from parse.xmlParsing import retrieveVariables
+from parse.algParsing import ParsingScheduler
 from validate.validate_variables import validate_variables
-from validate.validate_functions import validate_function
+from validate.parallel_validation import validate_functions
 from validate.validate_manifest_references import validateReferences
+from validate.validate_manifest_files import validateListedFiles
 from data.AlgorithmCodeData import Function
 from data.Representations import Representation
-from validate.crossCheck_manifest_vars import crossCheck_manifest_vars
+from data.SymbolTable import SymbolTable, PUBLIC_SCOPE, PROTECTED_SCOPE
+from data.Symbols import clearSymbols
+from validate.crossCheck_manifest_vars import crossCheck_manifest_vars, joinRepresentations, CROSS_CHECKED_KINDS
 from colorama import init, Fore, Back, Style
 from lxml import etree as ET
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from data.Checksums import ChecksumService, DEFAULT_CACHE_DIR
+from data.ContainerIndex import ContainerIndex, DirectoryArchive, archivePath
+from data.ResourceLimits import ExtractionBudget, LimitExceeded, DEFAULT_LIMITS
+from data.ResultCache import ResultCache, ReportRecorder
+from data.DirectoryWatcher import DirectoryWatcher
+# The levels of the checks: the structure of the container and the checksums only, also the XML Schema validations
+# and the consistency of the manifest variables, also the checks of the GALEC code (all checks)
+STRUCTURE_CHECKS = 1
+SCHEMA_CHECKS = 2
+FULL_CHECKS = 3
+CHECK_LEVELS = {'structure': STRUCTURE_CHECKS, 'schemas': SCHEMA_CHECKS, 'full': FULL_CHECKS}
 
-BLOCKSIZE = 65536
 ALGORITH_CODE_SCHEMA = 'efmiAlgorithmCodeManifest.xsd'
 BEHAVIOR_MODEL_SCHEMA = 'efmiBehavioralModelManifest.xsd'
 EQUATION_CODE_SCHEMA = 'efmiEquationCodeManifest.xsd'
@@ -84,14 +98,178 @@ import logging
 logging.basicConfig(level=logging.DEBUG)
 def prRed(skk): print("\033[91m {}\033[00m" .format(skk))
 
-def sha_hash(fileName):
-    hasher = hashlib.sha1()
-    with open(fileName, 'rb') as afile:
-        buf = afile.read(BLOCKSIZE)
-        while len(buf) > 0:
-            hasher.update(buf)
-            buf = afile.read(BLOCKSIZE)
-    return hasher.hexdigest()
+def extractionPath(workingDir, memberName):
+
+    """
+    Returns the path where a member of the archive is extracted, the member name is normalized the same way as in
+    the index of the archive (see archivePath)
+
+    :param workingDir: The directory where the archive is extracted
+    :param memberName: The name of the member in the archive
+    :return: the path of the extracted member
+
+    """
+
+    import os
+    return os.path.join(workingDir, *archivePath(memberName).split('/'))
+
+def unpackedWorkingDir(dirname, efmuContentDir):
+
+    """
+    Returns the directory which contains the eFMU folder of an unpacked eFMU
+
+    :param dirname: The given directory, the eFMU folder itself or the directory which contains it
+    :param efmuContentDir: The name of the eFMU folder
+    :return: the absolute path of the directory which contains the eFMU folder
+
+    """
+
+    import os
+    dirname = os.path.abspath(dirname)
+    if os.path.basename(dirname) == efmuContentDir:
+        return os.path.dirname(dirname)
+    return dirname
+
+class FindingBudget:
+
+    """
+    Class FindingBudget collects the findings of the checks: each check adds the messages of the findings it reported
+    (see add), e.g. the problems returned by the validators of an alg file. The checks stop once maxFindings findings
+    were reported (see exhausted), e.g. with the --fail-fast option when only the compliance of an eFMU matters. The
+    messages are kept for the delta of the watch mode (see reportedFindings).
+
+    """
+
+    def __init__(self, maxFindings=None):
+        self.maxFindings = maxFindings
+        self.findings = 0
+        self.messages = []
+
+    def add(self, messages):
+        self.messages += [message.strip() for message in messages]
+        self.findings += len(messages)
+
+    def reportedFindings(self):
+        # a finding reported several times is listed once
+        return list(dict.fromkeys(self.messages))
+
+    def exhausted(self):
+        return self.maxFindings is not None and self.findings >= self.maxFindings
+
+    def remaining(self):
+        if self.maxFindings is None:
+            return None
+        return max(0, self.maxFindings - self.findings)
+
+def stop_check(budget, extractedDir=None):
+
+    """
+    Stops the check of an eFMU once its findings exhausted the budget
+
+    :param budget: The budget of findings (of type FindingBudget)
+    :param extractedDir: The extracted eFMU folder which is deleted, None if nothing was extracted
+    :return: 1, the eFMU did not pass the checks
+
+    """
+
+    print("The check was stopped after %d findings (the maximum number of findings)" % budget.findings)
+    print(Style.RESET_ALL)
+    if extractedDir is not None:
+        shutil.rmtree(extractedDir, ignore_errors=True)
+    return 1
+
+def representationFutures(rep, executor, level=FULL_CHECKS):
+
+    """
+    Submits the consistency checks of a representation which only depend on its own files
+
+    :param rep: The representation (of type Representation)
+    :param executor: The thread pool which runs the checks
+    :param level: The level of the checks, the manifest is only validated against its schema from SCHEMA_CHECKS on
+    :return: a dictionary of the futures of the checks (the listed files have one future per file)
+
+    """
+
+    futures = {'idMatches': executor.submit(rep.compareID_in_manifest),
+               'checksumMatches': executor.submit(rep.compareChecksum),
+               'listedFiles': validateListedFiles(rep, executor)}
+    if level >= SCHEMA_CHECKS:
+        futures['manifestValid'] = executor.submit(rep.validateManifest)
+    return futures
+
+
+def check_alg_file(algFile, result, modelVariablesData, jobs, cache=None, budget=None):
+
+    """
+    Checks an alg file: prints the parser errors, then validates the variables and the functions of the file. With a
+    cache, a function is only validated again if its text, its lines or the declarations of the block changed.
+
+    :param algFile: The name of the alg file
+    :param result: The read data of the file (of type AlgParseResult)
+    :param modelVariablesData: The variables listed in the AlgorithmCode manifest
+    :param jobs: The number of worker processes used to validate the functions
+    :param cache: The cache of the validation results of the functions (of type ResultCache), None if all functions
+                  are validated
+    :param budget: The budget of findings (of type FindingBudget), the functions are not validated any more once the
+                   errors of the file exhaust it; None for no limit. The findings of the file are not added to it.
+    :return: the messages of the findings of the file (the parser errors, with their header, and the problems of the
+             validators), empty if the file has no errors
+
+    """
+
+    findings = []
+    print("Parsing the %s file " % algFile)
+    if result.errors:
+        findings.append("The %s file cannot be parsed, the messages below contain the line numbers which do not comply with the required rules " % algFile)
+        findings += result.errors
+        for message in findings:
+            print('\033[91m' + "         " + message)
+        print(Style.RESET_ALL)
+    # the functions which were parsed correctly are validated, unless the declarations of the block cannot be parsed
+    if result.variables is None:
+        return findings
+
+    varList = result.variables
+    protectedVarList = result.protectedVariables
+
+    problems = []
+    funcList = result.functions
+    # the public and protected scopes are shared by all validators and all functions of the block
+    blockSymbols = SymbolTable(varList, None, PUBLIC_SCOPE).newScope(protectedVarList, PROTECTED_SCOPE)
+    problems += validate_variables(modelVariablesData, blockSymbols)
+
+    print ("\nfunctions\n")
+
+    # the errors of a function depend on its chunk (see chunkFingerprint) and on the declarations of the block
+    functionKeys = {}
+    known = {}
+    if cache is not None:
+        import hashlib
+        blockDigest = hashlib.sha256(repr((varList, protectedVarList)).encode('utf-8')).hexdigest()
+        for x in funcList.keys():
+            if x in result.fingerprints:
+                functionKeys[x] = cache.sectionKey('function', result.fingerprints[x], blockDigest)
+                functionProblems = cache.getSection(functionKeys[x])
+                if functionProblems is not None:
+                    known[x] = functionProblems
+
+    # the errors of the file are printed below, one finding per error
+    maxProblems = None
+    if budget is not None and budget.remaining() is not None:
+        maxProblems = max(0, budget.remaining() - len(findings) - len(problems))
+    functionProblems, perFunction = validate_functions(funcList, blockSymbols, jobs, known=known, maxProblems=maxProblems)
+    problems += functionProblems
+    for x in functionKeys.keys():
+        if x not in known and x in perFunction:
+            cache.putSection(functionKeys[x], perFunction[x])
+    if problems:
+        findings += problems
+        print ('\033[91m' + "Errors:")
+        for k in range(len(problems)):
+            print ('\033[91m' + problems[k])
+    print(Style.RESET_ALL)
+    return findings
+
 
 def findDoc(pathToDir, docName):
     for file in (pathToDir):
@@ -113,35 +291,205 @@ class LineNumberingParser(ET.XMLParser):
 #variables = {}
 
 
-def read_model_container(filename):
+def read_model_container(filename, jobs=1, limits=DEFAULT_LIMITS, useCache=True, level=FULL_CHECKS, maxFindings=None):
+
+    """
+    Checks the given eFMU archive or unpacked eFMU directory (see the module documentation)
+
+    :param filename: The name of the eFMU archive file, or of an unpacked eFMU directory
+    :param jobs: The number of worker processes used to parse the alg files and to validate the functions of the
+                 algorithm code
+    :param limits: The resource limits of the extraction and of the parsing of the alg files (of type ResourceLimits)
+    :param useCache: If True, the report of an archive which was already checked is printed from the result cache
+    :param level: The level of the checks (STRUCTURE_CHECKS, SCHEMA_CHECKS or FULL_CHECKS)
+    :param maxFindings: The check stops once this number of findings was printed, None for no limit
+    :return: 0 if the eFMU passed all checks, otherwise 1
+
+    """
+
+    import os
+    import sys
+
+    cache = None
+    key = None
+    if useCache:
+        cache = ResultCache(os.path.join(DEFAULT_CACHE_DIR, 'results.sqlite'))
+    # The report depends on the archive, the checker, the limits, the level, the maximum number of findings and the
+    # working directory (it is printed in the report), the number of jobs does not change it; the sections of an
+    # unpacked directory are cached, not its report
+    if cache is not None and os.path.isfile(filename):
+        key = cache.key(filename, tuple(limits), os.getcwd(), level, maxFindings)
+        cached = cache.get(key)
+        if cached is not None:
+            report, status = cached
+            sys.stdout.write(report)
+            cache.close()
+            return status
+
+    scheduler = ParsingScheduler(jobs, limits, cache)
+    checksums = ChecksumService()
+    try:
+        status, report, findings = record_model_container(filename, jobs, scheduler, checksums, limits, cache, True, level, maxFindings)
+    finally:
+        # the parsing of alg files which are not needed any more (e.g. after a failed check) is cancelled
+        scheduler.shutdown()
+
+    # a report with an exceeded parse limit depends on the load of the machine, it is not cached
+    if cache is not None:
+        if key is not None and len(scheduler.limitedPaths) == 0:
+            cache.put(key, report, status)
+        cache.close()
+    return status
+
+
+def record_model_container(filename, jobs, scheduler, checksums, limits, cache=None, echo=True, level=FULL_CHECKS, maxFindings=None):
+
+    """
+    Runs check_model_container and records the printed report
+
+    :param echo: If False, the report is only recorded, not printed
+    :param maxFindings: The check stops once this number of findings was printed, None for no limit
+    :return: (status, report, findings), the return code of check_model_container, the printed report and the
+             messages of its findings (see FindingBudget.reportedFindings)
+
+    """
+
+    import sys
+
+    recorder = ReportRecorder(sys.stdout, echo)
+    findingBudget = FindingBudget(maxFindings)
+    sys.stdout = recorder
+    try:
+        status = check_model_container(filename, jobs, scheduler, checksums, limits, cache, level, findingBudget)
+    finally:
+        sys.stdout = recorder.stream
+    return status, recorder.getReport(), findingBudget.reportedFindings()
+
+
+def watch_model_directory(dirname, jobs=1, limits=DEFAULT_LIMITS, useCache=True, level=FULL_CHECKS, maxFindings=None):
+
+    """
+    Checks an unpacked eFMU directory each time its files change, until the user interrupts it (Ctrl+C). The full
+    report is printed once, then each check prints the findings which are new and the findings which were resolved.
+
+    The parsing processes, the checksums and the result cache are kept between the checks, so only the
+    representations, alg files and functions which changed are checked again.
+
+    :param dirname: The unpacked eFMU directory, the eFMU folder itself or the directory which contains it
+    :param jobs: The number of worker processes (see read_model_container)
+    :param limits: The resource limits of the parsing of the alg files (of type ResourceLimits)
+    :param useCache: If True, the results of the unchanged parts are read from the result cache
+    :param level: The level of the checks (see read_model_container)
+    :param maxFindings: Each check stops once this number of findings was printed, None for no limit
+    :return: the return code of the last check, 0 if the eFMU passed all checks, otherwise 1
+
+    """
+
+    import os
+    import time
+
+    if not os.path.isdir(dirname):
+        print('\033[91m' + "         The given file is not a directory, only unpacked eFMUs can be watched")
+        print(Style.RESET_ALL)
+        return 1
+
+    cache = None
+    if useCache:
+        cache = ResultCache(os.path.join(DEFAULT_CACHE_DIR, 'results.sqlite'))
+    scheduler = ParsingScheduler(jobs, limits, cache)
+    checksums = ChecksumService()
+    watcher = DirectoryWatcher(unpackedWorkingDir(dirname, "eFMU"))
+    findings = None
+    status = 1
+    try:
+        while True:
+            started = time.monotonic()
+            scheduler.reset()
+            status, report, current = record_model_container(dirname, jobs, scheduler, checksums, limits, cache, findings is None, level, maxFindings)
+            if findings is not None:
+                print("Checked the eFMU again in %.2f seconds" % (time.monotonic() - started))
+                resolved = [finding for finding in findings if finding not in current]
+                new = [finding for finding in current if finding not in findings]
+                for finding in resolved:
+                    print('\033[92m' + "         Resolved: " + finding)
+                for finding in new:
+                    print('\033[91m' + "         New: " + finding)
+                if len(resolved) == 0 and len(new) == 0:
+                    print('\033[92m' + "         The findings did not change")
+                print(Style.RESET_ALL)
+            findings = current
+            print("The eFMU has %d findings, watching %s for changes (%s), press Ctrl+C to stop" %
+                  (len(findings), watcher.root, "inotify" if watcher.usesInotify() else "polling"))
+            changed = watcher.wait()
+            print("\nChanged: " + ", ".join(os.path.relpath(path, watcher.root) for path in changed[:10]) +
+                  (" and %d more" % (len(changed) - 10) if len(changed) > 10 else ""))
+    except KeyboardInterrupt:
+        print(Style.RESET_ALL)
+    finally:
+        watcher.close()
+        scheduler.shutdown()
+        if cache is not None:
+            cache.close()
+    return status
+
+
+def check_model_container(filename, jobs, scheduler, checksums, limits, cache=None, level=FULL_CHECKS, findingBudget=None):
+
+    """
+    Runs all checks of read_model_container
+
+    :param filename: The name of the eFMU archive file
+    :param jobs: The number of worker processes
+    :param scheduler: The scheduler which parses the alg files of the container (of type ParsingScheduler)
+    :param checksums: The service which computes the checksums of the extracted files (of type ChecksumService)
+    :param limits: The resource limits of the extraction (of type ResourceLimits)
+    :param cache: The cache of the results of the representations and of the alg files (of type ResultCache), None
+                  if all parts of the eFMU are checked
+    :param level: The level of the checks (STRUCTURE_CHECKS, SCHEMA_CHECKS or FULL_CHECKS)
+    :param findingBudget: The budget of findings (of type FindingBudget), the check stops once it is exhausted; None for
+                          no limit
+    :return: 0 if the eFMU passed all checks, otherwise 1
+
+    """
+
     import zipfile
     import os
+    import sys
+    import hashlib
     
     error = False
     modelRepresentations = []
+    if findingBudget is None:
+        findingBudget = FindingBudget()
+    # the element names of the manifests are only kept for one check
+    clearSymbols()
 
     #The provided fmu name which should have fmu extension
     fmuName = os.path.basename(filename)
     
+    # The name of the content directory of eFMUs is fixed to:
+    efmuContentDir = "eFMU"
+
     print("\nChecking if the given file exists and is an eFMU archive")
-    if os.path.isdir(filename):
-        print('\033[92m' + "         The given file is a directory")
-        return 1
-    if not os.path.isfile(filename):
+    unpacked = os.path.isdir(filename)
+    if unpacked:
+        print('\033[92m' + "         The given file is an unpacked eFMU directory")
+    elif not os.path.isfile(filename):
+        findingBudget.add(["The given file does not exist"])
         print('\033[91m' + "         The given file does not exist")
         return 1
-    if len(os.path.splitext(fmuName)) > 1 and os.path.splitext(fmuName)[1] != ".fmu":
+    elif len(os.path.splitext(fmuName)) > 1 and os.path.splitext(fmuName)[1] != ".fmu":
+        findingBudget.add(["The given file has not '.fmu' as file extension"])
         print('\033[91m' + "         The given file has not '.fmu' as file extension")
         print(Style.RESET_ALL)
         return 1
-    if not zipfile.is_zipfile(filename):
+    elif not zipfile.is_zipfile(filename):
+        findingBudget.add(["The given file is not a Zip archive"])
         print('\033[91m' + "         The given file is not a Zip archive")
         return 1
-    print('\033[92m' + "         The provided file is a valid 'fmu' archive")
+    else:
+        print('\033[92m' + "         The provided file is a valid 'fmu' archive")
     print(Style.RESET_ALL)
-    
-    # The name of the content directory of eFMUs is fixed to:
-    efmuContentDir = "eFMU"
 
     # The full path of the provided fmu archive
     workingDir = os.getcwd()
@@ -151,31 +499,70 @@ def read_model_container(filename):
     pathTo_algorithmCode_dir = ""
     pathTo_equationCode_dir = ""
 
-    # Unzip the fmu file, extracting will create a folder called eFMU
-    print("Extracting the fmu archive  " + fmuName)
-    def isDirInZip(zip, name):
-        return any(x.startswith("%s/" % name.rstrip("/")) for x in zip.namelist())
-    with zipfile.ZipFile(filename) as zip:
-        if isDirInZip(zip, efmuContentDir):
-            print('\033[92m' + "         The [" + efmuContentDir + "] folder is correctly contained in the fmu archive")
-            for file in zip.namelist():
-                    if file.startswith(efmuContentDir + "/"):
-                        zip.extract(file, path=workingDir)
+    # the extracted folder is deleted when the check stops early, an unpacked eFMU is kept
+    extractedDir = None if unpacked else os.path.join(os.getcwd(), efmuContentDir)
+
+    if unpacked:
+        # An unpacked eFMU is checked where it is, it is neither copied nor deleted
+        workingDir = unpackedWorkingDir(filename, efmuContentDir)
+        print("Reading the unpacked eFMU directory  " + os.path.join(workingDir, efmuContentDir))
+        containerIndex = ContainerIndex(DirectoryArchive(workingDir, efmuContentDir))
+        if containerIndex.isDir(efmuContentDir):
+            print('\033[92m' + "         The [" + efmuContentDir + "] folder is correctly contained in the given directory")
         else:
-            print('\033[91m' + "         The [" + efmuContentDir + "] folder does not exist in the provided fmu archive")
+            findingBudget.add(["The [" + efmuContentDir + "] folder does not exist in the given directory"])
+            print('\033[91m' + "         The [" + efmuContentDir + "] folder does not exist in the given directory")
             return 1
-        
-        if os.path.isdir(os.path.join(workingDir, efmuContentDir)):
-            print('\033[92m' + "         [" + efmuContentDir + "] folder extracted correctly")
-            print(Style.RESET_ALL)
-        else:
-            print('\033[91m' + "         Error during extracting the [" + efmuContentDir + "] folder")
+        if not containerIndex.isFile(efmuContentDir, "__content.xml"):
+            findingBudget.add(["The __content.xml file does not exist in the eFMU folder, this file is required"])
+            print('\033[91m' + "         The __content.xml file does not exist in the eFMU folder, this file is required")
             print(Style.RESET_ALL)
             return 1
+        print(Style.RESET_ALL)
+    else:
+        # Unzip the fmu file, extracting will create a folder called eFMU
+        print("Extracting the fmu archive  " + fmuName)
+        with zipfile.ZipFile(filename) as zip:
+            # The central directory of the archive is read once, the structure of the container is checked before any
+            # member is decompressed
+            containerIndex = ContainerIndex(zip)
+            if containerIndex.isDir(efmuContentDir):
+                print('\033[92m' + "         The [" + efmuContentDir + "] folder is correctly contained in the fmu archive")
+            else:
+                findingBudget.add(["The [" + efmuContentDir + "] folder does not exist in the provided fmu archive"])
+                print('\033[91m' + "         The [" + efmuContentDir + "] folder does not exist in the provided fmu archive")
+                return 1
+            if not containerIndex.isFile(efmuContentDir, "__content.xml"):
+                findingBudget.add(["The __content.xml file does not exist in the eFMU folder, this file is required"])
+                print('\033[91m' + "         The __content.xml file does not exist in the eFMU folder, this file is required")
+                print(Style.RESET_ALL)
+                return 1
+
+            # the members are hashed while they are extracted, so the checksums do not read the files again; the
+            # resource limits are checked while the members are decompressed, the sizes in the archive can be forged
+            budget = ExtractionBudget(limits)
+            try:
+                for info in containerIndex.members(efmuContentDir):
+                    checksums.extractMember(zip, info, extractionPath(workingDir, info.filename), budget)
+            except LimitExceeded as e:
+                findingBudget.add(["The fmu archive exceeds a resource limit: " + str(e)])
+                print('\033[91m' + "         The fmu archive exceeds a resource limit: " + str(e))
+                print(Style.RESET_ALL)
+                shutil.rmtree(os.path.join(workingDir, efmuContentDir), ignore_errors=True)
+                return 1
+
+            if os.path.isdir(os.path.join(workingDir, efmuContentDir)):
+                print('\033[92m' + "         [" + efmuContentDir + "] folder extracted correctly")
+                print(Style.RESET_ALL)
+            else:
+                findingBudget.add(["Error during extracting the [" + efmuContentDir + "] folder"])
+                print('\033[91m' + "         Error during extracting the [" + efmuContentDir + "] folder")
+                print(Style.RESET_ALL)
+                return 1
     
     print("Checking the eFMU container architecture")
 
-    pathTo_eFMU_dir = os.listdir(os.path.join(workingDir, efmuContentDir))
+    pathTo_eFMU_dir = containerIndex.listDir(efmuContentDir)
     contentFileExist = False
     manifestFileExist = False
     schemasFolderExist = False
@@ -208,6 +595,8 @@ def read_model_container(filename):
         root = tree.getroot()
         print('\033[92m' + "         __content.xml was parsed correctly")
         Representation.workingDir = workingDir
+        Representation.checksums = checksums
+        Representation.containerIndex = containerIndex
         Representation.efmuContent = efmuContentDir
         Representation.schemasFolderExist = schemasFolderExist
         if schemasFolderExist == True:
@@ -228,6 +617,7 @@ def read_model_container(filename):
             if repKind == "AlgorithmCode":
                 if algorithmCode_dirName != "":
                     error = True
+                    findingBudget.add(["The eFMU has several Algorithm Code containers"])
                     print('\033[91m' + "         The eFMU has several Algorithm Code containers")
                     print(Style.RESET_ALL)
                 algorithmCode_dirName = repName
@@ -250,6 +640,7 @@ def read_model_container(filename):
 
         print(Style.RESET_ALL)    
     else:
+        findingBudget.add(["The __content.xml file does not exist in the eFMU folder, this file is required"])
         print('\033[91m' + "         The __content.xml file does not exist in the eFMU folder, this file is required")
         print(Style.RESET_ALL)
         return 1
@@ -259,9 +650,10 @@ def read_model_container(filename):
             if file == algorithmCode_dirName:
                 #algorithmCodeFolderExist = True
                 #print("The AlgorithmCode entity was found in the __content.xml file")
-                pathTo_algorithmCode_dir = os.listdir(os.path.join(workingDir, efmuContentDir, algorithmCode_dirName))
+                pathTo_algorithmCode_dir = containerIndex.listDir(efmuContentDir, algorithmCode_dirName)
                 #print('\033[92m' + "         The AlgorithmCode folder exists in the", os.path.join(workingDir, efmuContentDir))           
     else:
+        findingBudget.add(["The AlgorithmCode folder does not exist, execution cannot be completed!"])
         print ('\033[91m' + "         The AlgorithmCode folder does not exist, execution cannot be completed!")
         print(Style.RESET_ALL)
         return 1
@@ -271,7 +663,7 @@ def read_model_container(filename):
             if file == equationCode_dirName:
                 #algorithmCodeFolderExist = True
                 #print("The AlgorithmCode entity was found in the __content.xml file")
-                pathTo_equationCode_dir = os.listdir(os.path.join(workingDir, efmuContentDir, equationCode_dirName))
+                pathTo_equationCode_dir = containerIndex.listDir(efmuContentDir, equationCode_dirName)
                 #print('\033[92m' + "         The AlgorithmCode folder exists in the", os.path.join(workingDir, efmuContentDir))
 
     # We read the content of the AlgorithmCode folder to find the manifest xml file
@@ -283,70 +675,127 @@ def read_model_container(filename):
                 manifestFileExist = True
         if manifestFileExist == False:
             error = True
+            findingBudget.add(["The Algorithm Code container's manifest is missing!"])
             print ('\033[91m' + "         The Algorithm Code container's manifest is missing!")
             print(Style.RESET_ALL)
     else:
+        findingBudget.add(["The AlgorithmCode folder does not exist, execution cannot be completed!"])
         print ('\033[91m' + "         The AlgorithmCode folder does not exist, execution cannot be completed!")
         print(Style.RESET_ALL)
         return 1
     
-    if pathTo_equationCode_dir != "":
-        #print("Reading the content of the AlgorithmCode folder")
-        for file in pathTo_equationCode_dir:
-            if file == eqCodeManifestFile:
-                #print('\033[92m' + "         %s was found in the AlgorithmCode folder" % manifestFileName)
-                eqManifestFileExist = True
-    
-    equationCodeVariablesData = {}
-    algorithmCodeVariablesData = {}
-    
-    if eqManifestFileExist == True and manifestFileExist == True:
-        with open(os.path.join(workingDir, efmuContentDir, equationCode_dirName, eqCodeManifestFile), mode="rU", encoding='utf-8-sig') as eq_FILE:
-            eq_xml_file_lines = eq_FILE.readlines()
-        
-        eq_manifestTree = ET.fromstringlist(eq_xml_file_lines, parser=LineNumberingParser())
-
-        equationCodeModelVariables = eq_manifestTree.findall('Variables')
-
-        retrieveVariables(equationCodeVariablesData, equationCodeModelVariables[0], "", False)
-
-        with open(os.path.join(workingDir, efmuContentDir, algorithmCode_dirName, manifestFileName), mode="rU", encoding='utf-8-sig') as FILE:
-            xml_file_lines = FILE.readlines()
-        
-        manifestTree = ET.fromstringlist(xml_file_lines, parser=LineNumberingParser())
-
-        modelVariables = manifestTree.findall('Variables')
-
-        retrieveVariables(algorithmCodeVariablesData, modelVariables[0], 'RealVariable', False)
-                
-        retrieveVariables(algorithmCodeVariablesData, modelVariables[0], 'BooleanVariable', False)
-       
-        retrieveVariables(algorithmCodeVariablesData, modelVariables[0], 'IntegerVariable', False)
-
-    # Running the consistency checks
-    ManifestRefs_validate = validateReferences (modelRepresentations)
+    if findingBudget.exhausted():
+        return stop_check(findingBudget, extractedDir)
+
+    # The variables of all representations which list interface variables in their manifests are read for the
+    # cross check of the representations
+    representationsVars = []
+    crossCheckedReps = [rep for rep in modelRepresentations if rep.getKind() in CROSS_CHECKED_KINDS and rep.repManifestFound == True and level >= SCHEMA_CHECKS]
+    for rep in crossCheckedReps:
+        with open(os.path.join(workingDir, efmuContentDir, rep.getName(), rep.getManifest()), mode="r", encoding='utf-8-sig') as rep_FILE:
+            rep_xml_file_lines = rep_FILE.readlines()
+
+        rep_manifestTree = ET.fromstringlist(rep_xml_file_lines, parser=LineNumberingParser())
+
+        repModelVariables = rep_manifestTree.findall('Variables')
+        if len(repModelVariables) == 0:
+            continue
+
+        repVariablesData = {}
+        for elementType in ["", 'RealVariable', 'BooleanVariable', 'IntegerVariable']:
+            retrieveVariables(repVariablesData, repModelVariables[0], elementType, False)
+
+        repLabel = rep.getKind()
+        if len([x for x in crossCheckedReps if x.getKind() == rep.getKind()]) > 1:
+            repLabel = "%s (%s)" % (rep.getKind(), rep.getName())
+        representationsVars.append((repLabel, repVariablesData))
+
+    # The alg files listed in the manifest are parsed in worker processes while the checks below are running
+    algKeys = {}
+    algSections = {}
+    if manifestFileExist == True and level >= FULL_CHECKS:
+        algPaths = []
+        manifestVariables = None
+        try:
+            algManifestTree = ET.parse(os.path.join(workingDir, efmuContentDir, algorithmCode_dirName, manifestFileName))
+            for files in algManifestTree.findall('Files'):
+                for file in files.findall('File'):
+                    if os.path.splitext(file.get('name', ''))[1] == '.alg' and file.get('role') == 'Code' and file.get('name') in pathTo_algorithmCode_dir:
+                        algPaths.append(os.path.join(workingDir, efmuContentDir, algorithmCode_dirName, file.get('name')))
+            if len(algManifestTree.findall('Variables')) > 0:
+                manifestVariables = ET.tostring(algManifestTree.findall('Variables')[0], method='c14n')
+        except ET.XMLSyntaxError:
+            pass
+        # the checks of an alg file depend on the file and on the variables of the manifest (not on the rest of the
+        # manifest, e.g. the checksums of other representations), the alg files whose checks are cached are not parsed
+        if cache is not None and manifestVariables is not None:
+            variablesDigest = hashlib.sha256(manifestVariables).hexdigest()
+            for algPath in algPaths:
+                algKeys[algPath] = cache.sectionKey('alg', checksums.digest(algPath), variablesDigest)
+                algSections[algPath] = cache.getSection(algKeys[algPath])
+        scheduler.submit([algPath for algPath in algPaths if algSections.get(algPath) is None])
+
+    # Running the consistency checks, the checksums, the files listed in the manifests and the schema validations of
+    # all representations are checked on threads at the same time (hashlib and lxml release the GIL). The results of
+    # the representations whose files did not change are read from the cache; the manifest references involve other
+    # representations, they are always checked.
+    repKeys = [None] * len(modelRepresentations)
+    repResults = [None] * len(modelRepresentations)
+    if cache is not None:
+        repKeys = [cache.sectionKey('representation', rep.fingerprint(), level >= SCHEMA_CHECKS) for rep in modelRepresentations]
+        repResults = [cache.getSection(key) for key in repKeys]
+    checksExecutor = ThreadPoolExecutor()
+    ManifestRefs_future = checksExecutor.submit(validateReferences, modelRepresentations)
+    repFutures = [representationFutures(rep, checksExecutor, level) if repResults[i] is None else None for i, rep in enumerate(modelRepresentations)]
+    checksExecutor.shutdown(wait=False)
+    ManifestRefs_validate = ManifestRefs_future.result()
     print("Running the consistency check for all model representations in the __content.xml file")
-    for rep in modelRepresentations:
+    for i in range(len(modelRepresentations)):
+        rep = modelRepresentations[i]
         print("   - The %s model representation" % rep.getKind())
+
+        if repResults[i] is None:
+            repResults[i] = {key: future.result() for key, future in repFutures[i].items() if key != 'listedFiles'}
+            repResults[i]['listedFiles'] = [future.result() for future in repFutures[i]['listedFiles']]
+            if cache is not None:
+                cache.putSection(repKeys[i], repResults[i])
+        repResult = repResults[i]
         
-        if rep.compareID_in_manifest() == True:
+        if repResult['idMatches'] == True:
             print('\033[92m' + "         The representation id matches the id in the manifest")
         else:
             error = True
+            findingBudget.add(["The %s representation id does not match the id in the manifest" % rep.getKind()])
             print('\033[91m' + "         The representation id does not match the id in the manifest")
         
-        if rep.compareChecksum() == True:
+        if repResult['checksumMatches'] == True:
             print('\033[92m' + "         The representation checksum matches the calculated checksum of the manifest")
         else:
             error = True
+            findingBudget.add(["The %s representation checksum does not match the calculated checksum of the manifest" % rep.getKind()])
             print('\033[91m' + "         The representation checksum does not match the calculated checksum of the manifest")
         
-        if rep.validateManifest() == True:
+        if 'manifestValid' not in repResult:
+            pass
+        elif repResult['manifestValid'] == True:
             print('\033[92m' + "         The %s manifest file was correctly validated against the relevant schema file" % rep.getManifest())
         else:
             error = True
+            findingBudget.add(["The %s manifest file can not be validated against the relevant schema file" % rep.getManifest()])
             print('\033[91m' + "         The %s manifest file can not be validated against the relevant schema file" % rep.getManifest())
         
+        listedFilesMsgs = repResult['listedFiles']
+        if len(listedFilesMsgs) == 0:
+            print('\033[92m' + "         The %s manifest file does not list any files" % rep.getManifest())
+        elif all(msg is None for msg in listedFilesMsgs):
+            print('\033[92m' + "         All %d files listed in the %s manifest file exist and match their checksums" % (len(listedFilesMsgs), rep.getManifest()))
+        else:
+            error = True
+            findingBudget.add([msg for msg in listedFilesMsgs if msg is not None])
+            for msg in listedFilesMsgs:
+                if msg is not None:
+                    print('\033[91m' + "         " + msg)
+        
         if len(rep.getManifestReferences()) == 0:
             print('\033[92m' + "         The %s manifest file does not contain any manifest references" % rep.getManifest())
         elif rep.getName() not in ManifestRefs_validate.keys():
@@ -354,37 +803,36 @@ def read_model_container(filename):
         else:
             error = True
             errorMessages = ManifestRefs_validate[rep.getName()]
+            findingBudget.add(list(errorMessages.values()))
             for key in errorMessages.keys():
                 s = errorMessages[key]
                 print('\033[91m' + "         " + s)
     
         print(Style.RESET_ALL)
+        if findingBudget.exhausted():
+            return stop_check(findingBudget, extractedDir)
     
-    print("Other consistency checks")
-    eqRep = ""
-    algRep = ""
-    for rep in modelRepresentations:
-        if rep.getName() == equationCode_dirName:
-            eqRep = rep.getKind()
-        elif rep.getName() == algorithmCode_dirName:
-            algRep = rep.getKind()
-    
-    varsCrossCheckMsgs = {}
-    crossCheck_manifest_vars(algorithmCodeVariablesData, equationCodeVariablesData, algRep, eqRep, varsCrossCheckMsgs)
-    crossCheck_manifest_vars(equationCodeVariablesData, algorithmCodeVariablesData, eqRep, algRep, varsCrossCheckMsgs)
-
-    if not varsCrossCheckMsgs:
-        print('\033[92m' + "         All variables in the %s manifest are consistent with the variables in the %s manifest" % (algRep, eqRep))
-    else:
-        error = True
-        for key in varsCrossCheckMsgs.keys():
-            for key1 in varsCrossCheckMsgs[key].keys():
-                print('\033[91m' + "         " + varsCrossCheckMsgs[key][key1])
-    print(Style.RESET_ALL)
+    if level >= SCHEMA_CHECKS:
+        print("Other consistency checks")
+        varsCrossCheckMsgs = crossCheck_manifest_vars(representationsVars)
+
+        if len(representationsVars) == 0:
+            print('\033[92m' + "         None of the manifests lists any variables")
+        elif not varsCrossCheckMsgs:
+            print('\033[92m' + "         All variables in the %s are consistent" % joinRepresentations([rep for rep, variables in representationsVars]))
+        else:
+            error = True
+            findingBudget.add([message for messages in varsCrossCheckMsgs.values() for message in messages.values()])
+            for key in varsCrossCheckMsgs.keys():
+                for key1 in varsCrossCheckMsgs[key].keys():
+                    print('\033[91m' + "         " + varsCrossCheckMsgs[key][key1])
+        print(Style.RESET_ALL)
+        if findingBudget.exhausted():
+            return stop_check(findingBudget, extractedDir)
     
     # Trying to locate the efmiContainerManifest.xsd file in the schemas folder
     if schemasFolderExist == True:
-        patheTo_schemas_folder = os.listdir(os.path.join(workingDir, efmuContentDir, schemasFolder))
+        patheTo_schemas_folder = containerIndex.listDir(efmuContentDir, schemasFolder)
         for file in patheTo_schemas_folder:
             if file == 'efmiContainerManifest.xsd':
                 #print('\033[92m' + "         The efmiContainerManifest.xsd was found in the ", os.path.join(workingDir, efmuContentDir, schemasFolder))
@@ -400,7 +848,10 @@ def read_model_container(filename):
         print(Style.RESET_ALL)
         return 1
     
-    if containerManifestExist == True:
+    if containerManifestExist == True and level < SCHEMA_CHECKS:
+        # the schema files must exist at all levels, they are only used from SCHEMA_CHECKS on
+        pass
+    elif containerManifestExist == True:
         print("Validating the __content.xml file against the efmiContainerManifest.xsd schema file")
         efmiContainerSchema = ET.XMLSchema(file=os.path.join(workingDir, efmuContentDir, schemasFolder, efmuContainerManifest))
         xmlContainerValidator = efmiContainerSchema.validate(root)
@@ -408,17 +859,19 @@ def read_model_container(filename):
             print('\033[92m' + "         The __content.xml file was validated correctly against the efmiContainerManifest.xsd schema file")
             print(Style.RESET_ALL)
         else:
+            findingBudget.add(["The __content.xml file was not validated correctly against the efmiContainerManifest.xsd schema file"])
             print('\033[91m' + "         The __content.xml file was not validated correctly against the efmiContainerManifest.xsd schema file")
             print(Style.RESET_ALL)
             return 1
     else:
+        findingBudget.add(["Missing efmiContainerManifest.xsd XML Scheme file"])
         print('\033[91m' + "         Missing efmiContainerManifest.xsd XML Scheme file")
         print(Style.RESET_ALL)
         return 1
     
     modelVariablesData = {}
     # We parse the manifest.xml if it exists
-    if manifestFileExist == True:
+    if manifestFileExist == True and level >= FULL_CHECKS:
         #print("Parsing the %s file" % manifestFileName)
 
         with open(os.path.join(workingDir, efmuContentDir, algorithmCode_dirName, manifestFileName), mode="rU", encoding='utf-8-sig') as FILE:
@@ -430,7 +883,7 @@ def read_model_container(filename):
 
         # search for efmiAlgorithmCodeManifest.xsd in the algorithmCode folder which is located in the schemas folder
         if algorithmCodeSchemasExist == True:
-            path_to_algorithmCode_in_schemas = os.listdir(os.path.join(workingDir, efmuContentDir, schemasFolder, algorithmCode_in_schemas))
+            path_to_algorithmCode_in_schemas = containerIndex.listDir(efmuContentDir, schemasFolder, algorithmCode_in_schemas)
             for file in path_to_algorithmCode_in_schemas:
                 if file == 'efmiAlgorithmCodeManifest.xsd':
                     algorithmCodeManifestSchemaExist = True
@@ -442,10 +895,12 @@ def read_model_container(filename):
                 #if xmlManifestValidator == True:
                     #print('\033[92m' + "         The %s file was validated correctly against the %s schema file" % (manifestFileName, algorithmCode_manifest_schema))
             else:
+                findingBudget.add(["Missing efmiAlgorithmCodeManifest.xsd XML Scheme file"])
                 print('\033[91m' + "         Missing efmiAlgorithmCodeManifest.xsd XML Scheme file")
                 print(Style.RESET_ALL)
                 return 1
         else:
+            findingBudget.add(["Missing AlgorithmCode XML Scheme files directory"])
             print('\033[91m' + "         Missing AlgorithmCode XML Scheme files directory")
             print(Style.RESET_ALL)
             return 1
@@ -457,6 +912,7 @@ def read_model_container(filename):
         modelVariables = manifestTree.findall('Variables')
 
         if (len(modelVariables) == 0):
+            findingBudget.add(["The %s manifest file does not contain any listed variables, cannot run any further checks" % manifestFileName])
             print('\033[91m' + "         The %s manifest file does not contain any listed variables, cannot run any further checks" % manifestFileName)
             return 1
 
@@ -477,7 +933,8 @@ def read_model_container(filename):
         print("Reading all 'alg' files from the %s file and checking if these files exist in the AlgorithmCode folder" % manifestFileName)
         
         files = manifestTree.findall('Files')
-        
+
+        algFiles = []
         for file in files[0].findall('File'):
             algorithmFileExist = False
             if os.path.splitext(file.get('name'))[1] == '.alg' and file.get('role') == 'Code':
@@ -488,46 +945,53 @@ def read_model_container(filename):
                 if algorithmFileExist == True:
                     print('\033[92m' + "         " + file.get('name'), "exists in the", os.path.join(workingDir, efmuContentDir, algorithmCode_dirName), "directory")
                     print(Style.RESET_ALL)
-                    with open(os.path.join(workingDir, efmuContentDir, algorithmCode_dirName, file.get('name')), 'r') as f:
-                        s = f.read()
-                        algorithmCode_parser = Lark(grammar, start='start', lexer="dynamic_complete", propagate_positions=True)
-                        try:
-                            
-                            print("Parsing the %s file " % file.get('name'))
-                            tree = algorithmCode_parser.parse(s)
-                            tree = ReadTree().transform(tree)
-                            varList = ReadTree.variables()
-
-                            protectedVarList = ReadTree.protectedVariables()
-                   
-                            problems = []
-                            #allLocalVarList = {}
-                            funcList = ReadTree.getFunctions()
-                            #for x in funcList.keys():
-                                #allLocalVarList = {**allLocalVarList, **funcList[x].getLocalVariables()}
-                            problems += validate_variables(modelVariablesData, varList, protectedVarList)
-                    
-                            print ("\nfunctions\n")
-                        
-                            for x in funcList.keys():
-                                localVarList = funcList[x].getLocalVariables()
-                                problems += validate_function(funcList[x], {**varList, **localVarList, **protectedVarList} )
-                            if problems:
-                                error = True
-                                print ('\033[91m' + "Errors:")
-                                for k in range(len(problems)):
-                                    print ('\033[91m' + problems[k]) 
-                            print(Style.RESET_ALL)
-                        except exceptions.UnexpectedCharacters as e:
-                            error = True
-                            print('\033[91m' + "         The %s file cannot be parsed, the message below contains the line number which does not comply with the required rules " % file.get('name'))
-                            print('\033[91m' + "         " + str(e))
+                    algFiles.append(file.get('name'))
                 else:
                     error = True
+                    findingBudget.add(["%s does not exist in the %s directory" % (file.get('name'), os.path.join(workingDir, efmuContentDir, algorithmCode_dirName))])
                     print (file.get('name'), "does not exist in the", os.path.join(workingDir, efmuContentDir, algorithmCode_dirName), "directory")
 
+        # the checks start once the results of all alg files are in
+        algResults = {}
+        for algFile in algFiles:
+            algPath = os.path.join(workingDir, efmuContentDir, algorithmCode_dirName, algFile)
+            if algSections.get(algPath) is None:
+                algResults[algFile] = scheduler.result(algPath)
+
+        # the report of an alg file is recorded, the cached report of an unchanged alg file is printed again
+        for algFile in algFiles:
+            if findingBudget.exhausted():
+                return stop_check(findingBudget, extractedDir)
+            algPath = os.path.join(workingDir, efmuContentDir, algorithmCode_dirName, algFile)
+            algSection = algSections.get(algPath)
+            remaining = findingBudget.remaining()
+            if algSection is not None and remaining is not None and len(algSection['findings']) > remaining:
+                # the cached report would exceed the budget, the file is checked again to stop at the budget
+                algSection = None
+                algResults[algFile] = scheduler.result(algPath)
+            if algSection is None:
+                recorder = ReportRecorder(sys.stdout)
+                sys.stdout = recorder
+                try:
+                    algFindings = check_alg_file(algFile, algResults[algFile], modelVariablesData, jobs, cache, findingBudget)
+                finally:
+                    sys.stdout = recorder.stream
+                algSection = {'report': recorder.getReport(), 'findings': algFindings}
+                findingBudget.add(algFindings)
+                # the report of a file whose validation was stopped by the budget is incomplete, it is not cached
+                if cache is not None and algPath in algKeys and algPath not in scheduler.limitedPaths and not findingBudget.exhausted():
+                    cache.putSection(algKeys[algPath], algSection)
+            else:
+                sys.stdout.write(algSection['report'])
+                findingBudget.add(algSection['findings'])
+            if len(algSection['findings']) > 0:
+                error = True
+        if findingBudget.exhausted():
+            return stop_check(findingBudget, extractedDir)
+
     # deleting the unzipped eFMU
-    shutil.rmtree(os.path.join(workingDir, efmuContentDir))
+    if not unpacked:
+        shutil.rmtree(os.path.join(workingDir, efmuContentDir))
     
     if error == True:
         return 1
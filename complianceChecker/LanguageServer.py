@@ -0,0 +1,709 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+"""
+The ``LanguageServer`` module
+======================
+
+A language server (Language Server Protocol over stdio) for the GALEC code (alg) files of eFMUs. Editors start it
+with:
+
+    python LanguageServer.py [--jobs N] [--no-cache]
+
+- The diagnostics of an alg file are the messages of the checker: the parser errors, the variables of the block
+  checked against the variables of the AlgorithmCode manifest which lists the file (validate_variables), and the
+  checks of the functions (validate_function). They are published after each edit.
+- Go to definition finds the declaration of a variable in the function, in the block or in the manifest.
+
+The analysis is incremental (see AlgAnalysis): after an edit only the chunks (the block and the functions, see
+splitChunks) whose text changed are parsed and validated again.
+
+"""
+
+import os
+import re
+import sys
+import json
+import queue
+import bisect
+import hashlib
+import threading
+import multiprocessing
+import pathlib
+from urllib.parse import urlparse, unquote
+from lark import Token
+from lxml import etree as ET
+from parse.algParsing import functionSpans, parseChunk, parseText, readChunkTree, treeKey, getParser, blockDimensions, needsBlock, \
+    packTree
+from parse.xmlParsing import retrieveVariables
+from data.Symbols import symbol
+from data.SymbolTable import SymbolTable, PUBLIC_SCOPE, PROTECTED_SCOPE, LOCAL_SCOPE
+from data.Checksums import DEFAULT_CACHE_DIR
+from data.ResultCache import ResultCache, unpackObject
+from validate.validate_variables import validate_variables
+from validate.validate_functions import validate_function
+
+# The time in seconds without further messages after which the edited documents are analysed
+DEBOUNCE_TIME = 0.15
+# The line numbers of the messages of the checker ("line 12", "line 3 col 5")
+MESSAGE_LINE = re.compile(r'\bline (\d+)(?: col (\d+))?')
+# The characters of a variable name, quoted names ('a b') are matched as a whole
+NAME = re.compile(r"'(?:[^'\\]|\\.)*'|[A-Za-z_]\w*")
+
+# The number of lines after the line of a declaration in which the declared name is looked up
+DECLARATION_SEARCH_LINES = 10
+
+# JSON-RPC error codes and LSP constants
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+SEVERITY_ERROR = 1
+SYNC_INCREMENTAL = 2
+
+
+def uriToPath(uri):
+    parsed = urlparse(uri)
+    path = unquote(parsed.path)
+    # file:///C:/x on Windows
+    if re.match(r'^/[A-Za-z]:', path):
+        path = path[1:]
+    return os.path.normpath(path)
+
+
+def pathToUri(path):
+    return pathlib.Path(os.path.abspath(path)).as_uri()
+
+
+def mapMessage(message, mapLine):
+    return MESSAGE_LINE.sub(lambda m: m.group(0).replace(m.group(1), str(mapLine(int(m.group(1)))), 1), message)
+
+
+def shiftMessage(message, offset):
+    # the messages of a chunk contain the lines of the file, a chunk which moved gets the lines of its new position
+    if offset == 0:
+        return message
+    return mapMessage(message, lambda line: line + offset)
+
+
+def compactBlock(text, spans):
+
+    """
+    Returns the block of an alg file without its functions. Unlike the block chunk of splitChunks, the functions are
+    not replaced by their line breaks but by one line break, so the text of the block does not change when the number
+    of lines of a function changes, and the block is not parsed again.
+
+    :param text: The text of the alg file
+    :param spans: The positions of the functions in the text (see functionSpans)
+    :return: the text of the block, and the line map: the list of the first lines of the parts of the block in the
+             text of the block, and the list of the numbers of lines to add to the lines of each part
+
+    """
+
+    parts = []
+    starts = []
+    shifts = []
+    pos = 0
+    line = 1
+    textLine = 1
+    for (start, stop) in spans + [(len(text), len(text))]:
+        part = text[pos:start]
+        starts.append(line)
+        shifts.append(textLine - line)
+        parts.append(part)
+        line += part.count('\n') + 1
+        textLine += text.count('\n', pos, stop)
+        pos = stop
+    return '\n'.join(parts), (starts, shifts)
+
+
+def lineMapper(lineMap):
+    starts, shifts = lineMap
+    return lambda line: line + shifts[bisect.bisect_right(starts, line) - 1]
+
+
+def mapTreeLines(tree, lineMap):
+    # the lines of the parse tree of the compact block are mapped to the lines of the file
+    mapLine = lineMapper(lineMap)
+    for subtree in tree.iter_subtrees():
+        meta = subtree.meta
+        if getattr(meta, 'line', None) is not None:
+            meta.line = mapLine(meta.line)
+            meta.end_line = mapLine(meta.end_line)
+        for child in subtree.children:
+            if isinstance(child, Token) and child.line is not None:
+                child.line = mapLine(child.line)
+                if child.end_line is not None:
+                    child.end_line = mapLine(child.end_line)
+
+
+class ManifestIndex:
+
+    """
+    Class ManifestIndex finds the AlgorithmCode manifest which lists an alg file (a manifest XML file in the folder of
+    the alg file) and reads its variables. The manifests are read again only when they changed.
+
+    """
+
+    def __init__(self):
+        self.manifests = {}
+
+    def read(self, path):
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        known = self.manifests.get(path)
+        if known is not None and known[0] == stamp:
+            return known[1], known[2]
+        files = set()
+        variables = None
+        try:
+            tree = ET.parse(path)
+            for file in tree.findall('Files/File'):
+                if file.get('role') == 'Code':
+                    files.add(file.get('name'))
+            modelVariables = tree.findall('Variables')
+            if len(modelVariables) > 0:
+                variables = {}
+                for elementType in ['RealVariable', 'BooleanVariable', 'IntegerVariable']:
+                    retrieveVariables(variables, modelVariables[0], elementType)
+        except (ET.XMLSyntaxError, ValueError):
+            pass
+        self.manifests[path] = (stamp, files, variables)
+        return files, variables
+
+    def find(self, algPath):
+
+        """
+        Finds the manifest of an alg file
+
+        :param algPath: The path of the alg file
+        :return: (path of the manifest, variables of the manifest), (None, None) if no manifest lists the file
+
+        """
+
+        folder = os.path.dirname(algPath)
+        try:
+            names = sorted(os.listdir(folder))
+        except OSError:
+            return None, None
+        for name in names:
+            path = os.path.join(folder, name)
+            if os.path.splitext(name)[1] == '.xml' and os.path.isfile(path):
+                files, variables = self.read(path)
+                if os.path.basename(algPath) in files and variables is not None:
+                    return path, variables
+        return None, None
+
+
+class AlgAnalysis:
+
+    """
+    Class AlgAnalysis analyses the text of an alg file incrementally. The file is split into chunks (the block and
+    each function, see splitChunks) and the results of a chunk are kept by the digest of its text:
+
+    - The read data of a chunk is kept with the line offset it was read at. A function which only moved (e.g. lines
+      were inserted above it) is neither parsed nor read again, its lines are shifted. A function which queries the
+      size of arrays of the block is read again with their dimensions, this read data is kept by the digest of its text
+      and of these dimensions.
+    - The messages of the validation of a function are kept by the digest of its text and of the declarations of the
+      block, a moved function gets its messages with shifted lines.
+    - The parse trees are also kept in the result cache of the checker (see ResultCache), so the chunks already
+      parsed by the checker or by an earlier session are only read.
+
+    Only the results of the chunks of the current text are kept after an analysis.
+
+    """
+
+    def __init__(self, cache=None, pool=None):
+        self.cache = cache
+        self.pool = pool
+        self.chunks = {}
+        self.sizedChunks = {}
+        self.problems = {}
+        self.blockTree = (None, None)
+        self.block = None
+        self.functions = []
+
+    @staticmethod
+    def textKey(chunk):
+        return treeKey(chunk)[1:]
+
+    def readChunks(self, chunks):
+        missing = []
+        for chunk in chunks:
+            key = self.textKey(chunk)
+            if key in self.chunks:
+                continue
+            tree = None
+            if self.cache is not None:
+                tree = self.cache.getObject(self.cache.sectionKey(*treeKey(chunk)))
+            if tree is not None:
+                self.chunks[key] = (chunk[2], readChunkTree(tree, chunk))
+            else:
+                missing.append(chunk)
+        if len(missing) == 0:
+            return
+        if self.pool is not None and len(missing) > 1:
+            parsed = self.pool.map(parseChunk, missing)
+        else:
+            parsed = [parseChunk(chunk) for chunk in missing]
+        packed = []
+        for chunk, (result, packedTree) in zip(missing, parsed):
+            self.chunks[self.textKey(chunk)] = (chunk[2], result)
+            if packedTree is not None and self.cache is not None:
+                packed.append((self.cache.sectionKey(*treeKey(chunk)), packedTree))
+        if self.cache is not None:
+            self.cache.putPacked(packed)
+
+    def readSized(self, chunk, dimensions):
+        # the read data of a function which queries the size of arrays of the block (see readChunks)
+        textKey = self.textKey(chunk)
+        offset, result = self.chunks[textKey]
+        if not needsBlock(result, dimensions):
+            return textKey, offset, result
+        key = (textKey, tuple(sorted((name, dimensions[name]) for name in result.queries if name in dimensions)))
+        if key not in self.sizedChunks:
+            tree = None
+            if self.cache is not None:
+                tree = self.cache.getObject(self.cache.sectionKey(*treeKey(chunk)))
+            if tree is None:
+                tree, errors = parseText(chunk)
+            self.sizedChunks[key] = (chunk[2], result if tree is None else readChunkTree(tree, chunk, dimensions))
+        return key, self.sizedChunks[key][0], self.sizedChunks[key][1]
+
+    def readBlock(self, text, spans):
+        # the parse tree of the block is kept, it is read again for each analysis since its lines can change
+        blockText, lineMap = compactBlock(text, spans)
+        chunk = (blockText, 'start', 0)
+        key = self.textKey(chunk)
+        if self.blockTree[0] != key:
+            tree = None
+            if self.cache is not None:
+                tree = self.cache.getObject(self.cache.sectionKey(*treeKey(chunk)))
+            if tree is not None:
+                self.blockTree = (key, packTree(tree))
+            else:
+                result, packedTree = parseChunk(chunk)
+                self.blockTree = (key, packedTree if packedTree is not None else result)
+                if packedTree is not None and self.cache is not None:
+                    self.cache.putPacked([(self.cache.sectionKey(*treeKey(chunk)), packedTree)])
+        if not isinstance(self.blockTree[1], bytes):
+            result = self.blockTree[1]
+            return result._replace(errors=[mapMessage(message, lineMapper(lineMap)) for message in result.errors])
+        tree = unpackObject(self.blockTree[1])
+        mapTreeLines(tree, lineMap)
+        return readChunkTree(tree, chunk)
+
+    def analyse(self, text, manifestVariables=None):
+
+        """
+        Analyses the text of an alg file
+
+        :param text: The text of the alg file
+        :param manifestVariables: The variables of the AlgorithmCode manifest (see retrieveVariables), None if the
+                                  file is not listed in a manifest
+        :return: the list of the messages of the checker, with the lines of the file
+
+        """
+
+        spans = functionSpans(text)
+        chunks = []
+        pos = 0
+        line = 0
+        for (start, stop) in spans:
+            line += text.count('\n', pos, start)
+            chunks.append((text[start:stop], 'function_declaration', line))
+            pos = start
+        self.readChunks(chunks)
+        block = self.readBlock(text, spans)
+        messages = list(block.errors)
+        self.block = block
+        self.functions = []
+
+        blockSymbols = None
+        blockDigest = None
+        if block.variables is not None:
+            blockSymbols = SymbolTable(block.variables, None, PUBLIC_SCOPE).newScope(block.protectedVariables, PROTECTED_SCOPE)
+            # the checks of the functions do not depend on the lines of the declarations
+            declarations = [sorted((name, declared.type, declared.causality, tuple(declared.dimensions), declared.min, declared.max)
+                                   for name, declared in variables.items())
+                            for variables in (block.variables, block.protectedVariables)]
+            blockDigest = hashlib.sha256(repr(declarations).encode('utf-8')).hexdigest()
+            if manifestVariables is not None:
+                messages += [message.strip() for message in validate_variables(manifestVariables, blockSymbols)]
+
+        problems = {}
+        sized = {}
+        dimensions = blockDimensions(block)
+        for chunk in chunks:
+            textKey, offset, result = self.readSized(chunk, dimensions)
+            if textKey in self.sizedChunks:
+                sized[textKey] = self.sizedChunks[textKey]
+            shift = chunk[2] - offset
+            self.functions.append((chunk, shift, result))
+            messages += [shiftMessage(message, shift) for message in result.errors]
+            if blockSymbols is None:
+                continue
+            problemKey = (textKey, blockDigest)
+            known = self.problems.get(problemKey)
+            if known is None:
+                functionProblems = []
+                for function in result.functions.values():
+                    functionProblems += validate_function(function, blockSymbols.newScope(function.getLocalVariables(), LOCAL_SCOPE))
+                known = (offset, functionProblems)
+            problems[problemKey] = known
+            messages += [shiftMessage(message.strip(), chunk[2] - known[0]) for message in known[1]]
+
+        self.problems = problems
+        self.sizedChunks = sized
+        current = set(self.textKey(chunk) for chunk in chunks)
+        self.chunks = {key: value for key, value in self.chunks.items() if key in current}
+        return messages
+
+    def declaration(self, name, offset, text, local=True):
+
+        """
+        Finds the declaration of a variable in the alg file
+
+        :param name: The name of the variable
+        :param offset: The position in the text where the variable is used
+        :param text: The text of the alg file, as analysed last
+        :param local: If False, only the variables of the block are looked up (the name is used as self.name)
+        :return: the line of the declaration (1 based), None if the variable is not declared in the alg file
+
+        """
+
+        name = symbol(name)
+        line = text.count('\n', 0, offset) + 1
+        for chunk, shift, result in self.functions:
+            if local and chunk[2] < line <= chunk[2] + chunk[0].count('\n') + 1:
+                for function in result.functions.values():
+                    declared = function.getLocalVariables().get(name)
+                    if declared is not None:
+                        return int(declared.line) + shift
+        if self.block is not None and self.block.variables is not None:
+            for variables in (self.block.protectedVariables, self.block.variables):
+                declared = variables.get(name)
+                if declared is not None:
+                    return int(declared.line)
+        return None
+
+
+class AlgDocument:
+
+    """
+    Class AlgDocument holds the text of an alg file opened in the editor and its analysis
+
+    """
+
+    def __init__(self, uri, text, analysis):
+        self.uri = uri
+        self.path = uriToPath(uri)
+        self.text = text
+        self.analysis = analysis
+        self.lineStarts = None
+        self.dirty = True
+
+    def offset(self, position):
+        # the characters of a line are counted as code points (UTF-16 units for the characters of the BMP)
+        if self.lineStarts is None:
+            self.lineStarts = [0] + [m.end() for m in re.finditer('\n', self.text)]
+        line = position['line']
+        if line >= len(self.lineStarts):
+            return len(self.text)
+        start = self.lineStarts[line]
+        end = self.lineStarts[line + 1] - 1 if line + 1 < len(self.lineStarts) else len(self.text)
+        return min(start + position['character'], end)
+
+    def change(self, changes):
+        for change in changes:
+            if 'range' not in change:
+                self.text = change['text']
+            else:
+                start = self.offset(change['range']['start'])
+                end = self.offset(change['range']['end'])
+                self.text = self.text[:start] + change['text'] + self.text[end:]
+            self.lineStarts = None
+        self.dirty = True
+
+
+class LanguageServer:
+
+    """
+    Class LanguageServer implements the Language Server Protocol over a pair of streams: the messages are read on a
+    thread, and the edited documents are analysed once no message arrived for DEBOUNCE_TIME seconds, so a burst of
+    keystrokes is analysed once.
+
+    """
+
+    def __init__(self, input, output, jobs=1, useCache=True):
+        self.input = input
+        self.output = output
+        self.documents = {}
+        self.manifests = ManifestIndex()
+        self.messages = queue.Queue()
+        self.shutdownRequested = False
+        self.cache = ResultCache(os.path.join(DEFAULT_CACHE_DIR, 'results.sqlite')) if useCache else None
+        self.pool = multiprocessing.Pool(jobs) if jobs > 1 else None
+        self.handlers = {'initialize': self.initialize,
+                         'shutdown': self.shutdown,
+                         'textDocument/didOpen': self.didOpen,
+                         'textDocument/didChange': self.didChange,
+                         'textDocument/didSave': self.didSave,
+                         'textDocument/didClose': self.didClose,
+                         'textDocument/definition': self.definition}
+
+    def readMessages(self):
+        while True:
+            length = None
+            while True:
+                header = self.input.readline()
+                if header == b'':
+                    self.messages.put(None)
+                    return
+                header = header.strip()
+                if header == b'':
+                    break
+                name, _, value = header.partition(b':')
+                if name.strip().lower() == b'content-length':
+                    length = int(value.strip())
+            if length is not None:
+                self.messages.put(json.loads(self.input.read(length).decode('utf-8')))
+
+    def send(self, message):
+        message['jsonrpc'] = '2.0'
+        body = json.dumps(message).encode('utf-8')
+        self.output.write(b'Content-Length: %d\r\n\r\n' % len(body))
+        self.output.write(body)
+        self.output.flush()
+
+    def notify(self, method, params):
+        self.send({'method': method, 'params': params})
+
+    def run(self):
+
+        """
+        Serves the editor until it sends the exit notification or closes the input stream
+
+        :return: 0 if the editor requested a shutdown before it exited, otherwise 1
+
+        """
+
+        threading.Thread(target=self.readMessages, daemon=True).start()
+        try:
+            while True:
+                pending = any(document.dirty for document in self.documents.values())
+                try:
+                    message = self.messages.get(timeout=DEBOUNCE_TIME if pending else None)
+                except queue.Empty:
+                    self.analyseDocuments()
+                    continue
+                if message is None or message.get('method') == 'exit':
+                    return 0 if self.shutdownRequested else 1
+                self.dispatch(message)
+        finally:
+            if self.pool is not None:
+                self.pool.terminate()
+            if self.cache is not None:
+                self.cache.close()
+
+    def dispatch(self, message):
+        method = message.get('method')
+        handler = self.handlers.get(method)
+        isRequest = 'id' in message and method is not None
+        if handler is None:
+            if isRequest:
+                self.send({'id': message['id'], 'error': {'code': METHOD_NOT_FOUND, 'message': 'Unknown method %s' % method}})
+            return
+        try:
+            result = handler(message.get('params') or {})
+        except Exception as e:
+            if isRequest:
+                self.send({'id': message['id'], 'error': {'code': INTERNAL_ERROR, 'message': str(e)}})
+            else:
+                self.notify('window/logMessage', {'type': 1, 'message': '%s failed: %s' % (method, e)})
+            return
+        if isRequest:
+            self.send({'id': message['id'], 'result': result})
+
+    def initialize(self, params):
+        return {'capabilities': {'textDocumentSync': {'openClose': True, 'change': SYNC_INCREMENTAL, 'save': True},
+                                 'definitionProvider': True},
+                'serverInfo': {'name': 'efmi-compliance-checker'}}
+
+    def shutdown(self, params):
+        self.shutdownRequested = True
+        return None
+
+    def didOpen(self, params):
+        item = params['textDocument']
+        if os.path.splitext(uriToPath(item['uri']))[1] != '.alg':
+            return
+        self.documents[item['uri']] = AlgDocument(item['uri'], item['text'], AlgAnalysis(self.cache, self.pool))
+
+    def didChange(self, params):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is not None:
+            document.change(params['contentChanges'])
+
+    def didSave(self, params):
+        # a saved manifest changes the diagnostics of the alg files it lists
+        for document in self.documents.values():
+            document.dirty = True
+
+    def didClose(self, params):
+        uri = params['textDocument']['uri']
+        if self.documents.pop(uri, None) is not None:
+            self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+
+    def analyseDocuments(self):
+        for document in list(self.documents.values()):
+            if document.dirty:
+                document.dirty = False
+                try:
+                    self.publishDiagnostics(document)
+                except Exception as e:
+                    # the server keeps serving the other documents; the incremental state of the failed analysis is
+                    # dropped, the next change analyses the document from scratch
+                    document.analysis = AlgAnalysis(self.cache, self.pool)
+                    message = 'The analysis of %s failed: %s' % (document.path, e)
+                    self.notify('window/logMessage', {'type': 1, 'message': message})
+                    self.notify('textDocument/publishDiagnostics', {'uri': document.uri, 'diagnostics': [
+                        {'range': {'start': {'line': 0, 'character': 0}, 'end': {'line': 0, 'character': 0}},
+                         'severity': SEVERITY_ERROR, 'source': 'efmi', 'message': message}]})
+
+    def publishDiagnostics(self, document):
+        manifestPath, manifestVariables = self.manifests.find(document.path)
+        messages = document.analysis.analyse(document.text, manifestVariables)
+        declarations = {}
+        if document.analysis.block is not None and document.analysis.block.variables is not None:
+            declarations = SymbolTable(document.analysis.block.variables, None, PUBLIC_SCOPE).newScope(document.analysis.block.protectedVariables, PROTECTED_SCOPE)
+        lines = document.text.split('\n')
+        diagnostics = []
+        for message in messages:
+            line, column = self.messageLine(message, declarations)
+            length = len(lines[line - 1]) if 0 < line <= len(lines) else 0
+            diagnostics.append({'range': {'start': {'line': max(0, line - 1), 'character': column},
+                                          'end': {'line': max(0, line - 1), 'character': max(column, length)}},
+                                'severity': SEVERITY_ERROR,
+                                'source': 'efmi',
+                                'message': message})
+        self.notify('textDocument/publishDiagnostics', {'uri': document.uri, 'diagnostics': diagnostics})
+
+    @staticmethod
+    def messageLine(message, declarations):
+
+        """
+        Returns the position of a message of the checker: the line it names, otherwise the declaration of a variable
+        it names (e.g. a variable of the block which is not in the manifest), otherwise the first line
+
+        :return: (line, column), the line is 1 based and the column 0 based
+
+        """
+
+        match = MESSAGE_LINE.search(message)
+        if match is not None:
+            return int(match.group(1)), max(0, int(match.group(2) or 1) - 1)
+        for name in NAME.findall(message):
+            declared = declarations.get(symbol(name))
+            if declared is not None:
+                return int(declared.line), 0
+        return 1, 0
+
+    def definition(self, params):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return None
+        offset = document.offset(params['position'])
+        name = None
+        lineStart = document.text.rfind('\n', 0, offset) + 1
+        lineEnd = document.text.find('\n', offset)
+        lineEnd = len(document.text) if lineEnd < 0 else lineEnd
+        names = list(NAME.finditer(document.text, lineStart, lineEnd))
+        for i, match in enumerate(names):
+            if match.start() <= offset <= match.end():
+                # self.name refers to a variable of the block, also on a click on self
+                if match.group() == 'self' and i + 1 < len(names) and names[i + 1].start() == match.end() + 1 \
+                        and document.text[match.end()] == '.':
+                    match = names[i + 1]
+                name = match.group()
+                local = document.text[max(0, match.start() - 5):match.start()] != 'self.'
+                break
+        if name is None:
+            return None
+        if document.dirty:
+            self.analyseDocuments()
+
+        line = document.analysis.declaration(name, offset, document.text, local)
+        if line is not None:
+            return self.location(document.uri, document.text.split('\n'), line, r'(?<![\w.])(%s)(?!\w)' % re.escape(name), name)
+        manifestPath, manifestVariables = self.manifests.find(document.path)
+        if manifestVariables is not None and symbol(name) in manifestVariables:
+            with open(manifestPath, 'r', encoding='utf-8-sig') as f:
+                lines = f.read().split('\n')
+            line = int(manifestVariables[symbol(name)].line)
+            return self.location(pathToUri(manifestPath), lines, line, r'name="(%s)"' % re.escape(name), name)
+        return None
+
+    @staticmethod
+    def location(uri, lines, line, pattern, name):
+
+        """
+        Returns the location of a declaration
+
+        :param uri: The URI of the file
+        :param lines: The lines of the file
+        :param line: The line of the declaration (1 based); the line of a section of declarations (e.g. protected) is
+                     followed to the line which declares the name
+        :param pattern: The regular expression of the declared name
+        :return: the location of the name
+
+        """
+
+        for candidate in range(line, min(line + DECLARATION_SEARCH_LINES, len(lines)) + 1):
+            match = re.search(pattern, lines[candidate - 1]) if candidate > 0 else None
+            if match is not None:
+                line = candidate
+                column = match.start(1)
+                break
+        else:
+            column = 0
+        return {'uri': uri, 'range': {'start': {'line': line - 1, 'character': column},
+                                      'end': {'line': line - 1, 'character': column + len(name)}}}
+
+
+def main(arguments=None):
+    import argparse
+
+    argumentParser = argparse.ArgumentParser(description="Language server (stdio) for the GALEC code files of eFMUs")
+    argumentParser.add_argument("-j", "--jobs", type=int, default=1,
+                                help="number of worker processes used to parse the functions of a file when it is opened (default: 1)")
+    argumentParser.add_argument("--no-cache", action="store_true",
+                                help="do not read or store parse trees in the result cache of the checker")
+    arguments = argumentParser.parse_args(arguments)
+
+    # the messages of the protocol are written to stdout, the reports printed by the validators are dropped
+    # the messages are read on a thread from a stream of their own, the interpreter does not wait for it at exit
+    input = open(sys.stdin.fileno(), 'rb', closefd=False)
+    output = sys.stdout.buffer
+    sys.stdout = open(os.devnull, 'w')
+    getParser()
+    server = LanguageServer(input, output, arguments.jobs, not arguments.no_cache)
+    return server.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,32 +17,60 @@
 # permissions and limitations under the "License".
 
 from collections import namedtuple
+from data.Trampoline import trampoline
 
 """
 The following tuples are defined to help store all types of expressions.
-For example, the Reference_constant tuple is defined to address the single_assignment of type (reference := constant). So it
-contains three elements: reference, constant and the line number in the alg file. More examples are listed below:
+For example, the BinaryOperation tuple is defined to address the binary_operation rule. So it contains four elements:
+both operand expressions, the operation and the line number in the alg file. More examples are listed below:
 
-- Reference_if_expression: contains reference, if_expression which is of type If_Expression and finally the line number
 - FunctionCall: includes a name of the function, expression which contains all parameter expressions (see the function_call rule)
   and finally the line number
 - ElseIf: contains a condition (which is an expression rule), expression to be visited when the condition is true and 
   finally the line number
+- VarTypeCausality: contains the type, causality and declaration line of a variable; the dimensions are only set for the
+  name of a declared array (its elements, e.g. x[1], are scalars and therefore have no dimensions); min and max are the
+  bounds of the range_specification of the declaration, None if they are not given
+- Loop: contains the name of the index, the start, step size (None if it is not given) and termination expressions and
+  the line of a for_loop
+- IndexAccess: contains the name of an array, the expressions of the indexes of a reference to one of its elements, the
+  enclosing for_loops (Loop tuples, the outermost first) and the line of the reference. The accesses of a function are
+  recorded once per reference in the alg file, also inside of a for_loop whose statements are read once per iteration
+
+The single_assignments of a function are stored as Statement objects (see below).
 
 """
 
-Reference_constant = namedtuple('Reference_constant', ['reference', 'constant', 'line'])
-Reference_Reference = namedtuple('Reference_Reference', ['reference1', 'reference2', 'line'])
 #MinMax_Expressions = namedtuple('MinMax_Expressions', ['references', 'types', 'vals'])
-Reference_if_expression = namedtuple('Reference_if_expression', ['reference', 'if_expression', 'line'])
 BinaryOperation = namedtuple('BinaryOperation', ['expression1', 'operation', 'expression2', 'line'])
-Reference_binary_operation = namedtuple('Reference_binary_operation', ['reference', 'binaryOperation', 'line'])
-VarTypeCausality = namedtuple('VarTypeCausality', ['type', 'causality', 'line'])
+VarTypeCausality = namedtuple('VarTypeCausality', ['type', 'causality', 'line', 'dimensions', 'min', 'max'], defaults=[(), None, None])
 ExpressionVariable = namedtuple('ExpressionVariable', ['name', 'line'])
 ElseIf = namedtuple ('ElseIf', ['condition', 'expression', 'line'])
 FunctionCall = namedtuple('FunctionCall', ['name', 'expression', 'line'])
 UnaryOperation = namedtuple('UnaryOperation', ['operation', 'expression', 'line'])
-Reference_function_call = namedtuple('Reference_function_call', ['reference', 'functionCall', 'line'])
+Loop = namedtuple('Loop', ['index', 'start', 'step', 'stop', 'line'])
+IndexAccess = namedtuple('IndexAccess', ['name', 'indexes', 'loops', 'line'])
+
+# The position of the line in the expressions (lists) of each kind, a multi_dimension_constructor does not store a line
+EXPRESSION_LINES = {'constant': 3, 'reference': 2, 'binary_operation': 2, 'function_call': 2, 'if_expression': 2,
+                    'unary_operation': 4, 'dimension_query': 3}
+
+
+def absoluteLine(offset, line):
+
+    """
+    Returns the line in the alg file of an expression node of a statement: the nodes store their lines relative to the
+    line of the statement (see the ExpressionPool class)
+
+    :param offset: The line stored in the node, None if the node does not store a line
+    :param line: The line of the statement which contains the node
+    :return: the line number, the line of the statement if the node does not store a line
+
+    """
+
+    if type(offset) is not int or line is None:
+        return line
+    return line + offset
 
 class If_Expression:
 
@@ -136,6 +164,214 @@ class If_Expression:
         
 
 
+class ExpressionPool:
+
+    """
+    Class ExpressionPool hash-conses the expressions of a function: structurally identical (sub-)expressions, e.g. the
+    statements of an unrolled for_loop or the repeated terms of generated code, are stored once and shared, so the
+    expressions of a function form a DAG. The type inference (see the TypeInference class) and the collection of the
+    references (see Function.getExpressionsVariables) memoize their results per node, so they run once per unique
+    node.
+
+    The children of a node are shared before the node, so the key of a node only holds the ids of its (shared)
+    children and its own values. The lines of the nodes are stored relative to the line of their statement (see
+    absoluteLine), so identical expressions of statements on different lines are shared as well; the statement keeps
+    its line and the checks add it to the lines of the nodes in their messages. The pool is only used while a function
+    is read, the shared nodes do not refer to it.
+
+    Like all walks over expressions, the sharing is not recursive (see the trampoline function): a sum of thousands of
+    terms is as deep as it is long.
+
+    """
+
+    def __init__(self):
+        # key -> shared node, the pool keeps the shared nodes alive so their ids stay unique
+        self.nodes = {}
+
+    def ref(self, value):
+        # the type is part of the key of a value, 1, 1.0 and True are equal but are different constants
+        if isinstance(value, (list, tuple, If_Expression)):
+            return id(value)
+        return (type(value), value)
+
+    def share(self, expression, line):
+
+        """
+        Returns the shared node of the expression of a statement, the expression and its sub-expressions are added to
+        the pool if they are not in it yet
+
+        :param expression: an expression (list), a BinaryOperation, FunctionCall, ElseIf or If_Expression object, a
+            list of expressions (e.g. the arguments of a FunctionCall) or a value (which is returned as it is)
+        :param line: The line of the statement, the shared nodes store their lines relative to it
+        :return: the shared node which is structurally identical to the expression
+
+        """
+
+        return trampoline(self.__share(expression, line))
+
+    @staticmethod
+    def lineSlot(expression):
+        if hasattr(expression, '_fields'):
+            return expression._fields.index('line') if 'line' in expression._fields else None
+        if isinstance(expression, list) and len(expression) > 0 and isinstance(expression[0], str):
+            slot = EXPRESSION_LINES.get(expression[0])
+            return slot if slot is not None and slot < len(expression) else None
+        return None
+
+    def __share(self, expression, line):
+        if isinstance(expression, If_Expression):
+            parts = []
+            for table in (expression.conditions, expression.expression, expression.elseIf, expression.elseExpr):
+                for key in table.keys():
+                    table[key] = yield self.__share(table[key], line)
+                parts.append(tuple(self.ref(x) for x in table.values()))
+            return self.nodes.setdefault((If_Expression, tuple(parts)), expression)
+        if not isinstance(expression, (list, tuple)):
+            return expression
+
+        children = []
+        refs = []
+        lineSlot = self.lineSlot(expression)
+        for i, child in enumerate(expression):
+            if isinstance(child, (list, tuple, If_Expression)):
+                child = yield self.__share(child, line)
+                refs.append(id(child))
+            else:
+                if i == lineSlot and type(child) is int and line is not None:
+                    child -= line
+                refs.append((type(child), child))
+            children.append(child)
+        key = (type(expression), tuple(refs))
+        node = self.nodes.get(key)
+        if node is None:
+            if isinstance(expression, list):
+                node = children
+            elif hasattr(expression, '_fields'):
+                node = type(expression)(*children)
+            else:
+                node = tuple(children)
+            self.nodes[key] = node
+        return node
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+def flattenExpression(expression):
+
+    """
+    Stores an expression as a flat table of its nodes, the children of a node are stored before the node and refer to
+    it by their index. A shared node (see the ExpressionPool class) is stored once, so the table keeps the sharing. The
+    default pickling recurses once per level of an expression and fails for deep expressions (e.g. a sum of thousands
+    of terms), so the functions are pickled as tables (see Function.__getstate__).
+
+    :param expression: an expression (list), a BinaryOperation, FunctionCall, ElseIf or If_Expression object or a list
+        of expressions
+    :return: the list of the nodes (type of the node, values of the node, positions of the values which are indexes of
+        nodes), the last node is the expression (see buildExpression)
+
+    """
+
+    index = {}
+    nodes = []
+    stack = [(expression, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in index:
+            continue
+        if isinstance(node, If_Expression):
+            # the counters and the keys of the tables are stored before the expressions of the tables
+            tables = (node.conditions, node.expression, node.elseIf, node.elseExpr)
+            values = [(node.condCounter, node.elseIfCounter, node.expressionCounter, node.elseCounter),
+                      tuple(tuple(table.keys()) for table in tables)] + [x for table in tables for x in table.values()]
+            first = 2
+        else:
+            values = list(node)
+            first = 0
+        refs = tuple(i for i in range(first, len(values)) if isinstance(values[i], (list, tuple, If_Expression)))
+        children = [values[i] for i in refs if id(values[i]) not in index]
+        if not ready and children:
+            stack.append((node, True))
+            stack.extend((x, False) for x in children)
+            continue
+        for i in refs:
+            values[i] = index[id(values[i])]
+        index[id(node)] = len(nodes)
+        nodes.append((type(node), values, refs))
+    return nodes
+
+
+def buildExpression(nodes):
+
+    """
+    Rebuilds an expression from the table of its nodes (see flattenExpression)
+
+    :param nodes: The list of the nodes of the expression
+    :return: the expression, the nodes which were shared are shared again
+
+    """
+
+    built = []
+    for kind, values, refs in nodes:
+        for i in refs:
+            values[i] = built[values[i]]
+        if kind is If_Expression:
+            node = If_Expression()
+            node.condCounter, node.elseIfCounter, node.expressionCounter, node.elseCounter = values[0]
+            children = iter(values[2:])
+            for table, keys in zip((node.conditions, node.expression, node.elseIf, node.elseExpr), values[1]):
+                for key in keys:
+                    table[key] = next(children)
+        elif kind is list:
+            node = values
+        elif hasattr(kind, '_fields'):
+            node = kind(*values)
+        else:
+            node = kind(values)
+        built.append(node)
+    return built[-1]
+
+
+class Statement:
+
+    """
+    Class Statement represents a single_assignment of a function. It only holds the kind of the assignment, the
+    assigned reference, the expression and the line number in the alg file, so a function with many statements does
+    not need more than a small object per statement. The kinds are:
+
+    - refToConstant: the expression is the constant (['constant', type, value, line])
+    - refToReference: the expression is the name of a reference
+    - refToBinaryOperation: the expression is a BinaryOperation
+    - refToIfExpression: the expression is an If_Expression
+    - refToFunctionCall: the expression is a FunctionCall
+
+    """
+
+    __slots__ = ('kind', 'reference', 'expression', 'line')
+
+    def __init__(self, kind, reference, expression, line):
+        self.kind = kind
+        self.reference = reference
+        self.expression = expression
+        self.line = line
+
+    def __getstate__(self):
+        return (self.kind, self.reference, self.expression, self.line)
+
+    def __setstate__(self, state):
+        self.kind, self.reference, self.expression, self.line = state
+
+    def __repr__(self):
+        return 'Statement(kind=%r, reference=%r, expression=%r, line=%r)' % (self.kind, self.reference, self.expression, self.line)
+
+
+REF_TO_CONSTANT = 'refToConstant'
+REF_TO_REFERENCE = 'refToReference'
+REF_TO_BINARY_OPERATION = 'refToBinaryOperation'
+REF_TO_IF_EXPRESSION = 'refToIfExpression'
+REF_TO_FUNCTION_CALL = 'refToFunctionCall'
+
+
 class Function:
 
     """
@@ -143,30 +379,39 @@ class Function:
     and expressions of the function_declaration. These properties include:
 
     - declaredLocalVars: stores the local declared variables
-    - expressionsVariables: a list of all references contained in expressions of the function
-    - reference_to_constant: includes all Reference_constant expressions which are contained in the function
-    - reference_to_if_expression: contains all Reference_if_expression expressions
-    - binaryOperations: stores all Reference_binary_operation expressions
+    - statements: all single_assignments of the function (of type Statement) in the order of the alg file
     - and others, all hold proper names that explain the purpose 
 
+    The references contained in expressions of the function (see getExpressionsVariables) are not stored, they are
+    collected from the statements when they are requested. The references to array elements are also kept with their
+    index expressions (indexAccesses, see the IndexAccess tuple), so the bounds of the indexes can be checked without
+    the iterations of the for_loops.
+
+    The expressions of the statements and of the index accesses are pickled as flat tables of nodes (see
+    flattenExpression).
+
     """
     def __init__(self):
         self.declaredLocalVars = {}
-        self.expressionsVariables = []
-        self.reference_to_constant = {}
-        self.reference_to_if_expression = {}
-        self.reference_to_reference = {}
-        self.reference_to_functionCall = {}
-        #self.single_assignment = {}
-        self.binaryOperations = {}
+        self.statements = []
+        self.indexAccesses = []
         self.method = False
         self.function = False
-        self.refToConstCounter = 0
-        self.refToBinaryOperCounter = 0
-        self.refToRefCounter = 0
-        self.refToIfExprCounter = 0
-        self.refToFunctionCallCounter = 0
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['statements'] = ([(x.kind, x.reference, x.line) for x in self.statements],
+                               flattenExpression([x.expression for x in self.statements]))
+        state['indexAccesses'] = flattenExpression(self.indexAccesses)
+        return state
+
+    def __setstate__(self, state):
+        rows, nodes = state['statements']
+        expressions = buildExpression(nodes)
+        state['statements'] = [Statement(kind, reference, expression, line) for (kind, reference, line), expression in zip(rows, expressions)]
+        state['indexAccesses'] = buildExpression(state['indexAccesses'])
+        self.__dict__.update(state)
+
     def setName (self, name):
         self.name = name
     
@@ -178,126 +423,109 @@ class Function:
     
     def addDeclaredLocalVars (self, varCausality, nameAndType, line):
         #varCausality = node[i].children[j].children[0].value
-        varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, line)
+        varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, line, (), *nameAndType[3])
         if len(nameAndType[0]) == 1:
             self.declaredLocalVars[nameAndType[0][0]] = varTypeCaus
         else:
             for i in range(len(nameAndType[0])):
                 self.declaredLocalVars[nameAndType[0][i]] = varTypeCaus
-
-
-
-    def addReference_to_constant (self, refConstant):
-        self.refToConstCounter += 1
-        statement = 'refToConst' + str(self.refToConstCounter)
-        exprVar= ExpressionVariable (refConstant.reference, refConstant.line)
-        #print (" adding from Reference_to_constant  " + exprVar.name)
-        self.expressionsVariables.append(exprVar)
-        self.reference_to_constant[statement] = refConstant
-
-    def addReference_to_binaryOperation(self, refToBinaryOperation):
-        self.refToBinaryOperCounter += 1
-        statement = 'refToBinaryOperation' + str(self.refToBinaryOperCounter)
-        #binaryOperation = BinaryOperation(expression1, operation, expression2)
-        exprVar= ExpressionVariable (refToBinaryOperation.reference, refToBinaryOperation.line)
-        
-        self.expressionsVariables.append(exprVar)
-        self.expressionsVariables += self.__retrieveVars_binaryOperation(refToBinaryOperation.binaryOperation)
-        
-        
-        self.binaryOperations[statement] = refToBinaryOperation
-
-    def addReference_to_reference(self, refToRef):
-        self.refToRefCounter += 1
-        statement = 'refToRef' + str(self.refToRefCounter)
-        exprVar1= ExpressionVariable (refToRef.reference1, refToRef.line)
-        self.expressionsVariables.append(exprVar1)
-        exprVar2= ExpressionVariable (refToRef.reference2, refToRef.line)
-        self.expressionsVariables.append(exprVar2)
-        self.reference_to_reference[statement] = refToRef
+        self.declaredLocalVars[nameAndType[0][-1]] = VarTypeCausality(nameAndType[1], varCausality, line, nameAndType[2], *nameAndType[3])
+
+    def addStatement (self, kind, reference, expression, line):
+        self.statements.append(Statement(kind, reference, expression, line))
+
+    def addIndexAccess (self, name, indexes, loops, line):
+        self.indexAccesses.append(IndexAccess(name, indexes, loops, line))
+
+    def __retrieveVars_statement(self, statement, varList, memo):
+        # the lines are collected relative to the line of the statement, like the lines of the nodes
+        varList.append(ExpressionVariable(statement.reference, 0))
+        if statement.kind == REF_TO_REFERENCE:
+            varList.append(ExpressionVariable(statement.expression, 0))
+        elif statement.kind == REF_TO_BINARY_OPERATION:
+            yield self.__retrieveVars_binaryOperation(statement.expression, varList, memo)
+        elif statement.kind == REF_TO_IF_EXPRESSION:
+            yield self.__retrieveIfExprVars(statement.expression, varList, memo)
+        elif statement.kind == REF_TO_FUNCTION_CALL:
+            yield self.__retrieveVars_functionCall(statement.expression, varList, memo)
+
+    def __replay(self, node, varList, memo):
+        # the references of a node which was already walked are copied from their first occurrence
+        if id(node) not in memo:
+            return False
+        start, end = memo[id(node)]
+        varList.extend(varList[start:end])
+        return True
+
+    def __retrieveIfExprVars (self, ifExpression, varList, memo):
     
-    def addReference_to_ifExpression (self, refToIfExpression):
-        self.refToIfExprCounter += 1
-        statement = 'refToIfExpr' + str(self.refToIfExprCounter)
-        exprVar= ExpressionVariable (refToIfExpression.reference, refToIfExpression.line)
-        self.expressionsVariables.append(exprVar)
-        self.expressionsVariables += self.__retrieveIfExprVars(refToIfExpression.if_expression)
-
-        self.reference_to_if_expression[statement] = refToIfExpression
-    
-    def addReference_to_functionCall (self, refToFunctionCall):
-        self.refToFunctionCallCounter += 1
-        statement = 'refToIfExpr' + str(self.refToFunctionCallCounter)
-        exprVar= ExpressionVariable (refToFunctionCall.reference, refToFunctionCall.line)
-        self.expressionsVariables.append(exprVar)
-        
-        self.expressionsVariables += self.__retrieveVars_functionCall(refToFunctionCall.functionCall)
-        self.reference_to_functionCall[statement] = refToFunctionCall
-        
-    
-    def addExpressionVar (self, exprvar):
-        self.expressionsVariables.append(exprvar)
-
-    def __retrieveIfExprVars (self, ifExpression):
-    
-        varList = []
+        if self.__replay(ifExpression, varList, memo):
+            return
+        start = len(varList)
         condtionsList = ifExpression.getConditions() 
         for key in condtionsList.keys():
-            varList += self.__retrieveVars_expression(condtionsList[key])
+            yield self.__retrieveVars_expression(condtionsList[key], varList, memo)
         
         expressionsList = ifExpression.getExpressions()
         for key in expressionsList.keys():
-            varList += self.__retrieveVars_expression(expressionsList[key])
+            yield self.__retrieveVars_expression(expressionsList[key], varList, memo)
         
         elseifList = ifExpression.getElseIfs()
         for key in elseifList.keys():
-            varList += self.__retrieveVars_expression(elseifList[key].condition)
-            varList += self.__retrieveVars_expression(elseifList[key].expression)
+            yield self.__retrieveVars_expression(elseifList[key].condition, varList, memo)
+            yield self.__retrieveVars_expression(elseifList[key].expression, varList, memo)
         
         elseExpressions = ifExpression.getElseExpr()
         for key in elseExpressions.keys():
-            varList += self.__retrieveVars_expression(elseExpressions[key])
+            yield self.__retrieveVars_expression(elseExpressions[key], varList, memo)
 
-        return varList
+        memo[id(ifExpression)] = (start, len(varList))
         
 
     
-    def __retrieveVars_expression(self, expression):
-        varList = []
+    def __retrieveVars_expression(self, expression, varList, memo):
         #print(expression)
         if expression[0] == 'reference':
             exprVar= ExpressionVariable (expression[1], expression[2])
             varList.append(exprVar)
+        elif expression[0] == 'dimension_query':
+            # the queried array and the references of the dimension
+            varList.append(ExpressionVariable(expression[1], expression[3]))
+            yield self.__retrieveVars_expression(expression[2], varList, memo)
         elif expression[0] == 'binary_operation':
-            varList += self.__retrieveVars_binaryOperation(expression[1])
+            yield self.__retrieveVars_binaryOperation(expression[1], varList, memo)
         elif expression[0] == 'if_expression':
-            varList += self.__retrieveIfExprVars(expression[1])
+            yield self.__retrieveIfExprVars(expression[1], varList, memo)
         elif expression[0] == 'function_call':
-            varList += self.__retrieveVars_functionCall(expression[1])
+            yield self.__retrieveVars_functionCall(expression[1], varList, memo)
         elif expression[0] == 'unary_operation':
             if expression[1] == 'function_call':
-                varList += self.__retrieveVars_functionCall(expression[2])
+                yield self.__retrieveVars_functionCall(expression[2], varList, memo)
             elif expression[1] == 'reference':
                 exprVar= ExpressionVariable (expression[2], expression[3])
                 varList.append(exprVar)
             elif expression[1] == 'binary_operation':
                 
-                varList += self.__retrieveVars_binaryOperation(expression[2])
+                yield self.__retrieveVars_binaryOperation(expression[2], varList, memo)
             elif expression[1] == 'if_expression':
-                varList += self.__retrieveVars_functionCall(expression[2])
-                  
-        return varList
+                yield self.__retrieveVars_functionCall(expression[2], varList, memo)
+            elif expression[1] == 'dimension_query':
+                yield self.__retrieveVars_expression(expression[2], varList, memo)
     
-    def __retrieveVars_functionCall(self, functionCall):
-        varList= []
+    def __retrieveVars_functionCall(self, functionCall, varList, memo):
+        if self.__replay(functionCall, varList, memo):
+            return
+        start = len(varList)
         exprsList = functionCall.expression
         for i in range(len(exprsList)):
-            varList += self.__retrieveVars_expression(exprsList[i])
+            yield self.__retrieveVars_expression(exprsList[i], varList, memo)
     
-        return varList
+        memo[id(functionCall)] = (start, len(varList))
 
-    def __retrieveVars_binaryOperation (self, binaryOperation):
-        varsList = []
+    def __retrieveVars_binaryOperation (self, binaryOperation, varList, memo):
+        if self.__replay(binaryOperation, varList, memo):
+            return
+        start = len(varList)
         
         expr1 = binaryOperation.expression1
         expr2 = binaryOperation.expression2
@@ -305,58 +533,69 @@ class Function:
        
         if expr1[0] == "reference":
             exprVar= ExpressionVariable (expr1[1], binaryOperation.line)
-            varsList.append(exprVar)
+            varList.append(exprVar)
         elif expr1[0] == "binary_operation":
-            varsList += self.__retrieveVars_binaryOperation(expr1[1])
+            yield self.__retrieveVars_binaryOperation(expr1[1], varList, memo)
     
         if expr2[0] == "reference":
             exprVar= ExpressionVariable (expr2[1], binaryOperation.line)
-            varsList.append(exprVar)
+            varList.append(exprVar)
         elif expr2[0] == "binary_operation":
-            varsList += self.__retrieveVars_binaryOperation(expr2[1])
+            yield self.__retrieveVars_binaryOperation(expr2[1], varList, memo)
     
-        return varsList
+        memo[id(binaryOperation)] = (start, len(varList))
 
     def getExpressionsVariables (self):
-        return self.expressionsVariables
+
+        """
+        Collects all references contained in the statements of the function (the assigned references and the references
+        contained in the expressions), in the order of the statements. The references of a shared expression node (see
+        the ExpressionPool class) are collected once with their lines relative to the statement, the next occurrences
+        of the node (also in statements on other lines) copy them. The expressions are walked without recursion (see
+        the trampoline function).
+
+        :return: a list of ExpressionVariable tuples with the lines in the alg file
+
+        """
+
+        # id of the BinaryOperation, FunctionCall or If_Expression -> the slice of nodeVars with its references
+        memo = {}
+        nodeVars = []
+        varList = []
+        for statement in self.statements:
+            start = len(nodeVars)
+            trampoline(self.__retrieveVars_statement(statement, nodeVars, memo))
+            varList.extend(ExpressionVariable(name, absoluteLine(offset, statement.line)) for name, offset in nodeVars[start:])
+        return varList
 
     def getLocalVariables (self):
         return self.declaredLocalVars
 
-    def getReference_to_constant (self):
-        return self.reference_to_constant
-    
-    def getReference_to_if_expression (self):
-        return self.reference_to_if_expression
-    
-    def getReference_to_reference (self):
-        return self.reference_to_reference
-    
-    def getBinary_operations (self):
-        return self.binaryOperations
-
-    def getReference_to_functionCall (self):
-        return self.reference_to_functionCall
-    
-    def display (self):
-        print(self.name)
-        for x in self.reference_to_constant.keys():
-            print(x, " ref = ",  self.reference_to_constant[x].reference, " constant = ", self.reference_to_constant[x].constant)
-        for x in self.reference_to_reference.keys():
-            print(x, " ref1 = ", self.reference_to_reference[x].reference1, " ref2 = ", self.reference_to_reference[x].reference2)
-        for x in self.binaryOperations.keys():
-            print(x, " ref = ", self.binaryOperations[x].reference, " exp1 = ", self.binaryOperations[x].binaryOperation.expression1, " operation ", self.binaryOperations[x].binaryOperation.operation, " exp2 = ", self.binaryOperations[x].binaryOperation.expression2)
-        for x in self.reference_to_if_expression.keys():
-            print(x)
-            print ("...", " ref = ", self.reference_to_if_expression[x].reference)
-            #print ("......", self.reference_to_if_expression[x].if_expression.toString())
-            for i in range(len(self.reference_to_if_expression[x].if_expression.toString())):
-                print(self.reference_to_if_expression[x].if_expression.toString()[i])
-            
+    def getIndexAccesses (self):
+        return self.indexAccesses
 
+    def getStatements (self, kind=None):
 
+        """
+        Returns the statements of the function in the order of the alg file
 
+        :param kind: The kind of the statements (see the Statement class), all statements are returned if it is None
+        :return: a list of Statement objects
 
+        """
 
-    
+        if kind is None:
+            return self.statements
+        return [statement for statement in self.statements if statement.kind == kind]
 
+    def display (self):
+        print(self.name)
+        for statement in self.statements:
+            if statement.kind == REF_TO_IF_EXPRESSION:
+                print(statement.kind, " ref = ", statement.reference)
+                for line in statement.expression.toString():
+                    print(line)
+            elif statement.kind == REF_TO_BINARY_OPERATION:
+                print(statement.kind, " ref = ", statement.reference, " exp1 = ", statement.expression.expression1, " operation ", statement.expression.operation, " exp2 = ", statement.expression.expression2)
+            else:
+                print(statement.kind, " ref = ", statement.reference, " expression = ", statement.expression)
@@ -0,0 +1,176 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import os
+import mmap
+import hashlib
+import threading
+from data.ResourceLimits import LimitExceeded
+
+# The digests computed while a member of the archive is extracted, other algorithms are computed when requested
+DEFAULT_ALGORITHMS = ('sha1',)
+# Size of the buffers used to read files and archive members
+BUFFER_SIZE = 1 << 20
+# The directory of the files which are kept between runs of the checker
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'efmi-compliance-checker')
+
+# Length of the hexadecimal digest -> algorithm, the algorithm of a checksum is recognized by its length
+ALGORITHMS_BY_LENGTH = {40: 'sha1', 56: 'sha224', 64: 'sha256', 96: 'sha384', 128: 'sha512'}
+
+
+def algorithmOf(checksum):
+
+    """
+    Returns the hash algorithm of a checksum
+
+    :param checksum: The hexadecimal checksum
+    :return: the name of the algorithm (SHA-1 if the length of the checksum is not known)
+
+    """
+
+    return ALGORITHMS_BY_LENGTH.get(len(checksum.strip()), 'sha1') if checksum else 'sha1'
+
+
+class ChecksumService:
+
+    """
+    Class ChecksumService computes the checksums of the files of an eFMU, each file is hashed at most once per run:
+
+    - The members of the archive are hashed while they are extracted (see extractMember), the data is read only once.
+    - The digests of files are memoized by path together with the modification time and size of the file, a changed
+      file (e.g. in an unpacked folder which is checked again) is hashed again. The digests of archive members are not
+      kept between runs: the name, CRC32 and size of a member can be kept while its content is changed, so each
+      extracted member is hashed from its bytes.
+    - Files which are not extracted by the service are hashed with large buffers (memory mapped if possible).
+
+    The service can be used by several threads at the same time.
+
+    """
+
+    def __init__(self, algorithms=DEFAULT_ALGORITHMS):
+        self.algorithms = tuple(algorithms)
+        self.digests = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def pathKey(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def stamp(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def known(self, key, stamp):
+        # the digests memoized for a path, if the file did not change since
+        memoized = self.digests.get(key)
+        if memoized is None or memoized[0] != stamp:
+            memoized = (stamp, {})
+            self.digests[key] = memoized
+        return memoized[1]
+
+    def extractMember(self, archive, info, path, budget=None):
+
+        """
+        Extracts a member of the archive, the member is hashed with all algorithms of the service while it is written
+
+        :param archive: The opened archive (of type zipfile.ZipFile)
+        :param info: The ZipInfo of the member
+        :param path: The path of the extracted file
+        :param budget: The resource limits of the extraction (of type ExtractionBudget), None for no limits
+        :return: the path of the extracted file
+        :raise LimitExceeded: if the member exceeds a limit of the budget, the partly written file is removed
+
+        """
+
+        if budget is not None:
+            budget.admit(info)
+        if info.is_dir():
+            os.makedirs(path, exist_ok=True)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        hashers = [hashlib.new(algorithm) for algorithm in self.algorithms]
+        try:
+            with archive.open(info) as source, open(path, 'wb') as target:
+                written = 0
+                buf = source.read(BUFFER_SIZE)
+                while len(buf) > 0:
+                    written += len(buf)
+                    if budget is not None:
+                        budget.consume(info, written, len(buf))
+                    for hasher in hashers:
+                        hasher.update(buf)
+                    target.write(buf)
+                    buf = source.read(BUFFER_SIZE)
+        except LimitExceeded:
+            os.remove(path)
+            raise
+
+        stamp = self.stamp(path)
+        with self.lock:
+            self.known(self.pathKey(path), stamp).update((algorithm, hasher.hexdigest())
+                                                         for algorithm, hasher in zip(self.algorithms, hashers))
+        return path
+
+    def hashFile(self, path, algorithm):
+        hasher = hashlib.new(algorithm)
+        with open(path, 'rb') as afile:
+            if os.fstat(afile.fileno()).st_size > BUFFER_SIZE:
+                with mmap.mmap(afile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hasher.update(mapped)
+            else:
+                hasher.update(afile.read())
+        return hasher.hexdigest()
+
+    def digest(self, path, algorithm='sha1'):
+
+        """
+        Returns the hexadecimal digest of a file, the file is only hashed if its digest is not known yet
+
+        :param path: The path of the file
+        :param algorithm: The name of the hash algorithm
+        :return: the hexadecimal digest
+
+        """
+
+        key = self.pathKey(path)
+        stamp = self.stamp(path)
+        with self.lock:
+            known = self.known(key, stamp).get(algorithm)
+        if known is not None:
+            return known
+        calculated = self.hashFile(path, algorithm)
+        with self.lock:
+            self.known(key, stamp)[algorithm] = calculated
+        return calculated
+
+    def matches(self, path, checksum):
+
+        """
+        Checks if the checksum of a file is correct, the algorithm is recognized by the length of the checksum
+
+        :param path: The path of the file
+        :param checksum: The expected hexadecimal checksum
+        :return: True if the calculated checksum equals the expected checksum
+
+        """
+
+        if not checksum:
+            return False
+        return self.digest(path, algorithmOf(checksum)) == checksum.strip().lower()
@@ -0,0 +1,211 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+"""
+The constant_scalar_integer_expressions of an alg file (the dimensions of declarations, the indexes of references to
+array elements and the bounds of for_loops) are evaluated at read time by the ConstantEvaluator class. Their values
+are integers or None if an expression is not constant (for example if it refers to a variable which is not the index
+of an enclosing for_loop).
+
+"""
+
+from data.AlgorithmCodeData import BinaryOperation, FunctionCall, If_Expression
+from data.Trampoline import trampoline
+
+# The number of bits above which the value of a power is not evaluated (e.g. 7 ^ 1000000000), it is not constant
+MAX_POWER_BITS = 64
+
+
+def applyOperation(operation, value1, value2):
+
+    """
+    Returns the value of a binary operation of two integers
+
+    :param operation: The operator of the binary operation
+    :param value1: The value of the first operand
+    :param value2: The value of the second operand
+    :return: the integer value, None if the result is not an integer (e.g. 1 / 2), the operation is not arithmetic or
+             the result of a power exceeds MAX_POWER_BITS
+
+    """
+
+    if operation == "+":
+        return value1 + value2
+    if operation == "-":
+        return value1 - value2
+    if operation == "*":
+        return value1 * value2
+    if operation == "/":
+        if value2 == 0 or value1 % value2 != 0:
+            return None
+        return value1 // value2
+    if operation == "^":
+        if value2 < 0 or (abs(value1).bit_length() - 1) * value2 > MAX_POWER_BITS:
+            return None
+        return value1 ** value2
+    return None
+
+
+def applyFunction(name, values):
+
+    """
+    Returns the value of a call of a built-in function with integer arguments
+
+    :param name: The name of the function
+    :param values: The list of the values of the arguments
+    :return: the integer value, None for other functions
+
+    """
+
+    if name == 'abs' and len(values) == 1:
+        return abs(values[0])
+    if name == 'sign' and len(values) == 1:
+        return (values[0] > 0) - (values[0] < 0)
+    if name == 'min' and len(values) == 2:
+        return min(values)
+    if name == 'max' and len(values) == 2:
+        return max(values)
+    if name == 'div' and len(values) == 2 and values[1] != 0:
+        # the quotient is truncated towards zero
+        quotient = abs(values[0]) // abs(values[1])
+        return quotient if (values[0] < 0) == (values[1] < 0) else -quotient
+    if name == 'mod' and len(values) == 2 and values[1] != 0:
+        return values[0] % values[1]
+    return None
+
+
+class ConstantEvaluator:
+
+    """
+    Class ConstantEvaluator computes the values of constant integer expressions: integer constants, arithmetic
+    operations, the built-in functions abs, sign, min, max, div and mod, size() queries of declared arrays and any
+    nesting of them. The references are bound to the values of the indexes of the enclosing for_loops (bindings).
+
+    The values are memoized per expression and per values of the references it contains, so an expression is evaluated
+    once, or once per iteration of the for_loops whose indexes it contains; for example size(self.x, 1) - 1 in the
+    bounds of a nested for_loop is not evaluated again in each iteration of the outer loop. The expressions are the
+    nodes read by the ReadTree class and they are walked without recursion (see the trampoline function).
+
+    """
+
+    def __init__(self, dimensions):
+        # function: name of a declared variable -> its dimensions, None if the variable is not declared
+        self.dimensions = dimensions
+        # id of the expression -> (expression, sorted tuple of the names of the references of the expression)
+        self.references = {}
+        # (id of the expression, values of its references) -> (expression, value); the expressions are kept to keep
+        # their ids unique
+        self.values = {}
+
+    def evaluate(self, expression, bindings=None):
+
+        """
+        Returns the value of a constant integer expression
+
+        :param expression: The expression read by the ReadTree class
+        :param bindings: The dictionary of the values of the indexes of the enclosing for_loops (index name -> value)
+        :return: the integer value, None if the expression is not constant
+
+        """
+
+        if bindings is None:
+            bindings = {}
+        names = self.referenceNames(expression)
+        key = (id(expression), tuple(bindings.get(x) for x in names))
+        result = self.values.get(key)
+        if result is None:
+            result = (expression, trampoline(self.__value(expression, bindings)))
+            self.values[key] = result
+        return result[1]
+
+    def referenceNames(self, expression):
+
+        """
+        Returns the names of the references whose values are used by an expression (the arrays of size() queries are
+        not used by their values)
+
+        :param expression: The expression read by the ReadTree class
+        :return: the sorted tuple of the names
+
+        """
+
+        result = self.references.get(id(expression))
+        if result is None:
+            names = set()
+            stack = [expression]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, If_Expression):
+                    for table in (node.conditions, node.expression, node.elseIf, node.elseExpr):
+                        stack.extend(table.values())
+                    continue
+                if isinstance(node, list) and len(node) > 1:
+                    if node[0] == 'reference':
+                        names.add(node[1])
+                    elif node[0] == 'unary_operation' and node[1] == 'reference':
+                        names.add(node[2])
+                stack.extend(x for x in node if isinstance(x, (list, tuple, If_Expression)))
+            result = (expression, tuple(sorted(names)))
+            self.references[id(expression)] = result
+        return result[1]
+
+    def __value(self, node, bindings):
+        if isinstance(node, BinaryOperation):
+            value1 = yield self.__value(node.expression1, bindings)
+            if value1 is None:
+                return None
+            value2 = yield self.__value(node.expression2, bindings)
+            if value2 is None:
+                return None
+            return applyOperation(node.operation, value1, value2)
+        if isinstance(node, FunctionCall):
+            values = []
+            for argument in node.expression:
+                value = yield self.__value(argument, bindings)
+                if value is None:
+                    return None
+                values.append(value)
+            return applyFunction(node.name, values)
+        if not isinstance(node, list) or len(node) < 2:
+            return None
+
+        if node[0] == 'constant':
+            if node[1] == "Integer" and isinstance(node[2], int):
+                return node[2]
+            return None
+        if node[0] == 'reference':
+            return bindings.get(node[1])
+        if node[0] in ['binary_operation', 'function_call']:
+            return (yield self.__value(node[1], bindings))
+        if node[0] == 'dimension_query':
+            dimension = yield self.__value(node[2], bindings)
+            return self.__size(node[1], dimension)
+        if node[0] == 'unary_operation' and node[3] == '-':
+            if node[1] == 'reference':
+                value = bindings.get(node[2])
+            else:
+                value = yield self.__value(node[2], bindings)
+            return None if value is None else -value
+        return None
+
+    def __size(self, name, dimension):
+        dimensions = self.dimensions(name)
+        if dimension is None or not dimensions or not 1 <= dimension <= len(dimensions):
+            return None
+        size = dimensions[dimension - 1]
+        return size if isinstance(size, int) else None
@@ -0,0 +1,146 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import os
+import zipfile
+from collections import namedtuple
+
+# An entry of the central directory of the archive
+IndexEntry = namedtuple('IndexEntry', ['info', 'size', 'compressedSize', 'crc', 'compression'])
+
+
+def archivePath(memberName):
+
+    """
+    Normalizes the name of a member of the archive: backslashes are read as separators, and drive letters, empty,
+    '.' and '..' components are dropped the same way as by zipfile.ZipFile.extract
+
+    :param memberName: The name of the member in the archive
+    :return: the normalized path, the components are separated by '/'
+
+    """
+
+    name = memberName.replace('\\', '/')
+    if len(name) > 1 and name[1] == ':':
+        name = name[2:]
+    return '/'.join(x for x in name.split('/') if x not in ('', '.', '..'))
+
+
+class DirectoryArchive:
+
+    """
+    Class DirectoryArchive lists the files of an unpacked eFMU folder the same way as zipfile.ZipFile.infolist lists
+    the members of an archive, so a ContainerIndex can be built for a folder as well. Nothing is compressed, the
+    CRC of the files is not computed.
+
+    """
+
+    def __init__(self, root, folder):
+        self.root = root
+        self.folder = folder
+
+    def infolist(self):
+        infos = []
+        for dirPath, dirNames, fileNames in os.walk(os.path.join(self.root, self.folder)):
+            dirNames.sort()
+            for name in dirNames + sorted(fileNames):
+                path = os.path.join(dirPath, name)
+                info = zipfile.ZipInfo.from_file(path, os.path.relpath(path, self.root))
+                info.compress_size = info.file_size
+                info.CRC = None
+                infos.append(info)
+        return infos
+
+
+class ContainerIndex:
+
+    """
+    Class ContainerIndex is an index of the members of an eFMU archive, it is built from the central directory of the
+    archive (zipfile.ZipFile.infolist) which is read once, no member is decompressed. It answers the structural checks
+    of the container (which folders and files exist) before and after the extraction, and lists the members to be
+    extracted.
+
+    """
+
+    def __init__(self, archive):
+        self.files = {}
+        self.dirs = {'': set()}
+        self.infos = []
+        for info in archive.infolist():
+            path = archivePath(info.filename)
+            if path == '':
+                continue
+            self.infos.append((path, info))
+            if info.is_dir():
+                self.addDir(path)
+            else:
+                self.files[path] = IndexEntry(info, info.file_size, info.compress_size, info.CRC, info.compress_type)
+                parent, _, name = path.rpartition('/')
+                self.addDir(parent)
+                self.dirs[parent].add(name)
+
+    def addDir(self, path):
+        # the parent folders of a member are not always listed in the archive, they are added to the index as well
+        while path not in self.dirs:
+            self.dirs[path] = set()
+            parent, _, name = path.rpartition('/')
+            self.dirs.setdefault(parent, set()).add(name)
+            path = parent
+
+    @staticmethod
+    def join(parts):
+        return archivePath('/'.join(parts))
+
+    def isDir(self, *parts):
+        return self.join(parts) in self.dirs
+
+    def isFile(self, *parts):
+        return self.join(parts) in self.files
+
+    def entry(self, *parts):
+        return self.files.get(self.join(parts))
+
+    def listDir(self, *parts):
+
+        """
+        Lists the content of a folder of the archive, like os.listdir on the extracted folder
+
+        :param parts: The components of the path of the folder in the archive
+        :return: the sorted names of the files and folders in the folder, an empty list if the folder does not exist
+
+        """
+
+        return sorted(self.dirs.get(self.join(parts), ()))
+
+    def members(self, *parts):
+
+        """
+        Returns the members of the archive located in a folder and its sub folders
+
+        :param parts: The components of the path of the folder in the archive
+        :return: the list of the ZipInfo objects of the members (files and folders) in the order of the archive
+
+        """
+
+        prefix = self.join(parts)
+        if prefix != '':
+            prefix += '/'
+        return [info for path, info in self.infos if path.startswith(prefix)]
+
+    def totalSize(self, *parts):
+        return sum(info.file_size for info in self.members(*parts) if not info.is_dir())
@@ -0,0 +1,190 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import os
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# The time in seconds between two scans of the directory when inotify is not available
+POLL_INTERVAL = 1.0
+# The time in seconds without further changes after which a burst of changes (e.g. a regenerated folder) is complete
+SETTLE_TIME = 0.3
+
+# inotify events (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | \
+             IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+
+    """
+    Class Inotify watches a directory tree with the inotify API of Linux, it is loaded from the C library with ctypes.
+    inotify does not watch sub folders, a watch is added for each folder of the tree, also for new folders.
+
+    """
+
+    def __init__(self, root):
+        libcName = ctypes.util.find_library('c')
+        self.libc = ctypes.CDLL(libcName, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.folders = {}
+        self.root = root
+        self.addTree(root)
+
+    def addTree(self, top):
+        for dirPath, dirNames, fileNames in os.walk(top):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirPath), WATCH_MASK)
+            if wd >= 0:
+                self.folders[wd] = dirPath
+
+    def read(self, timeout):
+
+        """
+        Reads the events of the watched folders
+
+        :param timeout: The maximum time in seconds to wait for an event, None to wait until an event arrives
+        :return: the set of changed paths, empty if no event arrived in time
+
+        """
+
+        changed = set()
+        readable, writable, failed = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed
+        data = os.read(self.fd, 1 << 16)
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            name = os.fsdecode(data[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b'\0'))
+            pos += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # events were lost, the whole tree is reported as changed
+                changed.add(self.root)
+                continue
+            folder = self.folders.get(wd)
+            if folder is None:
+                continue
+            path = os.path.join(folder, name) if name else folder
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.addTree(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Poller:
+
+    """
+    Class Poller watches a directory tree by comparing the modification times and sizes of its files between scans
+
+    """
+
+    def __init__(self, root, interval=POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        for dirPath, dirNames, fileNames in os.walk(self.root):
+            for name in fileNames:
+                path = os.path.join(dirPath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, max(0, deadline - time.monotonic()))
+            time.sleep(wait)
+            snapshot = self.scan()
+            changed = set(path for path in set(snapshot) | set(self.snapshot) if snapshot.get(path) != self.snapshot.get(path))
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+class DirectoryWatcher:
+
+    """
+    Class DirectoryWatcher waits for changes of the files of a directory tree. It uses inotify on Linux and scans the
+    tree periodically on other platforms (or if inotify cannot be used, e.g. when the limit of watches is reached).
+
+    """
+
+    def __init__(self, root, interval=POLL_INTERVAL):
+        self.root = root
+        try:
+            self.backend = Inotify(root)
+        except (OSError, AttributeError, TypeError):
+            self.backend = Poller(root, interval)
+
+    def usesInotify(self):
+        return isinstance(self.backend, Inotify)
+
+    def wait(self):
+
+        """
+        Waits until files of the tree changed, a burst of changes is collected until the tree did not change for
+        SETTLE_TIME seconds
+
+        :return: the sorted list of the changed paths
+
+        """
+
+        changed = set()
+        while len(changed) == 0:
+            try:
+                changed = self.backend.read(None)
+            except InterruptedError:
+                continue
+        while True:
+            more = self.backend.read(SETTLE_TIME)
+            if len(more) == 0:
+                break
+            changed |= more
+        return sorted(changed)
+
+    def close(self):
+        self.backend.close()
@@ -17,25 +17,17 @@
 # permissions and limitations under the "License".
 
 import os
+import posixpath
+from collections import namedtuple
 from lxml import etree as ET
-import hashlib
-
-BLOCKSIZE = 65536
+from data.Checksums import ChecksumService
+from data.ContainerIndex import archivePath
 ALGORITH_CODE_SCHEMA = 'efmiAlgorithmCodeManifest.xsd'
 BEHAVIOR_MODEL_SCHEMA = 'efmiBehavioralModelManifest.xsd'
 EQUATION_CODE_SCHEMA = 'efmiEquationCodeManifest.xsd'
 BINARY_CODE_SCHEMA = 'efmiBinaryCodeManifest.xsd'
 PRODUCTION_CODE_SCHEMA = 'efmiProductionCodeManifest.xsd'
 
-def sha_hash(fileName):
-    hasher = hashlib.sha1()
-    with open(fileName, 'rb') as afile:
-        buf = afile.read(BLOCKSIZE)
-        while len(buf) > 0:
-            hasher.update(buf)
-            buf = afile.read(BLOCKSIZE)
-    return hasher.hexdigest()
-
 def repSchemaFile(schemaFolder):
     for file in schemaFolder:
         if file == ALGORITH_CODE_SCHEMA:
@@ -82,12 +74,20 @@ class ManifetReference:
         return self.checksum
 
 
+# A file listed in the Files element of a manifest
+ManifestFile = namedtuple('ManifestFile', ['name', 'role', 'checksum', 'line'])
+
+
 class Representation:
 
     workingDir = ""
     efmuContent = ""
     schemasFolder = ""
     schemasFolderExist = False
+    # The service which computes the checksums of the files of the eFMU, it is shared by all representations
+    checksums = ChecksumService()
+    # The index of the members of the eFMU archive (of type ContainerIndex), None if the eFMU is read from a folder
+    containerIndex = None
     
 
     def __init__(self, kind=None, name=None, manifest=None, checksum=None, manifestRefId=None):
@@ -149,17 +149,75 @@ class Representation:
                 manifestReference = ManifetReference(id, manifestRefId, checksum)
                 self.manifestReferences.append(manifestReference)
 
+    def getListedFiles(self):
+
+        """
+        Reads the files listed in the Files element of the manifest
+
+        :return: a list of ManifestFile tuples, empty if the manifest does not exist or does not list any files
+
+        """
+
+        listedFiles = []
+        if self.repManifestFound == True:
+            with open(os.path.join(Representation.workingDir, Representation.efmuContent, self.name, self.manifest), mode="rU", encoding='utf-8-sig') as FILE:
+                xml_file_lines = FILE.readlines()
+
+            manifestTree = ET.fromstringlist(xml_file_lines, parser=LineNumberingParser())
+
+            for files in manifestTree.findall('Files'):
+                for file in files.findall('File'):
+                    listedFiles.append(ManifestFile(file.get('name'), file.get('role'), file.get('checksum'), file.sourceline))
+        return listedFiles
+
+    def fingerprint(self):
+
+        """
+        Returns the data which the consistency checks of the representation depend on: its attributes in the
+        __content.xml file and the digests of the files in its folder, in the schemas folder and listed in its manifest.
+        The checks of a representation whose fingerprint did not change give the same results.
+
+        :return: a tuple of the attributes and of (path, digest) pairs, the digest is None for a missing file
+
+        """
+
+        paths = set()
+        if Representation.containerIndex is not None:
+            folders = [self.name] + ([Representation.schemasFolder] if Representation.schemasFolderExist == True else [])
+            for folder in folders:
+                for info in Representation.containerIndex.members(Representation.efmuContent, folder):
+                    if not info.is_dir():
+                        paths.add(archivePath(info.filename))
+        for listedFile in self.getListedFiles():
+            if listedFile.name:
+                paths.add(posixpath.normpath(posixpath.join(Representation.efmuContent, self.name, listedFile.name)))
+
+        digests = []
+        for path in sorted(paths):
+            # the files outside of the eFMU are not read, the check of the listed files rejects them anyway
+            fullPath = os.path.join(Representation.workingDir, *path.split('/'))
+            inside = not path.startswith('/') and path.split('/')[0] != '..'
+            digests.append((path, Representation.checksums.digest(fullPath) if inside and os.path.isfile(fullPath) else None))
+        return (self.kind, self.name, self.manifest, self.checksum, self.manifestRefId, self.rep_schema_file,
+                self.repDirFound, self.repManifestFound, tuple(digests))
+
+    @staticmethod
+    def listDir(*parts):
+        if Representation.containerIndex is not None:
+            return Representation.containerIndex.listDir(Representation.efmuContent, *parts)
+        return os.listdir(os.path.join(Representation.workingDir, Representation.efmuContent, *parts))
+
     def setSechmaFile (self):
         schema_fileName = None
         
         if Representation.schemasFolderExist == True:
-            patheTo_schemas_folder = os.listdir(os.path.join(Representation.workingDir, Representation.efmuContent, Representation.schemasFolder))
+            patheTo_schemas_folder = Representation.listDir(Representation.schemasFolder)
             #print(os.path.join(Representation.workingDir, Representation.efmuContent, Representation.schemasFolder))
             for file in patheTo_schemas_folder:
                 if file == self.kind:
                     #print('\033[92m' + '         The %s folder correctly exists in the %s' % (self.kind, os.path.join(Representation.workingDir, Representation.efmuContent, Representation.schemasFolder)))
                     rep_in_schemas = file
-                    path_to_rep_in_schemas = os.listdir(os.path.join(Representation.workingDir, Representation.efmuContent, Representation.schemasFolder, rep_in_schemas))
+                    path_to_rep_in_schemas = Representation.listDir(Representation.schemasFolder, rep_in_schemas)
                     schema_fileName = repSchemaFile(path_to_rep_in_schemas)
         
         if schema_fileName != None:
@@ -174,14 +232,14 @@ class Representation:
     def setRepDirFound(self):
         dirFound = False
         if self.name is not None and self.kind is not None:
-            pathTo_eFMU_dir = os.listdir(os.path.join(Representation.workingDir, Representation.efmuContent))
+            pathTo_eFMU_dir = Representation.listDir()
             dirFound = findDoc(pathTo_eFMU_dir, self.name)
         self.repDirFound = dirFound
     
     def setRepManifestFound(self):
         manifestFound = False
         if self.repDirFound == True:
-            fullPathDir = os.listdir(os.path.join(Representation.workingDir, Representation.efmuContent, self.name))
+            fullPathDir = Representation.listDir(self.name)
             manifestFound = findDoc(fullPathDir, self.manifest)
         self.repManifestFound = manifestFound
 
@@ -203,8 +261,7 @@ class Representation:
         return False
     
     def compareChecksum(self):
-        calculatedChecksum = sha_hash(os.path.join(Representation.workingDir, Representation.efmuContent, self.name, self.manifest))
-        if self.checksum == calculatedChecksum:
+        if Representation.checksums.matches(os.path.join(Representation.workingDir, Representation.efmuContent, self.name, self.manifest), self.checksum):
             return True
         else:
             return False
@@ -0,0 +1,130 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+from collections import namedtuple
+
+try:
+    import resource
+except ImportError:
+    # the memory limit of the worker processes is only supported on POSIX platforms
+    resource = None
+
+"""
+    - ResourceLimits is a namedtuple which holds the limits of the resources used to check one eFMU, a limit which is
+      None is not checked:
+        maxTotalSize: the number of bytes extracted from the archive
+        maxMembers: the number of members extracted from the archive
+        maxFileSize: the size of one extracted file in bytes
+        maxRatio: the compression ratio of one member (uncompressed size / compressed size)
+        parseTimeout: the time in seconds the parsing of one alg file may take
+        maxMemory: the address space in bytes of a process parsing alg files
+
+"""
+ResourceLimits = namedtuple('ResourceLimits', ['maxTotalSize', 'maxMembers', 'maxFileSize', 'maxRatio', 'parseTimeout', 'maxMemory'])
+
+DEFAULT_LIMITS = ResourceLimits(maxTotalSize=4 << 30, maxMembers=100000, maxFileSize=1 << 30, maxRatio=1000,
+                                parseTimeout=600, maxMemory=2 << 30)
+
+# The compression ratio is only checked for members which are larger than this size, small files of repeated text
+# can have high ratios
+RATIO_CHECK_SIZE = 1 << 20
+
+
+class LimitExceeded(Exception):
+
+    """
+    Raised when the extraction of the archive exceeds one of the resource limits, the message describes the limit
+
+    """
+
+    pass
+
+
+class ExtractionBudget:
+
+    """
+    Class ExtractionBudget accounts for the members and bytes extracted from an archive. The sizes stored in the
+    archive can be forged, so the limits are checked twice: against the sizes of the central directory before a member
+    is extracted (admit), and against the bytes actually decompressed while the member is streamed (consume).
+
+    """
+
+    def __init__(self, limits=DEFAULT_LIMITS):
+        self.limits = limits
+        self.members = 0
+        self.totalSize = 0
+
+    def admit(self, info):
+
+        """
+        Checks the declared size of a member before it is extracted
+
+        :param info: The ZipInfo of the member
+        :raise LimitExceeded: if the member exceeds a limit
+
+        """
+
+        limits = self.limits
+        self.members += 1
+        if limits.maxMembers is not None and self.members > limits.maxMembers:
+            raise LimitExceeded("More than %d members are extracted from the archive" % limits.maxMembers)
+        if info.is_dir():
+            return
+        self.check(info, info.file_size, self.totalSize + info.file_size)
+
+    def consume(self, info, written, size):
+
+        """
+        Accounts for a block of decompressed data of a member
+
+        :param info: The ZipInfo of the member
+        :param written: The number of bytes of the member decompressed so far, including the block
+        :param size: The size of the block in bytes
+        :raise LimitExceeded: if the member exceeds a limit
+
+        """
+
+        self.totalSize += size
+        self.check(info, written, self.totalSize)
+
+    def check(self, info, fileSize, totalSize):
+        limits = self.limits
+        if limits.maxFileSize is not None and fileSize > limits.maxFileSize:
+            raise LimitExceeded("The %s file is larger than %d bytes" % (info.filename, limits.maxFileSize))
+        if limits.maxTotalSize is not None and totalSize > limits.maxTotalSize:
+            raise LimitExceeded("The extracted files are larger than %d bytes" % limits.maxTotalSize)
+        if limits.maxRatio is not None and fileSize > RATIO_CHECK_SIZE and fileSize > limits.maxRatio * max(1, info.compress_size):
+            raise LimitExceeded("The compression ratio of the %s file is higher than %d" % (info.filename, limits.maxRatio))
+
+
+def applyMemoryLimit(maxMemory):
+
+    """
+    Limits the address space of the current process, allocations beyond the limit raise a MemoryError. It is run
+    once by each worker process which parses alg files; without the resource module (Windows) it does nothing.
+
+    :param maxMemory: The limit in bytes, None for no limit
+
+    """
+
+    if maxMemory is None or resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        maxMemory = min(maxMemory, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (maxMemory, hard))
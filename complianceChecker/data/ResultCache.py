@@ -0,0 +1,362 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import os
+import io
+import json
+import time
+import zlib
+import pickle
+import sqlite3
+import hashlib
+from data.Checksums import BUFFER_SIZE
+
+# The maximum size in bytes of all reports kept in the cache, the least recently used reports are removed first
+CACHE_SIZE_LIMIT = 64 << 20
+# The time in seconds a process waits for another process which writes to the cache
+LOCK_TIMEOUT = 30
+# The tables of the cache, and the number of entries read at once when the least recently used entries are evicted
+CACHE_TABLES = ['results', 'sections', 'objects']
+EVICTION_BATCH = 64
+
+_fingerprint = None
+
+
+def checkerFingerprint():
+
+    """
+    Returns a fingerprint of the checker: the digest of all its source files (including the GALEC grammar) and of the
+    versions of the parser and XML libraries. A changed checker does not replay the reports of an older one.
+
+    :return: the hexadecimal fingerprint
+
+    """
+
+    global _fingerprint
+    if _fingerprint is None:
+        import lark
+        from lxml import etree
+        hasher = hashlib.sha256()
+        checkerDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for dirPath, dirNames, fileNames in os.walk(checkerDir):
+            dirNames.sort()
+            for fileName in sorted(fileNames):
+                if os.path.splitext(fileName)[1] == '.py':
+                    path = os.path.join(dirPath, fileName)
+                    hasher.update(os.path.relpath(path, checkerDir).replace(os.path.sep, '/').encode('utf-8'))
+                    with open(path, 'rb') as f:
+                        hasher.update(hashlib.sha256(f.read()).digest())
+        hasher.update(('lark %s lxml %s' % (lark.__version__, etree.__version__)).encode('utf-8'))
+        _fingerprint = hasher.hexdigest()
+    return _fingerprint
+
+
+def archiveDigest(filename):
+    hasher = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        buf = f.read(BUFFER_SIZE)
+        while len(buf) > 0:
+            hasher.update(buf)
+            buf = f.read(BUFFER_SIZE)
+    return hasher.hexdigest()
+
+
+def packObject(value, pickler=pickle.Pickler):
+    # the objects are stored pickled and compressed (fast compression, the objects are read far more often); a pickler
+    # class with its own dispatch_table changes how some types are pickled without changing it for the whole process
+    buffer = io.BytesIO()
+    pickler(buffer, pickle.HIGHEST_PROTOCOL).dump(value)
+    return zlib.compress(buffer.getvalue(), 1)
+
+
+def unpackObject(data):
+    return pickle.loads(zlib.decompress(data))
+
+
+class ReportRecorder(io.TextIOBase):
+
+    """
+    Class ReportRecorder records the report printed by the checker while passing it on to the original stream (unless
+    echo is False)
+
+    """
+
+    def __init__(self, stream, echo=True):
+        self.stream = stream
+        self.echo = echo
+        self.parts = []
+
+    def write(self, s):
+        self.parts.append(s)
+        if not self.echo:
+            return len(s)
+        return self.stream.write(s)
+
+    def flush(self):
+        self.stream.flush()
+
+    def getReport(self):
+        return ''.join(self.parts)
+
+
+class ResultCache:
+
+    """
+    Class ResultCache keeps the reports of checked eFMUs in a SQLite database, keyed by the content of the archive,
+    the fingerprint of the checker and the options which change the report. A cached report is printed again instead
+    of checking an unchanged eFMU another time.
+
+    The results of parts of a check (sections, e.g. the checks of one representation or of one alg file) are kept as
+    well, keyed by the digests of the files they depend on, so a changed eFMU only checks its changed parts again.
+    Python objects (e.g. the read data of an alg file) are kept pickled and compressed, see getObject and putObject.
+
+    - The database uses write-ahead logging, so several processes (e.g. parallel CI jobs) can read and write it at the
+      same time; a process which cannot get the database in LOCK_TIMEOUT seconds goes on without the cache.
+    - The reports, the sections and the objects are evicted least recently used first once their total size exceeds
+      sizeLimit.
+
+    """
+
+    def __init__(self, path, sizeLimit=CACHE_SIZE_LIMIT):
+        self.path = path
+        self.sizeLimit = sizeLimit
+        self.connection = None
+
+    def connect(self):
+        if self.connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, report TEXT NOT NULL, '
+                               'status INTEGER NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+            connection.execute('CREATE TABLE IF NOT EXISTS sections (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                               'size INTEGER NOT NULL, used REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS sections_used ON sections (used)')
+            connection.execute('CREATE TABLE IF NOT EXISTS objects (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                               'size INTEGER NOT NULL, used REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS objects_used ON objects (used)')
+            self.createUsage(connection)
+            self.connection = connection
+        return self.connection
+
+    @staticmethod
+    def createUsage(connection):
+        # the total size of the entries is kept up to date by triggers, so it is not summed up on each store. The
+        # trigger before an insert also covers the entry which INSERT OR REPLACE deletes: the delete triggers do not
+        # fire for it (recursive triggers are off)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL)')
+            connection.execute('INSERT OR IGNORE INTO usage (id, size) VALUES (0, (SELECT IFNULL(SUM(size), 0) FROM results) + '
+                               '(SELECT IFNULL(SUM(size), 0) FROM sections) + (SELECT IFNULL(SUM(size), 0) FROM objects))')
+            for table in CACHE_TABLES:
+                connection.execute('CREATE TRIGGER IF NOT EXISTS {0}_insert BEFORE INSERT ON {0} BEGIN UPDATE usage SET '
+                                   'size = size + new.size - IFNULL((SELECT size FROM {0} WHERE key = new.key), 0); '
+                                   'END'.format(table))
+                connection.execute('CREATE TRIGGER IF NOT EXISTS {0}_delete AFTER DELETE ON {0} BEGIN UPDATE usage SET '
+                                   'size = size - old.size; END'.format(table))
+            connection.execute('COMMIT')
+        except sqlite3.Error:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+
+    def evict(self, connection):
+        total = connection.execute('SELECT size FROM usage').fetchone()[0]
+        while total > self.sizeLimit:
+            # the least recently used entries of each table are found with the index on used
+            rows = connection.execute(' UNION ALL '.join("SELECT * FROM (SELECT '%s', key, size, used FROM %s ORDER BY used "
+                                                        "LIMIT %d)" % (table, table, EVICTION_BATCH) for table in CACHE_TABLES)
+                                      + ' ORDER BY used LIMIT %d' % EVICTION_BATCH).fetchall()
+            if len(rows) == 0:
+                break
+            for table, rowKey, size, used in rows:
+                if total <= self.sizeLimit:
+                    break
+                connection.execute('DELETE FROM %s WHERE key = ?' % table, (rowKey,))
+                total -= size
+
+    def store(self, statement, rows):
+        try:
+            connection = self.connect()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany(statement, rows)
+                self.evict(connection)
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                raise
+        except (sqlite3.Error, OSError):
+            # the cache only saves time, the checks do not depend on it
+            pass
+
+    @staticmethod
+    def key(filename, *options):
+
+        """
+        Returns the cache key of an eFMU archive
+
+        :param filename: The name of the eFMU archive file
+        :param options: The options of the check which change the report
+        :return: the hexadecimal key
+
+        """
+
+        hasher = hashlib.sha256()
+        hasher.update(archiveDigest(filename).encode('utf-8'))
+        hasher.update(checkerFingerprint().encode('utf-8'))
+        hasher.update(repr(options).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def get(self, key):
+
+        """
+        Returns the cached report of an eFMU archive and marks it as recently used
+
+        :param key: The cache key of the archive (see key)
+        :return: (report, status) if the report is cached, otherwise None
+
+        """
+
+        try:
+            connection = self.connect()
+            row = connection.execute('SELECT report, status FROM results WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                connection.execute('UPDATE results SET used = ? WHERE key = ?', (time.time(), key))
+            return row
+        except (sqlite3.Error, OSError):
+            return None
+
+    def put(self, key, report, status):
+
+        """
+        Stores the report of an eFMU archive and evicts the least recently used reports above the size limit
+
+        :param key: The cache key of the archive (see key)
+        :param report: The printed report
+        :param status: The return code of the check
+
+        """
+
+        self.store('INSERT OR REPLACE INTO results (key, report, status, size, used) VALUES (?, ?, ?, ?, ?)',
+                   [(key, report, status, len(report), time.time())])
+
+    @staticmethod
+    def sectionKey(*parts):
+
+        """
+        Returns the cache key of a section of a check
+
+        :param parts: The name of the section and the digests and options it depends on
+        :return: the hexadecimal key
+
+        """
+
+        hasher = hashlib.sha256()
+        hasher.update(checkerFingerprint().encode('utf-8'))
+        hasher.update(repr(parts).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def getSection(self, key):
+
+        """
+        Returns the cached result of a section and marks it as recently used
+
+        :param key: The cache key of the section (see sectionKey)
+        :return: the result (a JSON value) if it is cached, otherwise None
+
+        """
+
+        try:
+            connection = self.connect()
+            row = connection.execute('SELECT value FROM sections WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE sections SET used = ? WHERE key = ?', (time.time(), key))
+            return json.loads(row[0])
+        except (sqlite3.Error, OSError, ValueError):
+            return None
+
+    def putSection(self, key, value):
+
+        """
+        Stores the result of a section
+
+        :param key: The cache key of the section (see sectionKey)
+        :param value: The result, a JSON value
+
+        """
+
+        text = json.dumps(value)
+        self.store('INSERT OR REPLACE INTO sections (key, value, size, used) VALUES (?, ?, ?, ?)',
+                   [(key, text, len(text), time.time())])
+
+    def getObject(self, key):
+
+        """
+        Returns a cached Python object and marks it as recently used
+
+        :param key: The cache key of the object (see sectionKey)
+        :return: the object if it is cached, otherwise None
+
+        """
+
+        try:
+            connection = self.connect()
+            row = connection.execute('SELECT value FROM objects WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE objects SET used = ? WHERE key = ?', (time.time(), key))
+            return unpackObject(row[0])
+        except Exception:
+            # a damaged entry (or one written by other versions of the libraries) is read as missing
+            return None
+
+    def putObject(self, key, value):
+
+        """
+        Stores a Python object, pickled and compressed
+
+        :param key: The cache key of the object (see sectionKey)
+        :param value: The object, it must be picklable
+
+        """
+
+        self.putPacked([(key, packObject(value))])
+
+    def putPacked(self, items):
+
+        """
+        Stores Python objects which are already packed (see packObject), e.g. by worker processes
+
+        :param items: The list of (cache key, packed object) pairs
+
+        """
+
+        if len(items) > 0:
+            now = time.time()
+            self.store('INSERT OR REPLACE INTO objects (key, value, size, used) VALUES (?, ?, ?, ?)',
+                       [(key, data, len(data), now) for key, data in items])
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
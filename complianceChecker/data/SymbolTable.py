@@ -0,0 +1,126 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+from collections.abc import Mapping
+
+PUBLIC_SCOPE = 'public'
+PROTECTED_SCOPE = 'protected'
+LOCAL_SCOPE = 'local'
+
+# The order in which the scopes of a chain are searched: like the merged dictionary {**public, **local, **protected}
+# the symbol tables replace, a protected variable of the block wins over a local variable of a function with the same
+# name, and a local variable wins over a public variable
+LOOKUP_ORDER = [PROTECTED_SCOPE, LOCAL_SCOPE, PUBLIC_SCOPE]
+
+
+class SymbolTable(Mapping):
+
+    """
+    Class SymbolTable represents one scope of declared variables (variable name -> VarTypeCausality). Each scope is
+    chained to the scope it is nested in, so the symbol table of a function is built as:
+
+        public variables -> protected variables -> local variables of the function
+
+    A lookup searches the scopes of the chain in the order of LOOKUP_ORDER, so protected variables shadow local
+    variables and local variables shadow public variables. The dictionaries of the scopes are not copied; the public and protected scopes of a block are
+    created once and shared by all functions of the block and by all validators.
+
+    The class behaves like a read-only dictionary of all visible variables, so it can be passed wherever a dictionary
+    of variables is expected.
+
+    """
+
+    def __init__(self, symbols=None, parent=None, scope=PUBLIC_SCOPE):
+        self.symbols = symbols if symbols is not None else {}
+        self.parent = parent
+        self.scope = scope
+        # the scopes of the chain in the order of the lookups, scopes which are not in LOOKUP_ORDER are searched first
+        chain = [self] + (parent.order if parent is not None else [])
+        self.order = sorted(chain, key=lambda x: LOOKUP_ORDER.index(x.scope) if x.scope in LOOKUP_ORDER else -1)
+
+    def newScope(self, symbols, scope=LOCAL_SCOPE):
+
+        """
+        Creates a scope nested in this scope
+
+        :param symbols: Dictionary of the variables declared in the new scope
+        :param scope: The name of the new scope
+        :return: The symbol table of the new scope
+
+        """
+
+        return SymbolTable(symbols, self, scope)
+
+    def lookup(self, name):
+
+        """
+        Finds the declaration of a variable in this scope or in any enclosing scope
+
+        :param name: The name of the variable
+        :return: The VarTypeCausality of the variable, None if it is not declared
+
+        """
+
+        for table in self.order:
+            varTypeCausality = table.symbols.get(name)
+            if varTypeCausality is not None:
+                return varTypeCausality
+        return None
+
+    def getScope(self, scope):
+
+        """
+        Returns the variables declared in the given scope of the chain (for example the public variables of the block)
+
+        :param scope: The name of the scope
+        :return: Dictionary of the variables declared in the scope, empty if the chain does not contain the scope
+
+        """
+
+        table = self
+        while table is not None:
+            if table.scope == scope:
+                return table.symbols
+            table = table.parent
+        return {}
+
+    def get(self, name, default=None):
+        varTypeCausality = self.lookup(name)
+        if varTypeCausality is None:
+            return default
+        return varTypeCausality
+
+    def __getitem__(self, name):
+        varTypeCausality = self.lookup(name)
+        if varTypeCausality is None:
+            raise KeyError(name)
+        return varTypeCausality
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+    def __iter__(self):
+        seen = set()
+        for table in self.order:
+            for name in table.symbols:
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
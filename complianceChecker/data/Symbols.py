@@ -0,0 +1,71 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+"""
+The names of variables and of array elements are used as keys of the symbol tables and of the read statements. They
+are interned: every name is one shared string object, so the names do not take memory per occurrence, their hashes
+are computed once and two names are compared by identity. Array elements are built from the name of the array and
+the tuple of indexes (for example ('x', (1, 2)) -> 'x[1,2]'), the same way for declarations and for references.
+
+The table of the element names only saves building a name again, the identity of the names comes from sys.intern. It
+is scoped to one read (see clearSymbols), so the watch mode and the language server, which run for a long time, do not
+keep the names of all edits; a name which is still used stays interned by the objects which refer to it.
+
+"""
+
+import sys
+
+# (array name, tuple of indexes) -> interned element name
+_elements = {}
+
+
+def clearSymbols():
+    # forgets the element names built so far, e.g. before a chunk of an alg file or a container is read
+    _elements.clear()
+
+
+def symbol(name):
+
+    """
+    Returns the interned name of a variable
+
+    :param name: The name of the variable
+    :return: the shared string object of the name
+
+    """
+
+    return sys.intern(name)
+
+
+def elementSymbol(name, indexes):
+
+    """
+    Returns the interned name of an array element
+
+    :param name: The name of the array
+    :param indexes: The tuple of indexes of the element (integers, starting at 1)
+    :return: the shared string object of the element name (for example x[1,2])
+
+    """
+
+    key = (name, indexes)
+    element = _elements.get(key)
+    if element is None:
+        element = sys.intern(name + "[" + ",".join([str(index) for index in indexes]) + "]")
+        _elements[key] = element
+    return element
@@ -0,0 +1,49 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import types
+
+
+def trampoline(steps):
+
+    """
+    Runs a recursive computation at a constant depth of the Python stack. The computation is written as generators:
+    instead of calling itself, a generator yields the generator of the sub-computation and receives its result, e.g.
+    "left = yield self.__expression(node.children[0])"; the value returned by a generator is its result. The pending
+    generators are kept on an explicit stack, so the depth of the computation (e.g. of a sum of thousands of terms) is
+    only limited by the memory.
+
+    :param steps: The generator of the computation
+    :return: the result of the computation
+
+    """
+
+    stack = [steps]
+    value = None
+    while stack:
+        try:
+            step = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        if not isinstance(step, types.GeneratorType):
+            raise TypeError('a step of a computation must yield a generator, not %r' % (step,))
+        stack.append(step)
+        value = None
+    return value
@@ -17,7 +17,48 @@
 # permissions and limitations under the "License".
 
 import ComplianceChecker
+from data.ResourceLimits import ResourceLimits, DEFAULT_LIMITS
+import argparse
 import sys
 
 if __name__ == "__main__":
-    sys.exit(ComplianceChecker.read_model_container(sys.argv[1]))
\ No newline at end of file
+    argumentParser = argparse.ArgumentParser(description="Checks an eFMU archive for conformance with the eFMI Standard")
+    argumentParser.add_argument("filename", help="the eFMU archive (zip file ending in *.fmu, containing an 'eFMU' directory), "
+                                                 "or an unpacked eFMU directory")
+    argumentParser.add_argument("-j", "--jobs", type=int, default=1,
+                                help="number of worker processes used to validate the functions of the algorithm code (default: 1)")
+    argumentParser.add_argument("--max-total-size", type=int, default=DEFAULT_LIMITS.maxTotalSize >> 20, metavar="MB",
+                                help="maximum size of all files extracted from the archive in MiB, 0 for no limit (default: %(default)s)")
+    argumentParser.add_argument("--max-members", type=int, default=DEFAULT_LIMITS.maxMembers, metavar="N",
+                                help="maximum number of members extracted from the archive, 0 for no limit (default: %(default)s)")
+    argumentParser.add_argument("--max-file-size", type=int, default=DEFAULT_LIMITS.maxFileSize >> 20, metavar="MB",
+                                help="maximum size of one extracted file in MiB, 0 for no limit (default: %(default)s)")
+    argumentParser.add_argument("--max-ratio", type=int, default=DEFAULT_LIMITS.maxRatio, metavar="N",
+                                help="maximum compression ratio of one member of the archive, 0 for no limit (default: %(default)s)")
+    argumentParser.add_argument("--parse-timeout", type=float, default=DEFAULT_LIMITS.parseTimeout, metavar="SECONDS",
+                                help="maximum time to parse one alg file, 0 for no limit (default: %(default)s)")
+    argumentParser.add_argument("--max-memory", type=int, default=DEFAULT_LIMITS.maxMemory >> 20, metavar="MB",
+                                help="maximum memory of a process parsing alg files in MiB, 0 for no limit (default: %(default)s)")
+    argumentParser.add_argument("--no-cache", action="store_true",
+                                help="check the eFMU again even if its report is in the result cache")
+    argumentParser.add_argument("--watch", action="store_true",
+                                help="check the unpacked eFMU directory again each time its files change, and print the new and resolved findings")
+    argumentParser.add_argument("--level", choices=sorted(ComplianceChecker.CHECK_LEVELS), default="full",
+                                help="the checks which are run: the structure of the container and the checksums only, also the XML Schema "
+                                     "validations and the consistency of the manifests, or also the checks of the algorithm code (default: %(default)s)")
+    argumentParser.add_argument("--max-findings", type=int, default=0, metavar="N",
+                                help="stop the check once N findings were reported, 0 for no limit (default: %(default)s)")
+    argumentParser.add_argument("--fail-fast", action="store_true",
+                                help="stop the check at the first finding (the same as --max-findings 1)")
+    arguments = argumentParser.parse_args()
+    limits = ResourceLimits(maxTotalSize=(arguments.max_total_size << 20) or None,
+                            maxMembers=arguments.max_members or None,
+                            maxFileSize=(arguments.max_file_size << 20) or None,
+                            maxRatio=arguments.max_ratio or None,
+                            parseTimeout=arguments.parse_timeout or None,
+                            maxMemory=(arguments.max_memory << 20) or None)
+    level = ComplianceChecker.CHECK_LEVELS[arguments.level]
+    maxFindings = 1 if arguments.fail_fast else (arguments.max_findings or None)
+    if arguments.watch:
+        sys.exit(ComplianceChecker.watch_model_directory(arguments.filename, arguments.jobs, limits, not arguments.no_cache, level, maxFindings))
+    sys.exit(ComplianceChecker.read_model_container(arguments.filename, arguments.jobs, limits, not arguments.no_cache, level, maxFindings))
\ No newline at end of file
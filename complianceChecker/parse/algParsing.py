@@ -0,0 +1,744 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import os
+import re
+import copyreg
+import pickle
+import time
+import hashlib
+from collections import namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from lark import Lark, Token, Tree, exceptions
+from parse.grammars import grammar
+from parse.larkTransformer import ReadTree
+from data.ResourceLimits import DEFAULT_LIMITS, applyMemoryLimit
+from data.ResultCache import packObject, unpackObject
+from data.SymbolTable import PUBLIC_SCOPE, PROTECTED_SCOPE
+
+"""
+    - AlgParseResult is a namedtuple which holds the data read from an alg file (or a part of it) by the ReadTree
+      transformer: the public variables, the protected variables and the functions of the block, and the messages of
+      the parser for all parts of the file which cannot be parsed. variables and protectedVariables are None if the
+      declarations of the block cannot be parsed. fingerprints maps the name of each function to the fingerprint of its
+      chunk (see chunkFingerprint), a function whose fingerprint did not change gives the same validation results.
+      queries holds the names of the arrays of the size() queries of a function chunk which are not declared in the
+      chunk: the chunk is read again with the dimensions of the arrays of the block (see readBlockQueries).
+
+"""
+AlgParseResult = namedtuple('AlgParseResult', ['variables', 'protectedVariables', 'functions', 'errors', 'fingerprints',
+                                               'queries'], defaults=[()])
+
+# Comments are skipped by the pre-scan, they may contain the keywords searched for
+COMMENT = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+# The beginning of a function declaration: "function Name" or "method Name"
+FUNCTION_HEADER = re.compile(r"\b(?:function|method)\s+([A-Za-z_]\w*|'(?:[^'\\]|\\.)*')")
+# The end of a statement or declaration, and the keywords after which a statement starts (sections, loops, branches)
+STATEMENT_START = re.compile(r";|\b(?:algorithm|protected|public|loop|then|else)\b")
+# The maximum number of syntax errors reported per chunk, each error costs one more parse of the chunk
+MAX_CHUNK_ERRORS = 10
+
+# The parser is built once per process and reused for all alg files parsed by the process
+_parser = None
+
+
+def getParser():
+    global _parser
+    if _parser is None:
+        _parser = Lark(grammar, start=['start', 'function_declaration'], lexer="dynamic_complete", propagate_positions=True)
+    return _parser
+
+
+def functionSpans(s):
+
+    """
+    Finds the function declarations of an alg file, a function declaration starts with "function Name" (or "method
+    Name") and ends with "end Name;". Functions can not be nested, so every function keyword outside of comments
+    starts a function declaration of the block.
+
+    :param s: The content of the alg file
+    :return: a list of (start, stop) positions of the function declarations in s
+
+    """
+
+    text = COMMENT.sub(lambda m: re.sub(r'[^\n]', ' ', m.group()), s)
+    spans = []
+    pos = 0
+    while True:
+        header = FUNCTION_HEADER.search(text, pos)
+        if header is None:
+            break
+        end = re.compile(r'\bend\s+' + re.escape(header.group(1)) + r'\s*;').search(text, header.end())
+        if end is None:
+            # the rest of the file is parsed together with the declarations of the block
+            break
+        spans.append((header.start(), end.end()))
+        pos = end.end()
+    return spans
+
+
+def splitChunks(s):
+
+    """
+    Splits an alg file into chunks which are parsed separately: the block without its functions, and each function.
+    The functions are blanked out of the block, only their line breaks are kept, so the lines of the block do not
+    change.
+
+    :param s: The content of the alg file
+    :return: a list of (text, start symbol, number of lines before the chunk) tuples, the block is the first chunk
+
+    """
+
+    blockText = []
+    functions = []
+    pos = 0
+    for (start, stop) in functionSpans(s):
+        blockText.append(s[pos:start])
+        blockText.append('\n' * s.count('\n', start, stop))
+        functions.append((s[start:stop], 'function_declaration', s.count('\n', 0, start)))
+        pos = stop
+    blockText.append(s[pos:])
+    return [(''.join(blockText), 'start', 0)] + functions
+
+
+def reduceTree(tree):
+
+    """
+    Pickles a parse tree as a flat list of its nodes, the children of a node are stored before the node and refer to
+    it by their index. Lark pickles a tree recursively, once per level of the tree, which fails for deep trees (a sum of
+    n terms is n levels deep); the function is only used for the trees pickled by a TreePickler (see packTree).
+
+    :param tree: The parse tree
+    :return: the reduced tree (see buildTree)
+
+    """
+
+    index = {}
+    nodes = []
+    stack = [(tree, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in index:
+            continue
+        children = [x for x in node.children if isinstance(x, Tree) and id(x) not in index]
+        if not ready and children:
+            stack.append((node, True))
+            stack.extend((x, False) for x in children)
+            continue
+        index[id(node)] = len(nodes)
+        # the children which are subtrees are stored as indexes, the tokens as they are
+        nodes.append((node.data, node._meta, [index[id(x)] if isinstance(x, Tree) else x for x in node.children]))
+    return buildTree, (nodes,)
+
+
+def buildTree(nodes):
+
+    """
+    Rebuilds a parse tree pickled by reduceTree
+
+    :param nodes: The list of the nodes of the tree
+    :return: the parse tree
+
+    """
+
+    trees = []
+    for data, meta, children in nodes:
+        trees.append(Tree(data, [trees[x] if isinstance(x, int) else x for x in children], meta))
+    return trees[-1]
+
+
+class TreePickler(pickle.Pickler):
+
+    """
+    Class TreePickler pickles the parse trees with reduceTree, the other picklers of the process (and the other users of
+    Lark) keep the pickling of Lark
+
+    """
+
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[Tree] = reduceTree
+
+
+def packTree(tree):
+
+    """
+    Packs a parse tree for the cache or for the transfer from a worker process, unpackObject rebuilds it
+
+    :param tree: The parse tree
+    :return: the packed tree (see packObject)
+
+    """
+
+    return packObject(tree, TreePickler)
+
+
+def shiftLines(tree, offset):
+
+    """
+    Adds an offset to the line numbers of all nodes and tokens of a parse tree
+
+    :param tree: The parse tree of a chunk
+    :param offset: The number of lines before the chunk in the alg file
+
+    """
+
+    if offset == 0:
+        return
+    for subtree in tree.iter_subtrees():
+        meta = subtree.meta
+        if getattr(meta, 'line', None) is not None:
+            meta.line += offset
+            meta.end_line += offset
+        for child in subtree.children:
+            if isinstance(child, Token) and child.line is not None:
+                child.line += offset
+                # the end lines of tokens are not kept when Lark pickles them (e.g. in a cached tree)
+                if child.end_line is not None:
+                    child.end_line += offset
+
+
+def chunkFingerprint(chunk):
+
+    """
+    Returns the fingerprint of a chunk: the digest of its start symbol, its position (the lines of the read data are
+    the lines of the file) and its text
+
+    :param chunk: The chunk (text, start symbol, number of lines before the chunk)
+    :return: the hexadecimal fingerprint
+
+    """
+
+    text, start, lineOffset = chunk
+    return hashlib.sha256(('%s %d\n%s' % (start, lineOffset, text)).encode('utf-8')).hexdigest()
+
+
+def treeKey(chunk):
+    # the parse tree of a chunk does not depend on the position of the chunk, its lines are shifted when it is read
+    text, start, lineOffset = chunk
+    return ('tree', start, hashlib.sha256(text.encode('utf-8')).hexdigest())
+
+
+def errorResult(chunk, messages):
+    text, start, lineOffset = chunk
+    if start == 'start':
+        return AlgParseResult(None, None, {}, list(messages), {})
+    return AlgParseResult({}, {}, {}, list(messages), {})
+
+
+def blank(text):
+    # the line breaks are kept, so the lines of the text after the blanked part do not change
+    return re.sub(r'[^\n]', ' ', text)
+
+
+def skipStatement(text, pos):
+
+    """
+    Blanks the statement (or declaration) of a chunk which contains a syntax error: from the end of the previous
+    statement, or of the keyword which starts a section, a loop or a branch, up to the next ';'
+
+    :param text: The text of the chunk
+    :param pos: The position of the syntax error in the text
+    :return: the text with the statement blanked out, None if there is no statement to skip
+
+    """
+
+    if pos is None or pos < 0:
+        return None
+    code = COMMENT.sub(lambda m: blank(m.group()), text)
+    stop = code.find(';', pos)
+    if stop < 0:
+        return None
+    start = 0
+    for match in STATEMENT_START.finditer(code, 0, pos):
+        start = match.end()
+    return text[:start] + blank(text[start:stop + 1]) + text[stop + 1:]
+
+
+def syntaxError(e, text, lineOffset):
+    # the messages contain the lines of the file, the end of the input has no line in the message of the parser
+    if isinstance(e, exceptions.UnexpectedEOF):
+        return "Unexpected end of the input at line %d. %s" % (lineOffset + text.count('\n') + 1, e)
+    e.line += lineOffset
+    return str(e)
+
+
+def parseText(chunk):
+
+    """
+    Parses a chunk of an alg file and collects all its syntax errors: after a syntax error the statement which
+    contains it is skipped (see skipStatement) and the chunk is parsed again, until it is parsed or MAX_CHUNK_ERRORS
+    errors are collected. An unexpected end of the input after a skipped statement is not reported, it is caused by
+    the skipped part (e.g. the end of a loop).
+
+    :param chunk: The chunk (text, start symbol, number of lines before the chunk)
+    :return: the parse tree with the lines of the chunk and an empty list if the chunk has no syntax error, otherwise
+             None and the messages of the syntax errors
+
+    """
+
+    text, start, lineOffset = chunk
+    errors = []
+    while text is not None and len(errors) < MAX_CHUNK_ERRORS:
+        try:
+            tree = getParser().parse(text, start=start)
+        except exceptions.UnexpectedEOF as e:
+            if len(errors) == 0:
+                errors.append(syntaxError(e, text, lineOffset))
+            break
+        except exceptions.UnexpectedInput as e:
+            errors.append(syntaxError(e, text, lineOffset))
+            text = skipStatement(text, e.pos_in_stream)
+            continue
+        if len(errors) == 0:
+            return tree, errors
+        break
+    return None, errors
+
+
+def readChunkTree(tree, chunk, dimensions=None):
+
+    """
+    Reads the variables and functions of a parse tree of a chunk using the ReadTree transformer
+
+    :param tree: The parse tree of the chunk, with the lines of the chunk (it is shifted to the lines of the file)
+    :param chunk: The chunk (text, start symbol, number of lines before the chunk)
+    :param dimensions: The dimensions of the arrays of the block (see blockDimensions) for the size() queries of a
+                       function chunk, None if they are not known yet
+    :return: the read data of the chunk (of type AlgParseResult), a chunk which cannot be read (e.g. a construct of
+             the grammar which is not supported by ReadTree) is reported like a syntax error
+
+    """
+
+    shiftLines(tree, chunk[2])
+    ReadTree.reset(dimensions)
+    try:
+        ReadTree().transform(tree)
+    except exceptions.VisitError as e:
+        line = getattr(getattr(e.obj, 'meta', None), 'line', None) or chunk[2] + 1
+        return errorResult(chunk, ["The %s rule at line %d cannot be read: %s" % (e.rule, line, e.orig_exc)])
+    functions = ReadTree.getFunctions()
+    fingerprint = chunkFingerprint(chunk)
+    return AlgParseResult(ReadTree.variables(), ReadTree.protectedVariables(), functions, list(ReadTree.readErrors()),
+                          {name: fingerprint for name in functions.keys()}, tuple(sorted(ReadTree.sizeQueries())))
+
+
+def blockDimensions(block):
+
+    """
+    Returns the dimensions of the arrays of the block of an alg file
+
+    :param block: The read data of the block (of type AlgParseResult)
+    :return: the dictionary array name -> (scope, dimensions), empty if the declarations of the block cannot be parsed
+
+    """
+
+    dimensions = {}
+    for scope, variables in ((PUBLIC_SCOPE, block.variables), (PROTECTED_SCOPE, block.protectedVariables)):
+        for name, declared in (variables or {}).items():
+            if declared.dimensions:
+                dimensions[name] = (scope, tuple(declared.dimensions))
+    return dimensions
+
+
+def needsBlock(result, dimensions):
+    # a function chunk is read again if it queries the size of an array of the block
+    return any(name in dimensions for name in result.queries)
+
+
+def parseChunk(chunk):
+
+    """
+    Parses a chunk of an alg file and reads its variables and functions
+
+    :param chunk: The chunk (text, start symbol, number of lines before the chunk)
+    :return: the read data of the chunk (of type AlgParseResult) and the packed parse tree (see packTree) with the
+             lines of the chunk, None if the chunk cannot be parsed
+
+    """
+
+    tree, errors = parseText(chunk)
+    if tree is None:
+        return errorResult(chunk, errors), None
+    packedTree = packTree(tree)
+    return readChunkTree(tree, chunk), packedTree
+
+
+def parse_alg_chunk(text, start='start', lineOffset=0, dimensions=None):
+
+    """
+    Parses a chunk of an alg file and reads its variables and functions using the ReadTree transformer
+
+    :param text: The text of the chunk
+    :param start: The start symbol of the chunk ('start' for the block, 'function_declaration' for a function)
+    :param lineOffset: The number of lines before the chunk in the alg file
+    :param dimensions: The dimensions of the arrays of the block (see blockDimensions), None if not known
+    :return: the read data of the chunk (of type AlgParseResult)
+
+    """
+
+    chunk = (text, start, lineOffset)
+    tree, errors = parseText(chunk)
+    if tree is None:
+        return errorResult(chunk, errors)
+    return readChunkTree(tree, chunk, dimensions)
+
+
+def mergeResults(results):
+
+    """
+    Merges the read data of the chunks of an alg file
+
+    :param results: The read data of the chunks, the block first and then the functions in the order of the file
+    :return: the read data of the file (of type AlgParseResult)
+
+    """
+
+    block = results[0]
+    functions = dict(block.functions)
+    errors = list(block.errors)
+    fingerprints = dict(block.fingerprints)
+    for result in results[1:]:
+        functions.update(result.functions)
+        errors += result.errors
+        fingerprints.update(result.fingerprints)
+    return AlgParseResult(block.variables, block.protectedVariables, functions, errors, fingerprints)
+
+
+def readAlgFile(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def parse_alg_file(path):
+
+    """
+    Parses an alg file chunk by chunk (see splitChunks) and reads its variables and functions, a syntax error in a
+    function does not stop reading the other functions
+
+    :param path: The path of the alg file
+    :return: the read data of the file (of type AlgParseResult)
+
+    """
+
+    chunks = splitChunks(readAlgFile(path))
+    block = parse_alg_chunk(*chunks[0])
+    dimensions = blockDimensions(block)
+    return mergeResults([block] + [parse_alg_chunk(*chunk, dimensions=dimensions) for chunk in chunks[1:]])
+
+
+def limitResult(chunk, message):
+
+    """
+    Returns the read data of a chunk whose parsing exceeded a resource limit
+
+    :param chunk: The chunk (text, start symbol, number of lines before the chunk)
+    :param message: The description of the exceeded limit
+    :return: the read data of the chunk (of type AlgParseResult), without variables if the chunk is the block
+
+    """
+
+    text, start, lineOffset = chunk
+    return errorResult(chunk, ["Parsing the lines %d to %d %s" % (lineOffset + 1, lineOffset + text.count('\n') + 1, message)])
+
+
+class ReadChunk(Future):
+
+    """
+    Class ReadChunk holds the read data of a chunk which is not parsed by a worker process (e.g. whose parse tree is
+    cached or which was already waited for), it is a future which is already done like the finished results of the
+    worker processes. timedOut tells whether the chunk was reported because its parsing exceeded the time limit.
+
+    """
+
+    def __init__(self, value, timedOut=False):
+        super().__init__()
+        self.set_result(value)
+        self.timedOut = timedOut
+
+
+def parsedBy(future):
+
+    """
+    Tells whether a chunk was parsed by its future, the futures which were cancelled or lost with a broken pool of
+    workers did not parse it
+
+    :param future: The future of the read data of the chunk
+    :return: True if the future is done and did not fail because of the pool
+
+    """
+
+    return future.done() and not future.cancelled() and not isinstance(future.exception(), BrokenProcessPool)
+
+
+class ParsingScheduler:
+
+    """
+    Class ParsingScheduler parses all alg files of a container. With more than one job the chunks of the files (the
+    block and each function) are parsed and transformed in worker processes as soon as the files are submitted, the
+    largest file first, while the caller goes on with other checks. With one job each file is parsed when its result
+    is requested.
+
+    With a cache (of type ResultCache) the parsing is incremental:
+
+    - The read data of each file is stored, keyed by the digest of the file (and the fingerprint of the checker, which
+      covers the grammar and the transformer); a file which was already read is neither parsed nor transformed again,
+      its read data is only unpickled.
+    - The parse tree of each chunk is stored, keyed by the digest of the text of the chunk. When a file changed, only
+      the chunks whose text changed are parsed again; the cached trees of the other chunks are only shifted to their
+      new lines and transformed, which is cheap compared with the Earley parser.
+
+    If the limits contain a parse timeout or a memory limit, the files are always parsed in worker processes (one
+    worker with one job): the address space of the workers is limited, and a file whose parsing takes longer than the
+    timeout is reported as not parsed and the workers are replaced, so one hostile file cannot stall the checker. A
+    worker which is killed (e.g. by the out-of-memory killer of the operating system) breaks the pool of workers: the
+    chunks it was parsing are reported as not parsed and the workers are replaced as well.
+
+    """
+
+    def __init__(self, jobs=1, limits=DEFAULT_LIMITS, cache=None):
+        self.jobs = jobs
+        self.limits = limits
+        self.cache = cache
+        self.pool = None
+        self.chunks = {}
+        self.futures = {}
+        # the cache keys of the files, and the read data of the files found in the cache
+        self.keys = {}
+        self.cachedResults = {}
+        # the paths of the files whose parsing exceeded a resource limit
+        self.limitedPaths = set()
+
+    def isolated(self):
+        return self.limits.parseTimeout is not None or self.limits.maxMemory is not None
+
+    def cached(self, path):
+
+        """
+        Looks up the read data of an alg file in the cache
+
+        :param path: The path of the alg file
+        :return: True if the read data is cached
+
+        """
+
+        if self.cache is None:
+            return False
+        if path in self.cachedResults:
+            return True
+        self.keys[path] = self.cache.sectionKey('parse', hashlib.sha256(readAlgFile(path).encode('utf-8')).hexdigest())
+        result = self.cache.getObject(self.keys[path])
+        if result is None:
+            return False
+        self.cachedResults[path] = result
+        return True
+
+    def cachedChunk(self, chunk):
+
+        """
+        Reads a chunk from its cached parse tree
+
+        :param chunk: The chunk (text, start symbol, number of lines before the chunk)
+        :return: (read data, None) like parseChunk if the parse tree is cached, otherwise None
+
+        """
+
+        if self.cache is None:
+            return None
+        tree = self.cache.getObject(self.cache.sectionKey(*treeKey(chunk)))
+        if tree is None:
+            return None
+        return readChunkTree(tree, chunk), None
+
+    def readBlockQueries(self, chunks, parsed):
+
+        """
+        Reads again the function chunks which query the size of arrays of the block: the chunks are parsed and read
+        independently of the block, so their size() queries of the arrays of the block are only evaluated here
+
+        :param chunks: The chunks of the alg file, the block first
+        :param parsed: The read data and packed parse trees of the chunks (see parseChunk)
+        :return: the read data of the chunks
+
+        """
+
+        results = [chunkResult for chunkResult, packedTree in parsed]
+        dimensions = blockDimensions(results[0])
+        for i in range(1, len(chunks)):
+            if not needsBlock(results[i], dimensions):
+                continue
+            packedTree = parsed[i][1]
+            tree = unpackObject(packedTree) if packedTree is not None else None
+            if tree is None and self.cache is not None:
+                tree = self.cache.getObject(self.cache.sectionKey(*treeKey(chunks[i])))
+            if tree is None:
+                tree, errors = parseText(chunks[i])
+            if tree is not None:
+                results[i] = readChunkTree(tree, chunks[i], dimensions)
+        return results
+
+    def store(self, path, chunks, parsed):
+        # the parse trees are stored even if other chunks exceeded a limit, the read data of the file is not: it
+        # depends on the load of the machine
+        result = mergeResults(self.readBlockQueries(chunks, parsed))
+        if self.cache is not None:
+            self.cache.putPacked([(self.cache.sectionKey(*treeKey(chunk)), packedTree)
+                                  for chunk, (chunkResult, packedTree) in zip(chunks, parsed) if packedTree is not None])
+            if path in self.keys and path not in self.limitedPaths:
+                self.cache.putObject(self.keys[path], result)
+        return result
+
+    def workers(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max(1, self.jobs), initializer=applyMemoryLimit, initargs=(self.limits.maxMemory,))
+        return self.pool
+
+    def schedule(self, path):
+        self.chunks[path] = splitChunks(readAlgFile(path))
+        futures = []
+        for chunk in self.chunks[path]:
+            parsed = self.cachedChunk(chunk)
+            futures.append(ReadChunk(parsed) if parsed is not None else self.workers().submit(parseChunk, chunk))
+        self.futures[path] = futures
+
+    def submit(self, paths):
+
+        """
+        Schedules the parsing of alg files
+
+        :param paths: The paths of the alg files
+
+        """
+
+        if self.jobs <= 1 or len(paths) == 0:
+            return
+        for path in sorted(paths, key=os.path.getsize, reverse=True):
+            if path not in self.futures and not self.cached(path):
+                self.schedule(path)
+
+    def result(self, path):
+
+        """
+        Returns the read data of an alg file, waits for the worker processes if the file is still being parsed
+
+        :param path: The path of the alg file
+        :return: the read data of the file (of type AlgParseResult), the chunks which exceeded a resource limit are
+                 reported in the errors
+
+        """
+
+        if path not in self.futures:
+            if self.cached(path):
+                return self.cachedResults.pop(path)
+            if not self.isolated():
+                chunks = splitChunks(readAlgFile(path))
+                return self.store(path, chunks, [self.cachedChunk(chunk) or parseChunk(chunk) for chunk in chunks])
+            self.schedule(path)
+
+        timeout = self.limits.parseTimeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        chunks = self.chunks[path]
+        futures = self.futures[path]
+        timedOut = False
+        for i in range(len(chunks)):
+            try:
+                futures[i] = self.wait(path, chunks[i], futures[i], deadline)
+            except BrokenProcessPool:
+                # the killed worker may have been parsing another chunk: the chunk is parsed again alone by a new
+                # worker, so it is only reported if it kills the worker itself
+                self.terminate()
+                try:
+                    futures[i] = self.wait(path, chunks[i], self.workers().submit(parseChunk, chunks[i]), deadline)
+                except BrokenProcessPool:
+                    self.limitedPaths.add(path)
+                    futures[i] = ReadChunk((limitResult(chunks[i], "failed, the worker process parsing them was killed"), None))
+                    self.terminate()
+                self.resubmit()
+            timedOut = timedOut or futures[i].timedOut
+        del self.chunks[path]
+        parsed = [future.result() for future in self.futures.pop(path)]
+        if timedOut:
+            self.restart()
+        return self.store(path, chunks, parsed)
+
+    def wait(self, path, chunk, future, deadline):
+
+        """
+        Waits for the read data of a chunk
+
+        :param path: The path of the alg file
+        :param chunk: The chunk (text, start symbol, number of lines before the chunk)
+        :param future: The future of the read data of the chunk
+        :param deadline: The time (of time.monotonic) until which the chunks of the file must be parsed, None to wait
+                         until the chunk is parsed or its worker is killed
+        :return: the read data (of type ReadChunk), the chunk is reported if it exceeded a resource limit
+        :raise BrokenProcessPool: if a worker process was killed
+
+        """
+
+        try:
+            return ReadChunk(future.result(None if deadline is None else max(0, deadline - time.monotonic())))
+        except TimeoutError:
+            self.limitedPaths.add(path)
+            return ReadChunk((limitResult(chunk, "exceeded the time limit of %g seconds" % self.limits.parseTimeout), None), True)
+        except MemoryError:
+            self.limitedPaths.add(path)
+            return ReadChunk((limitResult(chunk, "exceeded the memory limit of %d bytes" % self.limits.maxMemory), None))
+
+    def restart(self):
+
+        """
+        Replaces the worker processes, the workers which are still parsing a chunk are terminated and the chunks of the
+        other files which are not parsed yet (or were lost with a broken pool) are scheduled again
+
+        """
+
+        self.terminate()
+        self.resubmit()
+
+    def resubmit(self):
+        for path, futures in self.futures.items():
+            futures[:] = [future if parsedBy(future) else self.workers().submit(parseChunk, chunk)
+                          for chunk, future in zip(self.chunks[path], futures)]
+
+    def terminate(self):
+        # the executor has no public way to stop the calls which are running, its worker processes are terminated
+        for process in list((self.pool._processes or {}).values()):
+            process.terminate()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.pool = None
+
+    def reset(self):
+
+        """
+        Forgets the files of the last check (e.g. before an unpacked eFMU is checked again), the worker processes are
+        kept
+
+        """
+
+        self.chunks = {}
+        self.futures = {}
+        self.cachedResults = {}
+        self.limitedPaths = set()
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.terminate()
+        self.chunks = {}
+        self.futures = {}
+        self.cachedResults = {}
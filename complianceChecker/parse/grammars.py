@@ -52,8 +52,8 @@ grammar = r'''
     variable_declaration: (type | state_compartment_reference) variable_name [constant_dimensions] [range_specification] ";"
 
     range_specification: "(" (lower_bound | upper_bound | (lower_bound "," upper_bound)) ")"
-    lower_bound: "min" "=" ["-"] (integer | number)
-    upper_bound: "max" "=" ["-"] (integer | number)
+    lower_bound: "min" "=" [MINUS] (integer | number)
+    upper_bound: "max" "=" [MINUS] (integer | number)
 
     //type_compartment_reference: type //| state_compartment_reference
 
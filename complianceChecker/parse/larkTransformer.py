@@ -16,16 +16,20 @@
 # See the "License" for the specific language governing
 # permissions and limitations under the "License".
 
-from lark import Lark, Transformer, v_args, tree
+from lark import Lark, Transformer_NonRecursive, v_args, tree
 from collections import namedtuple
-from data.AlgorithmCodeData import Function, If_Expression, BinaryOperation, Reference_constant, Reference_Reference, Reference_if_expression, UnaryOperation, \
-                    Reference_binary_operation, VarTypeCausality, FunctionCall, Reference_function_call, ExpressionVariable
+from data.AlgorithmCodeData import Function, If_Expression, BinaryOperation, UnaryOperation, VarTypeCausality, FunctionCall, ExpressionVariable, \
+                    ExpressionPool, Loop, REF_TO_CONSTANT, REF_TO_REFERENCE, REF_TO_BINARY_OPERATION, REF_TO_IF_EXPRESSION, REF_TO_FUNCTION_CALL
 import collections
+from data.Symbols import symbol, elementSymbol, clearSymbols
+from data.Trampoline import trampoline
+from data.Constants import ConstantEvaluator
+from data.SymbolTable import LOOKUP_ORDER, PUBLIC_SCOPE, PROTECTED_SCOPE, LOCAL_SCOPE
 #import numpy as np
 
-class ReadTree(Transformer):
+class ReadTree(Transformer_NonRecursive):
     """
-        Class ReadTree inherited from the Lark.Transformer class so it is able to visit each node of the tree.
+        Class ReadTree inherited from the Lark.Transformer_NonRecursive class so it is able to visit each node of the tree.
         
         This class uses methods that have the same names of visited rules, for example: The function_declaration method in this class is invoked
         automatically when the node (rule) function_declaration is encountered in the tree.
@@ -33,6 +37,10 @@ class ReadTree(Transformer):
         Methods which start by __ in the name are called locally only, for example: the __single_assignment method below is not called automatically,
         it is instead called by other methods of the ReadTree class only.
 
+        Expressions are nested as deep as they are long (a sum of n terms is n binary_operation nodes deep), so neither the tree nor the
+        expressions are visited recursively: the methods reading expressions are generators which are run by the trampoline function, they
+        yield the reading of a subexpression instead of calling it (see data.Trampoline).
+
     """
     
     # Contains all none local and none protected variables which are declared in the alg file
@@ -44,17 +52,36 @@ class ReadTree(Transformer):
     # Includes all functions in the alg file, stored as objects instantiated from the Function class
     functions = {}
 
-    def __init__(self):
-        pass
+    # The dimensions of the arrays of the block for the size() queries of functions which are read without the block
+    # (array name -> (scope, dimensions), see the algParsing module)
+    blockDimensions = {}
+
+    # The names of the arrays of size() queries which are not declared in the read tree nor in blockDimensions
+    queries = set()
 
-    def __single_assignment(self, ref_node, expr, function, in_for_loop=False, ref_value=[], multi_dimension_constructor_indexs=[]):
+    # The messages of the declarations which are parsed but cannot be read (e.g. a dimension which is not constant)
+    errors = []
+
+    def __init__(self):
+        # the enclosing for_loops of the read statements (Loop tuples) and the index accesses of the read function
+        self.loops = ()
+        self.accesses = None
+        # the values of the indexes of the enclosing for_loops in the unrolled iteration (index name -> value)
+        self.bindings = {}
+        # the local variables of the read function, for the size() queries
+        self.localVars = {}
+        # id of the constant_scalar_integer_expression node -> (node, its expression), see __constant_expression
+        self.constantExpressions = {}
+        self.constants = ConstantEvaluator(self.__dimensions)
+
+    def __single_assignment(self, ref_node, expr, function, multi_dimension_constructor_indexs=[]):
         
         """
         It adds the single_assignment element to the function object, it checks the type of the passed expression first then adds
         the single_assignment element accordingly.
 
         The only parts of the rules which are not implemented yet are:
-        - reference := dimension_query
+        - reference := dimension_query, it is only stored if the size is constant (as a refToConstant statement)
         - The reference := multi_dimension_comstructor is limited to one and two dimensions of multi_dimension_comstructor 
             (three and above are not implemented)
 
@@ -62,47 +89,45 @@ class ReadTree(Transformer):
         :param ref_node: The tree node of the reference element
         :param expr: The expression to be assigned to the single_assignment (see __expression() method)
         :param function: the function object where the single_assignment to be added to
-        :param in_for_loop: It specifies if the method is called from a for_loop, when it is true the method reads the next param 
-        :param ref_value: Stores the name of the for_loop index and its current iterating value (for example ["i", 0])
         :param multi_dimension_constructor_indexs: List of indexes for the multi_dimension_constructor, if the passes expression is 
             a multi_dimension_constructor
 
         """
 
-        ref = self.__reference(ref_node, in_for_loop, ref_value)
-        if (len(multi_dimension_constructor_indexs) > 1):
-            ref += "[" + multi_dimension_constructor_indexs[0] + "," + multi_dimension_constructor_indexs[1] + "]"
-        elif (len(multi_dimension_constructor_indexs) > 0):
-            ref += "[" + multi_dimension_constructor_indexs[0] + "]"
+        ref = self.__reference(ref_node)
+        if (len(multi_dimension_constructor_indexs) > 0):
+            ref = elementSymbol(ref, tuple(multi_dimension_constructor_indexs))
         
         if expr[0] == 'constant':
-            refConstant = Reference_constant (ref, expr[1], ref_node.line)
-            function.addReference_to_constant(refConstant)
+            function.addStatement(REF_TO_CONSTANT, ref, expr, ref_node.line)
         elif expr[0] == 'reference':
-            refToRef = Reference_Reference (ref, expr[1], ref_node.line)
-            function.addReference_to_reference(refToRef)
+            function.addStatement(REF_TO_REFERENCE, ref, expr[1], ref_node.line)
         elif expr[0] == 'if_expression':
-            refToIfExpr = Reference_if_expression(ref, expr[1], ref_node.line)
-            function.addReference_to_ifExpression(refToIfExpr)
+            function.addStatement(REF_TO_IF_EXPRESSION, ref, expr[1], ref_node.line)
         elif expr[0] == 'binary_operation':
-            
-            refToBinaryOperation = Reference_binary_operation(ref, expr[1], ref_node.line)
-            function.addReference_to_binaryOperation(refToBinaryOperation)
+            function.addStatement(REF_TO_BINARY_OPERATION, ref, expr[1], ref_node.line)
         elif expr[0] == 'function_call':
-            
-            refToFunctionCall = Reference_function_call(ref, expr[1], ref_node.line)
-            function.addReference_to_functionCall(refToFunctionCall)
+            function.addStatement(REF_TO_FUNCTION_CALL, ref, expr[1], ref_node.line)
+        elif expr[0] == 'dimension_query':
+            size = self.constants.evaluate(expr)
+            if size is not None:
+                function.addStatement(REF_TO_CONSTANT, ref, ['constant', 'Integer', size, expr[3]], ref_node.line)
         elif expr[0] == 'unary_operation':
             if expr[1] == 'function_call':
-                
-                refToFunctionCall = Reference_function_call(ref, expr[2], ref_node.line)
-                function.addReference_to_functionCall(refToFunctionCall)
+                function.addStatement(REF_TO_FUNCTION_CALL, ref, expr[2], ref_node.line)
             elif expr[1] == 'reference':
-                refToRef = Reference_Reference (ref, expr[2], ref_node.line)
-                function.addReference_to_reference(refToRef)
+                function.addStatement(REF_TO_REFERENCE, ref, expr[2], ref_node.line)
             elif expr[1] == 'if_expression':
-                refToIfExpr = Reference_if_expression(ref, expr[2], ref_node.line)
-                function.addReference_to_ifExpression(refToIfExpr)
+                function.addStatement(REF_TO_IF_EXPRESSION, ref, expr[2], ref_node.line)
+            elif expr[1] == 'constant' and expr[3] == '-' and isinstance(expr[2], list) and expr[2][1] in ['Integer', 'Real']:
+                # a negative constant, the shared constant node is not changed; the index of a for_loop which is not
+                # unrolled has no value (see __loop_index)
+                value = -expr[2][2] if expr[2][2] is not None else None
+                function.addStatement(REF_TO_CONSTANT, ref, ['constant', expr[2][1], value, expr[2][3]], ref_node.line)
+            elif expr[1] == 'dimension_query':
+                size = self.constants.evaluate(expr)
+                if size is not None:
+                    function.addStatement(REF_TO_CONSTANT, ref, ['constant', 'Integer', size, expr[4]], ref_node.line)
         elif expr[0] == 'multi_dimension_constructor':
             all_espressions = expr[1]
             for i in range(len(all_espressions)):
@@ -111,9 +136,9 @@ class ReadTree(Transformer):
                     embedded_expressions = all_espressions[i][1]
                     for j in range(len(all_espressions[i])):
                         
-                        self.__single_assignment(ref_node, embedded_expressions[j], function, in_for_loop, ref_value, [str(i+1), str(j+1)])
+                        self.__single_assignment(ref_node, embedded_expressions[j], function, (i+1, j+1))
                 else:
-                    self.__single_assignment(ref_node, all_espressions[i], function, in_for_loop, ref_value, [str(i+1)])
+                    self.__single_assignment(ref_node, all_espressions[i], function, (i+1,))
     
     def __function_call (self, node):
     
@@ -121,7 +146,7 @@ class ReadTree(Transformer):
         It is called when the function_call node is encountered
 
         :param ode: The function_call tree node
-        :return: The created FunctionCall tuple
+        :return: The generator of the created FunctionCall tuple (see the trampoline function)
 
         """
 
@@ -132,7 +157,7 @@ class ReadTree(Transformer):
                 if node.children[i].data == 'name':
                     funcName = self.__name(node.children[i].children[0])
                 else:
-                    expressions.append(self.__expression(node.children[i]))
+                    expressions.append((yield self.__expression(node.children[i])))
         functionCall = FunctionCall(funcName, expressions, node.line)
         return functionCall
     
@@ -192,7 +217,7 @@ class ReadTree(Transformer):
         #else:
             #return "-0"
 
-    def __expression(self, node, in_for_loop=False, ref_value=[]):
+    def __expression(self, node):
 
         
         """
@@ -200,14 +225,15 @@ class ReadTree(Transformer):
         relevant expression tuple
 
         The only parts of the rules which are not implemented yet are:
-        - dimension_query
         - multi_dimension_comstructor is limited to one and two dimensions (three and above are not implemented)
 
+        In an unrolled for_loop, the indexes of the enclosing for_loops are read as constants of the iteration (see
+        the bindings property).
+
 
         :param node: The tree node of the expression
-        :param in_for_loop: It specifies if the method is called from a for_loop, when it is true the method reads the next param 
-        :param ref_value: Stores the name of the for_loop index and its current iterating value (for example ["i", 0])
-        :return: the expression as a tuple, type (constant, reference, binary_operation, ...) and line number in the alg file
+        :return: the generator of the expression (see the trampoline function), the expression is a tuple of the type (constant, reference,
+            binary_operation, ...) and line number in the alg file
 
         """
 
@@ -226,14 +252,19 @@ class ReadTree(Transformer):
                     number = self.__number(node.children[j].children[0])
                 return ['constant', typ.title(), number, node.children[j].line]
             elif node.children[j].data == "reference":
-                return ['reference', self.__reference(node.children[j], in_for_loop, ref_value), node.children[j].line]
+                index = self.__loop_index(node.children[j])
+                if index is not None:
+                    return index
+                return ['reference', self.__reference(node.children[j]), node.children[j].line]
+            elif node.children[j].data == "dimension_query":
+                return (yield self.__dimension_query(node.children[j]))
             elif node.children[j].data == "if_expression":
                 ifExpression = If_Expression()
-                self.__if_expression(node.children[j], ifExpression)
+                yield self.__if_expression(node.children[j], ifExpression)
                 return ['if_expression', ifExpression, node.children[j].line]
             elif node.children[j].data == "binary_operation":
 
-                return self.__read_binaryOperation(node.children[j])
+                return (yield self.__read_binaryOperation(node.children[j]))
                 
                 #operation = node.children[j].children[1].children[0].children[0].children[0].value
                 #exp1 = self.__expression(node.children[j].children[0])
@@ -243,32 +274,38 @@ class ReadTree(Transformer):
                 #binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[j].line)
                 #return ['binary_operation', binaryOperation, node.children[j].line]
             elif node.children[j].data == 'parenthesized_expression':   
-                return  self.__expression (node.children[j].children[1])
+                return (yield self.__expression(node.children[j].children[1]))
             elif node.children[j].data == 'function_call':
-                return ['function_call', self.__function_call(node.children[j]), node.children[j].line]
+                return ['function_call', (yield self.__function_call(node.children[j])), node.children[j].line]
             elif node.children[j].data == 'unary_operation':
                 u_operation = node.children[j].children[0].value
                 if node.children[j].children[1].data == 'function_call':
-                    funcCall = self.__function_call(node.children[j].children[1])
+                    funcCall = yield self.__function_call(node.children[j].children[1])
                     return ['unary_operation', 'function_call', funcCall, u_operation, node.children[j].children[1].line]
                 elif node.children[j].children[1].data == 'reference':
+                    index = self.__loop_index(node.children[j].children[1])
+                    if index is not None:
+                        return ['unary_operation', 'constant', index, u_operation, node.children[j].children[1].line]
                     ref = self.__reference(node.children[j].children[1])
                     
                     return ['unary_operation', 'reference', ref, u_operation, node.children[j].children[1].line]
+                elif node.children[j].children[1].data == 'dimension_query':
+                    query = yield self.__dimension_query(node.children[j].children[1])
+                    return ['unary_operation', 'dimension_query', query, u_operation, node.children[j].children[1].line]
                 elif node.children[j].children[1].data == 'parenthesized_expression':
-                    exp = self.__expression(node.children[j].children[1].children[1])
+                    exp = yield self.__expression(node.children[j].children[1].children[1])
                     return ['unary_operation', exp[0], exp[1], u_operation, node.children[j].children[1].line]
                 elif node.children[j].children[1].data == 'binary_operation':
                     #operation = node.children[j].children[1].children[1].children[0].children[0].children[0].value
                     #exp1 = self.__expression(node.children[j].children[1].children[0])
                     #exp2 = self.__expression(node.children[j].children[1].children[2])
                     #binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[j].line)
-                    binaryOperationExpr =  self.__read_binaryOperation(node.children[j].children[1])
+                    binaryOperationExpr = yield self.__read_binaryOperation(node.children[j].children[1])
                     
                     return ['unary_operation', 'binary_operation', binaryOperationExpr[1], u_operation, node.children[j].children[1].line]
                 elif  node.children[j].children[1].data == "if_expression":
                     ifExpression = If_Expression()
-                    self.__if_expression(node.children[j].children[1], ifExpression)
+                    yield self.__if_expression(node.children[j].children[1], ifExpression)
                     return ['unary_operation', 'if_expression', ifExpression, u_operation, node.children[j].children[1].line]
                 elif node.children[j].children[1].data == "constant":
                     if node.children[j].children[1].children[0].data == 'boolean':
@@ -283,94 +320,92 @@ class ReadTree(Transformer):
                     return ['unary_operation', 'constant', const, u_operation, node.children[j].children[1].line]
 
             elif node.children[j].data == 'multi_dimension_constructor':
-                return ['multi_dimension_constructor', self.__multi_dimension_constructor(node.children[j], in_for_loop, ref_value)]
+                return ['multi_dimension_constructor', (yield self.__multi_dimension_constructor(node.children[j]))]
     
     def __read_binaryOperation (self, node):
-        return self.__or(node.children[0])
+        return (yield self.__or(node.children[0]))
         
             
     def __or(self, node):
         if (len(node.children) > 1):
-            exp1 = self.__or(node.children[0])
+            exp1 = yield self.__or(node.children[0])
             operation = node.children[1]
-            exp2 = self.__and(node.children[2])
+            exp2 = yield self.__and(node.children[2])
             binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[0].line)
             return ['binary_operation', binaryOperation, node.children[0].line]
         else:
-            return self.__and(node.children[0])
+            return (yield self.__and(node.children[0]))
 
     
     def __and(self, node):
         if (len(node.children) > 1):
-            exp1 = self.__and(node.children[0])
+            exp1 = yield self.__and(node.children[0])
             operation = node.children[1]
-            exp2 = self.__equal(node.children[2])
+            exp2 = yield self.__equal(node.children[2])
             binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[0].line)
             return ['binary_operation', binaryOperation, node.children[0].line]
         else:
-            return self.__equal(node.children[0])
+            return (yield self.__equal(node.children[0]))
     
     def __equal(self, node):
         if (len(node.children) > 1):
-            exp1 = self.__equal(node.children[0])
+            exp1 = yield self.__equal(node.children[0])
             operation = node.children[1]
-            exp2 = self.__relational(node.children[2])
+            exp2 = yield self.__relational(node.children[2])
             binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[0].line)
             return ['binary_operation', binaryOperation, node.children[0].line]
         else:
-            return self.__relational(node.children[0])
+            return (yield self.__relational(node.children[0]))
     
     def __relational(self, node):
         if (len(node.children) > 1):
-            exp1 = self.__relational(node.children[0])
+            exp1 = yield self.__relational(node.children[0])
             operation = node.children[1]
-            exp2 = self.__sum(node.children[2])
+            exp2 = yield self.__sum(node.children[2])
             binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[0].line)
             return ['binary_operation', binaryOperation, node.children[0].line]
         else:
-            return self.__sum(node.children[0])
+            return (yield self.__sum(node.children[0]))
         
     def __sum(self, node):
         if (len(node.children) > 1):
-            exp1 = self.__sum(node.children[0])
+            exp1 = yield self.__sum(node.children[0])
             operation = node.children[1]
-            exp2 = self.__mul(node.children[2])
+            exp2 = yield self.__mul(node.children[2])
             binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[0].line)
             return ['binary_operation', binaryOperation, node.children[0].line]
         else:
-            return self.__mul(node.children[0])
+            return (yield self.__mul(node.children[0]))
 
     def __mul(self, node):
         if (len(node.children) > 1):
-            exp1 = self.__mul(node.children[0])
+            exp1 = yield self.__mul(node.children[0])
             operation = node.children[1]
-            exp2 = self.__power(node.children[2])
+            exp2 = yield self.__power(node.children[2])
             binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[0].line)
             return ['binary_operation', binaryOperation, node.children[0].line]
         else:
-            return self.__power(node.children[0])
+            return (yield self.__power(node.children[0]))
     
     def __power(self, node):
         if (len(node.children) > 1):
-            exp1 = self.__power(node.children[0])
+            exp1 = yield self.__power(node.children[0])
             operation = node.children[1]
-            exp2 = self.__expression(node.children[2])
+            exp2 = yield self.__expression(node.children[2])
             binaryOperation = BinaryOperation (exp1, operation, exp2, node.children[0].line)
             return ['binary_operation', binaryOperation, node.children[0].line]
         else:
-            return self.__expression(node.children[0])
+            return (yield self.__expression(node.children[0]))
 
  
-    def __multi_dimension_constructor(self, node, in_for_loop=False, ref_value=[]):
+    def __multi_dimension_constructor(self, node):
 
         """
         It reads all the expressions which are stored in the multi_dimension_constructor node
 
 
         :param node: The tree node of the multi_dimension_constructor
-        :param in_for_loop: It specifies if the method is called from a for_loop, when it is true the method reads the next param 
-        :param ref_value: Stores the name of the for_loop index and its current iterating value (for example ["i", 0])
-        :return: the list of all expressions stored in the multi_dimension_constructor tree node
+        :return: the generator of the list of all expressions stored in the multi_dimension_constructor tree node (see the trampoline function)
 
         """
 
@@ -379,9 +414,9 @@ class ReadTree(Transformer):
             if (isinstance(node.children[i], tree.Tree)):
                 if node.children[i].data == "multi_dimension_constructor_element":
                     if node.children[i].children[0].data == "expression":
-                        all_expressions.append(self.__expression(node.children[i].children[0], in_for_loop, ref_value))
+                        all_expressions.append((yield self.__expression(node.children[i].children[0])))
                     else:
-                        all_expressions.append(self.__multi_dimension_constructor(node.children[i].children[0], in_for_loop, ref_value))
+                        all_expressions.append((yield self.__multi_dimension_constructor(node.children[i].children[0])))
                         
         return all_expressions
 
@@ -393,6 +428,7 @@ class ReadTree(Transformer):
 
         :param node: The tree node of the if_expression
         :param ifExpression: the if_expression object where expressions and conditions are added 
+        :return: the generator of the reading (see the trampoline function)
 
         """
 
@@ -401,26 +437,26 @@ class ReadTree(Transformer):
             
             if node.children[k] == 'if':
                 k += 1
-                exp = self.__expression(node.children[k])
+                exp = yield self.__expression(node.children[k])
                 ifExpression.addCondition(exp)
                 k += 1
             elif node.children[k] == 'then':
                 k += 1
-                exp = self.__expression(node.children[k])
+                exp = yield self.__expression(node.children[k])
                 ifExpression.addExpression(exp)
                 k += 1
                 
             elif node.children[k] == 'else':
                 k += 1
-                exp = self.__expression(node.children[k])
+                exp = yield self.__expression(node.children[k])
                 ifExpression.addElseExpression(exp)
                 k += 1
 
             elif isinstance(node.children[k], tree.Tree):
                 
                 if node.children[k].data == 'elseif_expression':
-                    exp1 = self.__expression(node.children[k].children[1])
-                    exp2 = self.__expression(node.children[k].children[3])
+                    exp1 = yield self.__expression(node.children[k].children[1])
+                    exp2 = yield self.__expression(node.children[k].children[3])
                     ifExpression.addElseIF (exp1, exp2)
                     k += 1
             else:
@@ -447,6 +483,11 @@ class ReadTree(Transformer):
 
         functionName = ''
         function = Function()
+        # the expressions of the function are shared (see the ExpressionPool class)
+        self.expressions = ExpressionPool()
+        # id of the computed_dimensions node -> the index access (see __index_access)
+        self.accesses = {}
+        self.localVars = function.getLocalVariables()
         for i in range(len(node)):
             
             if not isinstance(node[i], tree.Tree):
@@ -466,9 +507,10 @@ class ReadTree(Transformer):
                     
                     if node[i].children[0].data == "single_assignment":
                         
-                        expr = self.__expression(node[i].children[0].children[2])
+                        assignment = node[i].children[0]
+                        expr = self.expressions.share(trampoline(self.__expression(assignment.children[2])), assignment.children[0].line)
                         
-                        self.__single_assignment(node[i].children[0].children[0], expr, function)
+                        self.__single_assignment(assignment.children[0], expr, function)
                     elif node[i].children[0].data == "for_loop":
                         self.__for_loop(node[i].children[0], function)
                     
@@ -503,81 +545,173 @@ class ReadTree(Transformer):
                     nameAndType = self.__variable_declaration(node[i].children[1].children)
                     function.addDeclaredLocalVars(varCausality, nameAndType)'''
                 
+        for access in self.accesses.values():
+            function.addIndexAccess(*access)
         ReadTree.functions[function.name] = function
+        self.expressions = None
+        self.accesses = None
+        self.localVars = {}
         return node
 
-    def __reference(self, node, in_for_loop=False, ref_value=[]):
+    def __reference(self, node):
 
         """
-        It reads and returns the name of a reference which is contained in an expression 
+        It reads and returns the name of a reference which is contained in an expression. The indexes of an array
+        element are evaluated as constant expressions (see __constant), with the indexes of the enclosing for_loops
+        in an unrolled for_loop; an index which is not constant is left out
 
         :param node: The tree node of the reference
-        :param in_for_loop: It specifies if the method is called from a for_loop, when it is true the method reads the next param 
-        :param ref_value: Stores the name of the for_loop index and its current iterating value (for example ["i", 0])
         :return: The reference name (reference might be scalar or an element of array)
 
         """
 
         ref = ""
         varName = ""
+        indexes = []
         # state_reference
         if node.children[0].data == "state_reference":
             for j in range(len(node.children[0].children)):
                 if isinstance(node.children[0].children[j], tree.Tree):
                     if node.children[0].children[j].data == "name":
                         varName = self.__name(node.children[0].children[j].children[0])
-                        ref += varName
+                        ref = varName
                     elif node.children[0].children[j].data == "computed_dimensions":
                         node1 = node.children[0].children[j]
-                        for i in range(len(node1.children)):
-                            
-                            if isinstance(node1.children[i], tree.Tree):
-                                if (node1.children[i].data == "constant_scalar_integer_expression"):
-                                    
-                                    if node1.children[i].children[0].children[0].data == "constant":
-                                        
-                                        if len(node1.children[i].children[0].children[0].children[0].children) == 1:
-                                            index = self.__number(node1.children[i].children[0].children[0].children[0])
-                                            ref += "[" + str(index) + "]"
-                                            
-                                    elif node1.children[i].children[0].children[0].data == "reference":
-                                        index_ref = self.__reference(node1.children[i].children[0].children[0])
-                                        if (in_for_loop):
-                                            if index_ref == ref_value[0]:
-                                                ref += "[" + ref_value[1] + "]"
-                                    elif node1.children[i].children[0].children[0].data == "binary_operation":
-
-                                        binaryOperationExpr =  self.__read_binaryOperation(node1.children[i].children[0].children[0])
-                    
-                                        #BinaryOperationExpr[1], u_operation, node.children[j].children[1].line]
-                                        #node2 = node1.children[i].children[0].children[0]
-                                        operation = binaryOperationExpr[1]
-                                        
-                                        exp1 = binaryOperationExpr[0]
-                                        exp2 = binaryOperationExpr[2]
-                                        
-                                        if exp1[0] == "reference":
-                                            if (in_for_loop):
-                                                if exp1[1] == ref_value[0]:
-                                                    if exp2[0] == "constant":
-                                                        if operation=="+":
-                                                            index = int(ref_value[1]) + int (exp2[2])
-                                                        elif operation=="-":
-                                                            index = int(ref_value[1]) - int (exp2[2])
-                                                        ref += "[" + str(index) + "]"
-                                                        
-                                        
+                        self.__index_access(varName, node1)
+                        indexes += self.__indexes(node1)
+
         elif node.children[0].data == "local_reference":
             if node.children[0].children[0].data == "name":
                 varName = self.__name(node.children[0].children[0].children[0])
-                ref += varName
+                ref = varName
+                if len(node.children[0].children) > 1:
+                    self.__index_access(varName, node.children[0].children[1])
+                    indexes += self.__indexes(node.children[0].children[1])
 
 
                 #else:
                     #ref += node.children[0].children[j]
-        
+
+        if indexes:
+            return elementSymbol(ref, tuple(indexes))
         return ref
 
+    def __index_access(self, name, node):
+
+        """
+        It records a reference to an array element with the expressions of its indexes and the enclosing for_loops (see
+        the IndexAccess tuple). The statements of a for_loop are read once per iteration, a reference is only recorded
+        the first time its node is read, so the accesses do not depend on the number of iterations.
+
+        :param name: The name of the array
+        :param node: The tree node of the computed_dimensions of the reference
+
+        """
+
+        if self.accesses is None or id(node) in self.accesses:
+            return
+        indexes = []
+        for child in node.children:
+            if isinstance(child, tree.Tree) and child.data == "constant_scalar_integer_expression":
+                indexes.append(self.__constant_expression(child))
+        self.accesses[id(node)] = (name, tuple(indexes), self.loops, node.line)
+
+    def __indexes(self, node):
+
+        """
+        It evaluates the indexes of a reference to an array element
+
+        :param node: The tree node of the computed_dimensions of the reference
+        :return: the list of the values of the constant indexes
+
+        """
+
+        indexes = []
+        for child in node.children:
+            if isinstance(child, tree.Tree) and child.data == "constant_scalar_integer_expression":
+                index = self.__constant(child)
+                if index is not None:
+                    indexes.append(index)
+        return indexes
+
+    def __loop_index(self, node):
+
+        """
+        It returns the index of an enclosing for_loop as a constant of the unrolled iteration
+
+        :param node: The tree node of a reference
+        :return: the expression ['constant', 'Integer', value, line], the value is None if the for_loop is not unrolled
+                 (see __for_loop); None if the reference is not the index of an enclosing for_loop
+
+        """
+
+        if node.children[0].data == "local_reference" and len(node.children[0].children) == 1:
+            name = self.__name(node.children[0].children[0].children[0])
+            if name in self.bindings:
+                return ['constant', 'Integer', self.bindings[name], node.line]
+        return None
+
+    def __dimension_query(self, node):
+
+        """
+        It is called when the dimension_query node (size(reference, dimension)) is encountered
+
+        :param node: The tree node of the dimension_query
+        :return: the generator of the expression ['dimension_query', reference, dimension expression, line] (see the
+            trampoline function)
+
+        """
+
+        reference = self.__reference(node.children[0])
+        dimension = yield self.__expression(node.children[-1].children[0])
+        return ['dimension_query', reference, dimension, node.line]
+
+    def __constant_expression(self, node):
+
+        """
+        It reads a constant_scalar_integer_expression once: the expression is memoized per tree node and read without
+        the values of the indexes of the enclosing for_loops, so the same expression is evaluated in all iterations of
+        an unrolled for_loop (see the ConstantEvaluator class) and recorded in the Loop and IndexAccess tuples
+
+        :param node: The tree node of the constant_scalar_integer_expression
+        :return: the expression
+
+        """
+
+        entry = self.constantExpressions.get(id(node))
+        if entry is None:
+            bindings = self.bindings
+            self.bindings = {}
+            entry = (node, trampoline(self.__expression(node.children[0])))
+            self.bindings = bindings
+            self.constantExpressions[id(node)] = entry
+        return entry[1]
+
+    def __constant(self, node):
+
+        """
+        It evaluates a constant_scalar_integer_expression with the values of the indexes of the enclosing for_loops
+
+        :param node: The tree node of the constant_scalar_integer_expression
+        :return: the integer value, None if the expression is not constant
+
+        """
+
+        return self.constants.evaluate(self.__constant_expression(node), self.bindings)
+
+    def __dimensions(self, name):
+        # the dimensions of a declared variable for the size() queries, None if it is not declared yet; the scopes are
+        # searched in the order of the symbol tables (see the SymbolTable class)
+        scopes = {PROTECTED_SCOPE: ReadTree.protectedVars, LOCAL_SCOPE: self.localVars, PUBLIC_SCOPE: ReadTree.vars}
+        block = ReadTree.blockDimensions.get(name)
+        for scope in LOOKUP_ORDER:
+            if name in scopes[scope]:
+                return scopes[scope][name].dimensions
+            if block is not None and block[0] == scope:
+                return block[1]
+        ReadTree.queries.add(name)
+        return None
+
     def __scalarized_reference(self, node):
         varName = ""
         for j in range(len(node.children)):
@@ -690,7 +824,7 @@ class ReadTree(Transformer):
         if containQuotes :
             varName += "'"
         #varNames.append(varName)
-        return varName
+        return symbol(varName)
     
     def __fixed_dimensions(self, node):
 
@@ -732,12 +866,13 @@ class ReadTree(Transformer):
         #print(node[1])
         #print ("finished state_entity_declaration")
         nameAndType = self.__variable_declaration(node[1].children)
-        varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, node[1].line)
+        varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, node[1].line, (), *nameAndType[3])
         if len(nameAndType[0]) == 1:
             ReadTree.vars[nameAndType[0][0]] = varTypeCaus
         else:
             for i in range(len(nameAndType[0])):
                 ReadTree.vars[nameAndType[0][i]] = varTypeCaus
+        ReadTree.vars[nameAndType[0][-1]] = VarTypeCausality(nameAndType[1], varCausality, node[1].line, nameAndType[2], *nameAndType[3])
 
     def protected_declaration(self, node):
 
@@ -760,24 +895,26 @@ class ReadTree(Transformer):
                     varCausality = "state"
                     nameAndType = self.__variable_declaration(node[i].children)
                     #MinMax_Expressions = MinMax_Expressions', ['references', 'types', 'vals'])
-                    varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, node[i].line)
+                    varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, node[i].line, (), *nameAndType[3])
                     if len(nameAndType[0]) == 1:
                         ReadTree.protectedVars[nameAndType[0][0]] = varTypeCaus
                     else:
                         for j in range(len(nameAndType[0])):
                             ReadTree.protectedVars[nameAndType[0][j]] = varTypeCaus
+                    ReadTree.protectedVars[nameAndType[0][-1]] = VarTypeCausality(nameAndType[1], varCausality, node[i].line, nameAndType[2], *nameAndType[3])
                 i += 1
             else:
                 if not isinstance(node[i], list):
                     #print(node[i])
                     varCausality = node[i].value
                     nameAndType = self.__variable_declaration(node[i+1].children)
-                    varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, node[i].line)
+                    varTypeCaus = VarTypeCausality(nameAndType[1], varCausality, node[i].line, (), *nameAndType[3])
                     if len(nameAndType[0]) == 1:
                         ReadTree.protectedVars[nameAndType[0][0]] = varTypeCaus
                     else:
                         for j in range(len(nameAndType[0])):
                             ReadTree.protectedVars[nameAndType[0][j]] = varTypeCaus
+                    ReadTree.protectedVars[nameAndType[0][-1]] = VarTypeCausality(nameAndType[1], varCausality, node[i].line, nameAndType[2], *nameAndType[3])
                     
                     i += 2
                 else:
@@ -793,12 +930,16 @@ class ReadTree(Transformer):
         provided 
 
         :param node: The tree node of the variable_declaration
+        :return: the declared names (array elements first, the array name last), the type, the dimensions and the
+            (min, max) bounds of the range_specification
         
         """
        
         name = ""
         constatDimensExist = False
         varNames = []
+        dimensions = ()
+        valueRange = (None, None)
     
         for i in range(len(node)):
             if (node[i].data == "type"):
@@ -807,19 +948,22 @@ class ReadTree(Transformer):
                 name = self.__name(node[i].children[0].children[0])
             elif node[i].data == "constant_dimensions":
                 constatDimensExist = True
-                constant_dimensions = self.__constant_dimensions(node[i])
+                constant_dimensions = self.__constant_dimensions(node[i], name)
+            elif node[i].data == "range_specification":
+                valueRange = self.__range_specification(node[i])
         
         if (constatDimensExist):
             if constant_dimensions[0] == "dimensions":
+                dimensions = tuple(constant_dimensions[1])
                 if len(constant_dimensions[1]) == 1:
                     for i in range(constant_dimensions[1][0]):
-                        varNames.append(name + "[" + str(i+1) + "]")
+                        varNames.append(elementSymbol(name, (i+1,)))
                     
                     varNames.append(name)
                 elif len(constant_dimensions[1]) == 2:
                     for i in range(constant_dimensions[1][0]):
                         for j in range(constant_dimensions[1][1]):
-                            varNames.append(name + "[" + str(i+1) + "," + str(j+1) + "]")
+                            varNames.append(elementSymbol(name, (i+1, j+1)))
                     
                     varNames.append(name)
             else:
@@ -827,15 +971,42 @@ class ReadTree(Transformer):
         else:
             varNames.append(name)
 
-        return [varNames, varType]
+        return [varNames, varType, dimensions, valueRange]
+
+    def __range_specification(self, node):
+
+        """
+        It reads the bounds of the range_specification of a variable_declaration
+
+        :param node: The tree node of the range_specification
+        :return: the (min, max) bounds as numbers, a bound which is not given is None
+
+        """
+
+        bounds = {}
+        for bound in node.children:
+            value = bound.children[-1]
+            if value.data == "integer":
+                value = int(self.__integer(value))
+            else:
+                value = self.__number(value)
+            if len(bound.children) > 1:
+                # the bound is preceded by a MINUS token
+                value = -value
+            bounds[bound.data] = value
+        return (bounds.get("lower_bound"), bounds.get("upper_bound"))
     
-    def __constant_dimensions(self, node):
+    def __constant_dimensions(self, node, name):
 
         """
         This method is invoked when the constant_dimensions of a variable_declaration is provided (none scalar variables)
         (currently I use it also for the min and max values which are provided after the variable declaration)
 
+        A dimension which is not a constant Integer expression is reported in the errors of the read data (see
+        readErrors), it is left out of the dimensions
+
         :param node: The tree node of the constant_dimensions 
+        :param name: The name of the declared variable, for the messages
         
         """
   
@@ -851,17 +1022,7 @@ class ReadTree(Transformer):
                         node1 = node.children[i].children[0].children[j].children[0]
                         
                         if isinstance(node1, tree.Tree):
-                            if node1.data == "constant":
-                                varDimension = True
-                                if node1.children[0].data == "boolean":
-                                    print("error")
-                                elif len(node1.children[0].children) == 1:
-                                    dimension = self.__number(node1.children[0])
-                                    dimensions.append(dimension)
-                                    
-                                else:
-                                    print("error")
-                            elif node1.data == "minmax_expression":
+                            if node1.data == "minmax_expression":
                                 varName = self.__name(node1.children[0].children[0])
                                 if isinstance(node1.children[2], tree.Tree):
                                     value = self.__number(node1.children[2].children[0])
@@ -870,6 +1031,14 @@ class ReadTree(Transformer):
                                     value = "-" + value
                                 names.append(varName)
                                 values.append(value)
+                            else:
+                                # a constant expression (see __constant)
+                                dimension = self.__constant(node.children[i].children[0])
+                                if dimension is not None:
+                                    varDimension = True
+                                    dimensions.append(dimension)
+                                else:
+                                    ReadTree.errors.append("The dimension %d of the %s variable in line %s is not a constant Integer expression" % (len(dimensions) + 1, name, node.line))
         if (varDimension == True):
             return ["dimensions", dimensions]
         else:
@@ -880,6 +1049,11 @@ class ReadTree(Transformer):
         """
         It is called when a for_loop node is encountered, so it can iterate through and store the statements
 
+        The bounds and the step are constant expressions evaluated with the indexes of the enclosing for_loops (see
+        __constant), the statements and the nested for_loops are read once per iteration. A for_loop whose bounds or
+        step are not constant (e.g. they depend on an input) is not unrolled, its statements are read once with an index
+        without a value, so its references to array elements are read as references to the arrays (see __indexes).
+
         The following statements need to be added:
         - multi_assignment
         - limit statement
@@ -891,9 +1065,11 @@ class ReadTree(Transformer):
         :param function: the function object where the for_loop to be added to
         """
 
-        start_bound = 0
-        termination_bound = 0
         index_name = ""
+        bounds = {}
+        iterations = []
+        enclosingLoops = self.loops
+        enclosingBindings = self.bindings
         for i in range(len(node.children)):
             
             if isinstance(node.children[i], tree.Tree):
@@ -903,29 +1079,59 @@ class ReadTree(Transformer):
                         if isinstance(node1, tree.Tree):
                             if node1.data == "loop_iterator_declaration":
                                 index_name = self.__name(node1.children[0].children[0])
-                                
-                            elif node1.data == "start_bound":
-                                expr = self.__expression(node1.children[0].children[0])
-                                if expr[0] == "constant":
-                                    start_bound = int(expr[2])
-                                    
-                            elif node1.data == "termination_bound":
-                                expr = self.__expression(node1.children[0].children[0])
-                                if expr[0] == "constant":
-                                    termination_bound = int(expr[2])
-                                    
+
+                            elif node1.data in ["start_bound", "iteration_step_size", "termination_bound"]:
+                                bounds[node1.data] = node1.children[0]
+
+                    # the bounds are evaluated with the indexes of the enclosing for_loops, the for_loop is only
+                    # unrolled if they are constant
+                    start_bound = self.__constant(bounds["start_bound"])
+                    step_size = self.__constant(bounds["iteration_step_size"]) if "iteration_step_size" in bounds else 1
+                    termination_bound = self.__constant(bounds["termination_bound"])
+                    if start_bound is not None and step_size and termination_bound is not None:
+                        last = termination_bound + 1 if step_size > 0 else termination_bound - 1
+                        for k in range(start_bound, last, step_size):
+                            bindings = dict(enclosingBindings)
+                            bindings[index_name] = k
+                            iterations.append(bindings)
+                    else:
+                        # the statements are still checked, the index is an Integer without a value (see __loop_index)
+                        bindings = dict(enclosingBindings)
+                        bindings[index_name] = None
+                        iterations.append(bindings)
+
+                    # the statements of the for_loop are read in its scope (see __index_access)
+                    step = self.__constant_expression(bounds["iteration_step_size"]) if "iteration_step_size" in bounds else None
+                    self.loops = enclosingLoops + (Loop(index_name, self.__constant_expression(bounds["start_bound"]), step,
+                                                        self.__constant_expression(bounds["termination_bound"]), node.line),)
 
                 elif node.children[i].data == "statement":
                     if node.children[i].children[0].data == "single_assignment":
-                        for k in range(start_bound,termination_bound+1):
-                            index_val = [index_name, str(k)]
-                            
-                            expr = self.__expression(node.children[i].children[0].children[2], True, index_val)
-                            self.__single_assignment(node.children[i].children[0].children[0], expr, function, True, index_val)
+                        for bindings in iterations:
+                            self.bindings = bindings
+                            assignment = node.children[i].children[0]
+                            expr = self.expressions.share(trampoline(self.__expression(assignment.children[2])), assignment.children[0].line)
+                            self.__single_assignment(assignment.children[0], expr, function)
                     elif node.children[i].children[0].data == "for_loop":
-                        self.__for_loop(node.children[i].children[0], function)
+                        # a nested for_loop is unrolled in each iteration, its bounds may depend on the index
+                        for bindings in iterations:
+                            self.bindings = bindings
+                            self.__for_loop(node.children[i].children[0], function)
+        self.loops = enclosingLoops
+        self.bindings = enclosingBindings
+
 
 
+    @staticmethod
+    def reset(blockDimensions=None):
+        # the read data is stored in the class, so it is cleared before a new alg file is transformed
+        ReadTree.vars = {}
+        ReadTree.protectedVars = {}
+        ReadTree.functions = {}
+        ReadTree.blockDimensions = blockDimensions or {}
+        ReadTree.queries = set()
+        ReadTree.errors = []
+        clearSymbols()
 
     @staticmethod
     def variables():
@@ -938,3 +1144,11 @@ class ReadTree(Transformer):
     @staticmethod
     def getFunctions():
         return ReadTree.functions
+
+    @staticmethod
+    def sizeQueries():
+        return ReadTree.queries
+
+    @staticmethod
+    def readErrors():
+        return ReadTree.errors
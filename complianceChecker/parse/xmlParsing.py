@@ -18,6 +18,7 @@
 
 from lxml import etree as ET
 from parse.larkTransformer import VarTypeCausality
+from data.Symbols import symbol, elementSymbol
 
 def retrieveVariables(modelVariablesData, variablesElement, elementType="", retrieveArrays=True):
 
@@ -54,7 +55,7 @@ def retrieveVariables(modelVariablesData, variablesElement, elementType="", retr
                     dimensionSize = allDimensions[0].get('size')
                     if retrieveArrays == True:
                         for index in range(int(dimensionSize)):
-                            varName = var.get('name') + "[" + str(index + 1) + "]"
+                            varName = elementSymbol(var.get('name'), (index + 1,))
                             modelVariablesData[varName] = varTypeCaus
                     elif itemCausality == "" or itemCausality in varsCausalities:
                         dimensions.append(dimensionSize)
@@ -65,7 +66,7 @@ def retrieveVariables(modelVariablesData, variablesElement, elementType="", retr
                     if retrieveArrays == True:
                         for index1 in range(int(dimensionSize_1)):
                             for index2 in range(int(dimensionSize_2)):
-                                varName = var.get('name') + "[" + str(index1 + 1) + "," + str(index2 + 1) + "]"
+                                varName = elementSymbol(var.get('name'), (index1 + 1, index2 + 1))
                                 modelVariablesData[varName] = varTypeCaus
                     elif itemCausality == "" or itemCausality in varsCausalities:
                         dimensions.append(dimensionSize_1)
@@ -78,7 +79,7 @@ def retrieveVariables(modelVariablesData, variablesElement, elementType="", retr
                         for index1 in range(int(dimensionSize_1)):
                             for index2 in range(int(dimensionSize_2)):
                                 for index3 in range(int(dimensionSize_3)):
-                                    varName = var.get('name') + "[" + str(index1 + 1) + "," + str(index2 + 1) + "," + str(index3 + 1) + "]"
+                                    varName = elementSymbol(var.get('name'), (index1 + 1, index2 + 1, index3 + 1))
                                     modelVariablesData[varName] = varTypeCaus
                     elif itemCausality == "" or itemCausality in varsCausalities:
                         dimensions.append(dimensionSize_1)
@@ -86,6 +87,6 @@ def retrieveVariables(modelVariablesData, variablesElement, elementType="", retr
                         dimensions.append(dimensionSize_3)
 
         if retrieveArrays == True:
-            modelVariablesData[var.get('name')] = varTypeCaus
+            modelVariablesData[symbol(var.get('name'))] = varTypeCaus
         elif itemCausality == "" or itemCausality in varsCausalities:
-            modelVariablesData[var.get('name')] = [varTypeCaus, dimensions]
\ No newline at end of file
+            modelVariablesData[symbol(var.get('name'))] = [varTypeCaus, dimensions]
\ No newline at end of file
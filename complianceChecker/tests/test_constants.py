@@ -0,0 +1,112 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+
+import unittest
+
+from data.AlgorithmCodeData import BinaryOperation, FunctionCall
+from data.Constants import ConstantEvaluator, applyOperation, applyFunction, MAX_POWER_BITS
+
+
+def constant(value):
+    return ['constant', 'Integer', value, 0]
+
+
+class ApplyOperationTest(unittest.TestCase):
+
+    def test_division(self):
+        self.assertEqual(applyOperation('/', 6, 3), 2)
+        self.assertEqual(applyOperation('/', -6, 3), -2)
+        # only exact divisions are constant integers
+        self.assertIsNone(applyOperation('/', 7, 2))
+        self.assertIsNone(applyOperation('/', 1, 0))
+
+    def test_power(self):
+        self.assertEqual(applyOperation('^', 3, 4), 81)
+        self.assertEqual(applyOperation('^', 2, MAX_POWER_BITS), 2 ** MAX_POWER_BITS)
+        self.assertIsNone(applyOperation('^', 2, MAX_POWER_BITS + 1))
+        self.assertIsNone(applyOperation('^', 2, -1))
+        # the power is not evaluated above the bound, it would take hours
+        self.assertIsNone(applyOperation('^', 7, 1000000000))
+        self.assertEqual(applyOperation('^', -1, 10 ** 12 + 1), -1)
+        self.assertEqual(applyOperation('^', 0, 10 ** 12), 0)
+
+    def test_other_operations(self):
+        self.assertEqual(applyOperation('-', 2, 5), -3)
+        self.assertIsNone(applyOperation('<', 2, 5))
+
+
+class ApplyFunctionTest(unittest.TestCase):
+
+    def test_div(self):
+        # the quotient is truncated towards zero
+        self.assertEqual(applyFunction('div', [7, 2]), 3)
+        self.assertEqual(applyFunction('div', [-7, 2]), -3)
+        self.assertEqual(applyFunction('div', [7, -2]), -3)
+        self.assertEqual(applyFunction('div', [-7, -2]), 3)
+        self.assertIsNone(applyFunction('div', [7, 0]))
+
+    def test_mod(self):
+        # the result has the sign of the divisor
+        self.assertEqual(applyFunction('mod', [7, 3]), 1)
+        self.assertEqual(applyFunction('mod', [-7, 3]), 2)
+        self.assertEqual(applyFunction('mod', [7, -3]), -2)
+        self.assertIsNone(applyFunction('mod', [7, 0]))
+
+    def test_other_functions(self):
+        self.assertEqual(applyFunction('sign', [-4]), -1)
+        self.assertEqual(applyFunction('max', [2, 5]), 5)
+        self.assertIsNone(applyFunction('sin', [1]))
+
+
+class ConstantEvaluatorTest(unittest.TestCase):
+
+    def setUp(self):
+        dimensions = {'x': (4,), 'm': (3, 'n')}
+        self.evaluator = ConstantEvaluator(dimensions.get)
+
+    def test_size_query(self):
+        # size(self.x, 1) - 1
+        size = ['dimension_query', 'x', constant(1), 0]
+        expression = ['binary_operation', BinaryOperation(size, '-', constant(1), 0), 0]
+        self.assertEqual(self.evaluator.evaluate(expression), 3)
+        # a dimension which is not constant and an undeclared array
+        self.assertIsNone(self.evaluator.evaluate(['dimension_query', 'm', constant(2), 0]))
+        self.assertIsNone(self.evaluator.evaluate(['dimension_query', 'z', constant(1), 0]))
+
+    def test_bindings(self):
+        # div(i, 2) + 1 in the iterations of a for_loop
+        call = ['function_call', FunctionCall('div', [['reference', 'i', 0], constant(2)], 0), 0]
+        expression = ['binary_operation', BinaryOperation(call, '+', constant(1), 0), 0]
+        self.assertEqual(self.evaluator.evaluate(expression, {'i': 5}), 3)
+        self.assertEqual(self.evaluator.evaluate(expression, {'i': -5}), -1)
+        # a reference which is not the index of an enclosing for_loop is not constant
+        self.assertIsNone(self.evaluator.evaluate(expression))
+
+    def test_power(self):
+        expression = ['binary_operation', BinaryOperation(constant(7), '^', ['reference', 'i', 0], 0), 0]
+        self.assertEqual(self.evaluator.evaluate(expression, {'i': 2}), 49)
+        self.assertIsNone(self.evaluator.evaluate(expression, {'i': 1000000000}))
+
+    def test_negation(self):
+        expression = ['unary_operation', 'reference', 'i', '-', 0]
+        self.assertEqual(self.evaluator.evaluate(expression, {'i': 2}), -2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+
+import os
+import tempfile
+import unittest
+
+from parse.algParsing import parse_alg_file
+from data.SymbolTable import SymbolTable, PUBLIC_SCOPE, PROTECTED_SCOPE, LOCAL_SCOPE
+from validate.interval_analysis import IntervalAnalysis
+
+RANGES_BLOCK = """block R
+  input Real u (min=-1.5, max=2.5);
+  input Integer k (min=1, max=4);
+  output Integer n (min=0, max=10);
+  output Real y (max=-1.0);
+protected
+  Real x[10] (min=0.0);
+  Integer m[3,4];
+public
+  method DoStep
+  protected
+    Integer j (min=2, max=5);
+  algorithm
+    self.n := 11;
+    self.n := 5;
+    self.y := 3.0;
+    self.y := self.u + 10.0;
+    self.y := self.u - 10.0;
+    self.n := self.k * 3;
+    self.n := self.k + 20;
+    self.x[2] := -2.0;
+    for i in 1:10 loop
+      self.x[i] := self.u;
+    end for;
+    for i in 1:10 loop
+      self.x[i+1] := 0.0;
+    end for;
+    for i in 1:2:10 loop
+      self.x[i+1] := 0.0;
+    end for;
+    self.x[j] := 1.0;
+    self.x[j * 3] := 1.0;
+    self.m[2,5] := 1;
+    self.m[1] := 1;
+  end DoStep;
+end R;
+"""
+
+
+class IntervalAnalysisTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'R.alg')
+            with open(path, 'w') as f:
+                f.write(RANGES_BLOCK)
+            result = parse_alg_file(path)
+        cls.function = result.functions['DoStep']
+        blockSymbols = SymbolTable(result.variables, None, PUBLIC_SCOPE).newScope(result.protectedVariables, PROTECTED_SCOPE)
+        cls.symbols = blockSymbols.newScope(cls.function.getLocalVariables(), LOCAL_SCOPE)
+
+    def setUp(self):
+        self.ranges = IntervalAnalysis(self.symbols)
+
+    def assignmentProblems(self, line):
+        return [problem.strip() for statement in self.function.getStatements() if statement.line == line
+                for problem in self.ranges.checkAssignment(statement)]
+
+    def indexProblems(self, line):
+        return [problem.strip() for access in self.function.getIndexAccesses() if access.line == line
+                for problem in self.ranges.checkIndexes(access)]
+
+    def test_constant_out_of_range(self):
+        self.assertEqual(self.assignmentProblems(14), ['The value 11 assigned to the n variable (line 14) is out of its range [0, 10]'])
+        self.assertEqual(self.assignmentProblems(15), [])
+        # a Real value keeps its type
+        self.assertEqual(self.assignmentProblems(16), ['The value 3.0 assigned to the y variable (line 16) is out of its range [-inf, -1.0]'])
+        self.assertEqual(self.assignmentProblems(21), ['The value -2.0 assigned to an element of the x array (line 21) is out of its range [0.0, inf]'])
+
+    def test_expression_out_of_range(self):
+        self.assertEqual(self.assignmentProblems(17), ['The values of the expression assigned to the y variable (line 17) lie in [8.5, 12.5], out of its range [-inf, -1.0]'])
+        # [-11.5, -7.5] meets the range
+        self.assertEqual(self.assignmentProblems(18), [])
+        # [3, 12] meets [0, 10], only definite violations are reported
+        self.assertEqual(self.assignmentProblems(19), [])
+        self.assertEqual(self.assignmentProblems(20), ['The values of the expression assigned to the n variable (line 20) lie in [21, 24], out of its range [0, 10]'])
+
+    def test_unrolled_assignment(self):
+        # u lies in [-1.5, 2.5], it meets the range of x
+        self.assertEqual(self.assignmentProblems(23), [])
+
+    def test_loop_indexes(self):
+        self.assertEqual(self.indexProblems(23), [])
+        self.assertEqual(self.indexProblems(26), ['The index 1 of the reference to the x array (line 26) lies in [2, 11], out of the dimension 1:10'])
+        # the index takes the values 1, 3, 5, 7 and 9
+        self.assertEqual(self.indexProblems(29), [])
+
+    def test_variable_indexes(self):
+        self.assertEqual(self.indexProblems(31), [])
+        self.assertEqual(self.indexProblems(32), ['The index 1 of the reference to the x array (line 32) lies in [6, 15], out of the dimension 1:10'])
+
+    def test_index_count(self):
+        self.assertEqual(self.indexProblems(33), ['The index 2 of the reference to the m array (line 33) is 5, out of the dimension 1:4'])
+        self.assertEqual(self.indexProblems(34), ['The reference to the m array (line 34) has 1 indexes, the array has 2 dimensions'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from parse.algParsing import parse_alg_file
+from data.SymbolTable import SymbolTable, PUBLIC_SCOPE, PROTECTED_SCOPE
+from validate.parallel_validation import validate_functions
+
+EMPTY_FUNCTION_BLOCK = """block T
+  input Real u;
+  output Real y;
+protected
+  Real p;
+public
+  method Empty
+  algorithm
+  end Empty;
+  method DoStep
+  algorithm
+    self.y := self.u + self.zz;
+  end DoStep;
+end T;
+"""
+
+LOOP_BLOCK = """block R
+  input Real u;
+  output Real y;
+protected
+  Real x[4] (min=0.0);
+public
+  method Startup
+  algorithm
+  end Startup;
+  method DoStep
+  algorithm
+    for i in 1:size(self.x, 1) loop
+      self.x[i] := -2.0;
+    end for;
+    self.y := self.u + self.q;
+  end DoStep;
+end R;
+"""
+
+
+class ParallelValidationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def validate(self, text, jobs, groupSize=2000, maxProblems=None):
+        path = os.path.join(self.directory.name, 'T.alg')
+        with open(path, 'w') as f:
+            f.write(text)
+        result = parse_alg_file(path)
+        self.assertEqual(result.errors, [])
+        blockSymbols = SymbolTable(result.variables, None, PUBLIC_SCOPE).newScope(result.protectedVariables, PROTECTED_SCOPE)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return validate_functions(result.functions, blockSymbols, jobs, groupSize, maxProblems=maxProblems)
+
+    def assertSameResults(self, text, maxProblems=None):
+        serial = self.validate(text, 1, maxProblems=maxProblems)
+        for jobs, groupSize in [(2, 2000), (2, 1), (3, 2)]:
+            self.assertEqual(self.validate(text, jobs, groupSize, maxProblems), serial)
+        return serial
+
+    def test_empty_function(self):
+        problems, perFunction = self.assertSameResults(EMPTY_FUNCTION_BLOCK)
+        self.assertEqual(list(perFunction.keys()), ['Empty', 'DoStep'])
+        self.assertEqual(perFunction['Empty'], [])
+        self.assertEqual(len(problems), 1)
+        self.assertIn('zz', problems[0])
+
+    def test_unrolled_loop(self):
+        problems, perFunction = self.assertSameResults(LOOP_BLOCK)
+        # the range error of the loop statement is reported once, not once per element
+        self.assertEqual(len(problems), 2)
+        self.assertIn('-2.0 assigned to an element of the x array (line 13)', problems[0])
+
+    def test_max_problems(self):
+        problems, perFunction = self.assertSameResults(EMPTY_FUNCTION_BLOCK, maxProblems=1)
+        self.assertEqual(len(problems), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
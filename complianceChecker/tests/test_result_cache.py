@@ -0,0 +1,106 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+
+import itertools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from data.ResultCache import ResultCache, CACHE_TABLES, packObject
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'results.sqlite')
+        # each store is one second later than the previous one, so the least recently used entry is known
+        self.clock = mock.patch('time.time', side_effect=itertools.count(1000.0))
+        self.clock.start()
+
+    def tearDown(self):
+        self.clock.stop()
+        self.directory.cleanup()
+
+    def usage(self, cache):
+        connection = cache.connect()
+        recorded = connection.execute('SELECT size FROM usage').fetchone()[0]
+        total = sum(connection.execute('SELECT IFNULL(SUM(size), 0) FROM %s' % table).fetchone()[0] for table in CACHE_TABLES)
+        return recorded, total
+
+    def test_usage_accounting(self):
+        cache = ResultCache(self.path)
+        cache.put('archive', 'report' * 10, 0)
+        cache.putSection('section', {'findings': ['a', 'b']})
+        cache.putObject('object', list(range(100)))
+        recorded, total = self.usage(cache)
+        self.assertEqual(recorded, total)
+        self.assertEqual(total, 60 + len('{"findings": ["a", "b"]}') + len(packObject(list(range(100)))))
+        # a replaced entry is not counted twice
+        cache.put('archive', 'report', 1)
+        cache.putSection('section', [])
+        recorded, total = self.usage(cache)
+        self.assertEqual(recorded, total)
+        self.assertEqual(total, 6 + 2 + len(packObject(list(range(100)))))
+        cache.close()
+
+    def test_usage_of_existing_database(self):
+        # the usage is summed up once when a database is opened by a version without the usage table
+        cache = ResultCache(self.path)
+        cache.putSection('section', 'x' * 100)
+        connection = cache.connect()
+        for table in CACHE_TABLES:
+            connection.execute('DROP TRIGGER %s_insert' % table)
+            connection.execute('DROP TRIGGER %s_delete' % table)
+        connection.execute('DROP TABLE usage')
+        cache.close()
+        cache = ResultCache(self.path)
+        self.assertEqual(self.usage(cache), (102, 102))
+        cache.close()
+
+    def test_eviction(self):
+        cache = ResultCache(self.path, sizeLimit=1000)
+        for i in range(5):
+            cache.putSection('section%d' % i, 'x' * 298)
+        connection = cache.connect()
+        keys = [row[0] for row in connection.execute('SELECT key FROM sections ORDER BY used')]
+        # the least recently used entries are evicted until the total size is below the limit
+        self.assertEqual(keys, ['section2', 'section3', 'section4'])
+        self.assertEqual(self.usage(cache), (900, 900))
+        # a read entry is recently used
+        self.assertEqual(cache.getSection('section2'), 'x' * 298)
+        cache.put('archive', 'r' * 300, 0)
+        keys = [row[0] for table in ['results', 'sections'] for row in connection.execute('SELECT key FROM %s' % table)]
+        self.assertEqual(sorted(keys), ['archive', 'section2', 'section4'])
+        self.assertEqual(self.usage(cache), (900, 900))
+        cache.close()
+
+    def test_eviction_in_batches(self):
+        cache = ResultCache(self.path, sizeLimit=100)
+        cache.putPacked([('object%d' % i, b'x' * 10) for i in range(200)])
+        self.assertEqual(self.usage(cache), (100, 100))
+        cache.putPacked([('large', b'x' * 1000)])
+        # an entry larger than the limit evicts all entries, itself included
+        self.assertEqual(self.usage(cache), (0, 0))
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
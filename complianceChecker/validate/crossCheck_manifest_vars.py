@@ -19,38 +19,79 @@
 from lxml import etree as ET
 from parse.larkTransformer import VarTypeCausality
 
-def addEntry(key1, key2, msg, dic):
-    if key1 in dic.keys():
-        if key2 in dic[key1].keys():
-            pass
-        else:
-            dic[key1].updat({key2 : msg})
-    else:
-        dic[key1] = {key2 : msg}
-
-
-def crossCheck_manifest_vars(rep1_vars, rep2_vars, rep1, rep2, messages):
-    #messages = {}
-    for key in rep1_vars.keys():
-        if key in rep2_vars.keys():
-            varTypeCausDimen_rep1 = rep1_vars[key]
-            varTypeCausDimen_rep2 = rep2_vars[key]
-            if varTypeCausDimen_rep1[0].type != varTypeCausDimen_rep2[0].type:
-                s = "The type of the " + key + " variable from the "  + rep1 + " manifest does not match the type of the same variable in the " + rep2 + " manifest"
-                addEntry(key, "type", s, messages)
-
-                #essages[key] = s
-            if len(varTypeCausDimen_rep1[1]) != len(varTypeCausDimen_rep2[1]):
-                s = "The Dimensions of the " + key + " variable from the "  + rep1 + " manifest does not match the dimensions of the same variable in the " + rep2 + " manifest"
-                addEntry(key, "dimension", s, messages)
-            elif len(varTypeCausDimen_rep1[1]) > 0:
-                if len(varTypeCausDimen_rep2[1]) > 0:
-                    for i in range(len(varTypeCausDimen_rep1[1])):
-                        if varTypeCausDimen_rep1[1][i] != varTypeCausDimen_rep2[1][i]:
-                            s = "The Dimensions of the " + key + " variable from the "  + rep1 + " manifest does not match the dimensions of the same variable in the " + rep2 + " manifest"
-                            addEntry(key, "dimension", s, messages)
-                            break
-        else:
-            s = "The " + key + " variable from the "  + rep1 + " manifest is not listed in the " + rep2 + " manifest"
-            addEntry(key, "missing", s, messages)
-    
\ No newline at end of file
+# The kinds of representations whose manifests list the same interface variables
+CROSS_CHECKED_KINDS = ['AlgorithmCode', 'EquationCode', 'ProductionCode']
+
+
+def variableSignature(varTypeCausDimen):
+
+    """
+    Returns the canonical signature of a manifest variable, variables with equal signatures are consistent
+
+    :param varTypeCausDimen: The variable as read by retrieveVariables ([VarTypeCausality, dimensions])
+    :return: the tuple (type, causality, dimensions)
+
+    """
+
+    return (varTypeCausDimen[0].type, varTypeCausDimen[0].causality, tuple([str(size).strip() for size in varTypeCausDimen[1]]))
+
+
+def joinRepresentations(reps):
+    if len(reps) == 1:
+        return reps[0] + " manifest"
+    return ", ".join(reps[:-1]) + " and " + reps[-1] + " manifests"
+
+
+def crossCheck_manifest_vars(representationsVars):
+
+    """
+    Checks if the variables listed in the manifests of several representations are consistent. The variables of all
+    representations are grouped by name and by signature (see variableSignature) in one pass, so the cost is linear in
+    the total number of variables. A variable is reported if it is not listed in all manifests, or if the
+    representations disagree on its type, its dimensions or its causality (causalities are only compared between
+    manifests which specify them).
+
+    :param representationsVars: List of (representation, dictionary of manifest variables) in the order of the
+        __content.xml file
+    :return: a dictionary of the faced errors (variable name -> kind of error -> message)
+
+    """
+
+    # variable name -> signature -> representations which list the variable with this signature
+    signatures = {}
+    for rep, variables in representationsVars:
+        for key in variables.keys():
+            signatures.setdefault(key, {}).setdefault(variableSignature(variables[key]), []).append(rep)
+
+    allReps = [rep for rep, variables in representationsVars]
+    messages = {}
+    for key in signatures.keys():
+        groups = signatures[key]
+        listedIn = [rep for reps in groups.values() for rep in reps]
+        reference = listedIn[0]
+        if len(groups) > 1:
+            signatureOf = {}
+            for signature in groups.keys():
+                for rep in groups[signature]:
+                    signatureOf[rep] = signature
+            referenceSignature = signatureOf[reference]
+            for aspect, index in [("type", 0), ("dimension", 2)]:
+                disagreeing = [rep for rep in listedIn if signatureOf[rep][index] != referenceSignature[index]]
+                if disagreeing:
+                    if aspect == "type":
+                        s = "The type of the " + key + " variable from the " + reference + " manifest does not match the type of the same variable in the " + joinRepresentations(disagreeing)
+                    else:
+                        s = "The Dimensions of the " + key + " variable from the " + reference + " manifest does not match the dimensions of the same variable in the " + joinRepresentations(disagreeing)
+                    messages.setdefault(key, {})[aspect] = s
+            withCausality = [rep for rep in listedIn if signatureOf[rep][1]]
+            if withCausality:
+                disagreeing = [rep for rep in withCausality if signatureOf[rep][1] != signatureOf[withCausality[0]][1]]
+                if disagreeing:
+                    s = "The causality of the " + key + " variable from the " + withCausality[0] + " manifest does not match the causality of the same variable in the " + joinRepresentations(disagreeing)
+                    messages.setdefault(key, {})["causality"] = s
+        if len(listedIn) < len(allReps):
+            missingIn = [rep for rep in allReps if rep not in listedIn]
+            s = "The " + key + " variable from the " + reference + " manifest is not listed in the " + joinRepresentations(missingIn)
+            messages.setdefault(key, {})["missing"] = s
+
+    return messages
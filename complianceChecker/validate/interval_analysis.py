@@ -0,0 +1,411 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import math
+from collections import namedtuple
+from data.AlgorithmCodeData import BinaryOperation, FunctionCall, If_Expression, REF_TO_CONSTANT, REF_TO_BINARY_OPERATION
+from data.Trampoline import trampoline
+
+"""
+The Interval tuple is the result of the interval analysis for one expression node: all values the expression can take
+lie in [low, high], an unknown bound is -inf or inf. Boolean expressions and expressions whose values cannot be bounded
+(for example a call of a function which is not built-in) are UNBOUNDED.
+
+"""
+
+Interval = namedtuple('Interval', ['low', 'high'])
+
+UNBOUNDED = Interval(-math.inf, math.inf)
+
+
+def hull(intervals):
+
+    """
+    Returns the smallest interval which contains all given intervals
+
+    :param intervals: The list of intervals
+    :return: the Interval, UNBOUNDED for an empty list
+
+    """
+
+    if len(intervals) == 0:
+        return UNBOUNDED
+    return Interval(min(x.low for x in intervals), max(x.high for x in intervals))
+
+
+def negate(interval):
+    return Interval(-interval.high, -interval.low)
+
+
+def _product(x, y):
+    # an unknown bound multiplied by zero is zero
+    if x == 0 or y == 0:
+        return 0
+    return x * y
+
+
+def multiply(interval1, interval2):
+    products = [_product(x, y) for x in interval1 for y in interval2]
+    return Interval(min(products), max(products))
+
+
+def _floor(x):
+    return x if math.isinf(x) else math.floor(x)
+
+
+def _ceil(x):
+    return x if math.isinf(x) else math.ceil(x)
+
+
+def combine(operation, interval1, interval2):
+
+    """
+    Returns the interval of a binary operation from the intervals of its operands
+
+    :param operation: The operator of the binary operation
+    :param interval1: The Interval of the first operand
+    :param interval2: The Interval of the second operand
+    :return: the Interval of the binary operation
+
+    """
+
+    if operation == "+":
+        return Interval(interval1.low + interval2.low, interval1.high + interval2.high)
+    if operation == "-":
+        return Interval(interval1.low - interval2.high, interval1.high - interval2.low)
+    if operation == "*":
+        return multiply(interval1, interval2)
+    if operation == "/":
+        if interval2.low <= 0 <= interval2.high:
+            return UNBOUNDED
+        quotient = multiply(interval1, Interval(1 / interval2.high, 1 / interval2.low))
+        # the division of integers is truncated
+        return Interval(_floor(quotient.low), _ceil(quotient.high))
+    # powers, relational and logical operations
+    return UNBOUNDED
+
+
+def builtinFunction(name, arguments):
+
+    """
+    Returns the interval of a call of a built-in function from the intervals of its arguments
+
+    :param name: The name of the function
+    :param arguments: The list of the Intervals of the arguments
+    :return: the Interval of the function call, UNBOUNDED for other functions
+
+    """
+
+    if name == 'abs' and len(arguments) == 1:
+        x = arguments[0]
+        if x.low >= 0:
+            return x
+        if x.high <= 0:
+            return negate(x)
+        return Interval(0, max(-x.low, x.high))
+    if name == 'sign' and len(arguments) == 1:
+        x = arguments[0]
+        return Interval(-1 if x.low < 0 else (0 if x.low == 0 else 1), 1 if x.high > 0 else (0 if x.high == 0 else -1))
+    if name in ['min', 'max'] and len(arguments) == 1:
+        # min/max of the elements of an array
+        return arguments[0]
+    if name == 'min' and len(arguments) == 2:
+        return Interval(min(arguments[0].low, arguments[1].low), min(arguments[0].high, arguments[1].high))
+    if name == 'max' and len(arguments) == 2:
+        return Interval(max(arguments[0].low, arguments[1].low), max(arguments[0].high, arguments[1].high))
+    if name in ['integer', 'floor'] and len(arguments) == 1:
+        return Interval(_floor(arguments[0].low), _floor(arguments[0].high))
+    if name == 'ceil' and len(arguments) == 1:
+        return Interval(_ceil(arguments[0].low), _ceil(arguments[0].high))
+    if name == 'real' and len(arguments) == 1:
+        return arguments[0]
+    return UNBOUNDED
+
+
+def loopRange(start, step, stop):
+
+    """
+    Returns the interval of the index of a for_loop from the intervals of its bounds
+
+    :param start: The Interval of the start_bound
+    :param step: The Interval of the iteration_step_size
+    :param stop: The Interval of the termination_bound
+    :return: the Interval of the index, None if the statements of the for_loop are never executed
+
+    """
+
+    if step.low > 0:
+        if start.low > stop.high:
+            return None
+        high = stop.high
+        if step.low == step.high and start.low == start.high and not math.isinf(high):
+            # the last value of the index
+            high = start.low + math.floor((high - start.low) / step.low) * step.low
+        return Interval(start.low, high)
+    if step.high < 0:
+        if start.high < stop.low:
+            return None
+        low = stop.low
+        if step.low == step.high and start.low == start.high and not math.isinf(low):
+            low = start.high - math.floor((start.high - low) / -step.low) * -step.low
+        return Interval(low, start.high)
+    return hull([start, stop])
+
+
+def disjoint(interval1, interval2):
+    return interval1.high < interval2.low or interval2.high < interval1.low
+
+
+def assignedName(reference):
+    # an element of an array is named by its array: the statements of an unrolled for_loop assign different elements
+    # with the same problem, which is reported once (see orderProblems)
+    name = reference.split('[')[0]
+    if name != reference:
+        return 'an element of the %s array' % name
+    return 'the %s variable' % name
+
+
+class IntervalAnalysis:
+
+    """
+    Class IntervalAnalysis gives an interval of values (see the Interval tuple) to the expression nodes of a function.
+    The interval of a reference is given by the min and max values of its declaration (see the range_specification
+    rule) or, for the index of an enclosing for_loop, by the bounds of the loop. The intervals are propagated bottom-up
+    like the types of the TypeInference class: each node is evaluated once per scope of for_loops, so the analysis takes
+    time proportional to the size of the code, not to the sizes of the arrays or the numbers of iterations.
+
+    Only definite violations are reported: a value is out of range if the interval of the assigned expression does not
+    meet the declared range, and an index is out of bounds if the interval of its expression, bounded on both sides,
+    leaves the declared dimension.
+
+    """
+
+    def __init__(self, varList):
+        # the symbol table of the function (see the SymbolTable class) or a dictionary of all declared variables
+        self.varList = varList
+        # (id of the node, id of the intervals of the loop indexes) -> (node, indexes, Interval); the node and the
+        # intervals are kept to keep their ids unique
+        self.results = {}
+        # id of the tuple of enclosing loops -> (loops, dictionary of the intervals of the indexes or None)
+        self.scopes = {}
+
+    def lookup(self, name):
+        return self.varList.get(name)
+
+    def sizeInterval(self, name, dimension):
+        # the size of a dimension of an array, the sizes are not negative
+        varTypeCausality = self.lookup(name)
+        dimensions = tuple(varTypeCausality.dimensions) if varTypeCausality is not None else ()
+        if dimension.low == dimension.high and 1 <= dimension.low <= len(dimensions) and isinstance(dimensions[int(dimension.low) - 1], int):
+            size = dimensions[int(dimension.low) - 1]
+            return Interval(size, size)
+        return Interval(0, math.inf)
+
+    def referenceInterval(self, name, indexes=None):
+        if indexes is not None and name in indexes:
+            return indexes[name]
+        varTypeCausality = self.lookup(name)
+        if varTypeCausality is None or varTypeCausality.type not in ["Integer", "Real"]:
+            return UNBOUNDED
+        return Interval(-math.inf if varTypeCausality.min is None else varTypeCausality.min,
+                        math.inf if varTypeCausality.max is None else varTypeCausality.max)
+
+    def interval(self, expression, indexes=None):
+
+        """
+        Returns the interval of an expression node
+
+        :param expression: an expression (list) or a BinaryOperation, FunctionCall or If_Expression object
+        :param indexes: The dictionary of the intervals of the indexes of the enclosing for_loops (see loopIndexes)
+        :return: the Interval of the node
+
+        """
+
+        return trampoline(self.__result(expression, indexes))
+
+    def loopIndexes(self, loops):
+
+        """
+        Returns the intervals of the indexes of nested for_loops, the bounds of a loop may use the indexes of the
+        enclosing loops. The result is computed once per tuple of loops (see the IndexAccess tuple)
+
+        :param loops: The tuple of the enclosing for_loops (of type Loop), from the outermost to the innermost
+        :return: a dictionary (index name -> Interval), None if the innermost statements are never executed
+
+        """
+
+        scope = self.scopes.get(id(loops))
+        if scope is None:
+            indexes = {}
+            for loop in loops:
+                start = self.interval(loop.start, indexes)
+                step = Interval(1, 1) if loop.step is None else self.interval(loop.step, indexes)
+                stop = self.interval(loop.stop, indexes)
+                index = loopRange(start, step, stop)
+                if index is None:
+                    indexes = None
+                    break
+                indexes = dict(indexes)
+                indexes[loop.index] = index
+            scope = (loops, indexes)
+            self.scopes[id(loops)] = scope
+        return scope[1]
+
+    def checkAssignment(self, statement):
+
+        """
+        Checks that the values assigned by a statement can meet the range of the assigned variable
+
+        :param statement: The statement (of type Statement)
+        :return: a list of faced errors
+
+        """
+
+        problems = []
+        varTypeCausality = self.lookup(statement.reference)
+        if varTypeCausality is None or (varTypeCausality.min is None and varTypeCausality.max is None):
+            return problems
+        declared = self.referenceInterval(statement.reference)
+
+        if statement.kind == REF_TO_CONSTANT:
+            value = statement.expression[2]
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and not declared.low <= value <= declared.high:
+                problems.append('  The value %s assigned to %s (line %s) is out of its range [%s, %s] ' % (value, assignedName(statement.reference), statement.line, declared.low, declared.high))
+            return problems
+
+        if statement.kind == REF_TO_BINARY_OPERATION:
+            assigned = self.interval(statement.expression)
+        else:
+            if isinstance(statement.expression, str):
+                assigned = self.referenceInterval(statement.expression)
+            else:
+                assigned = self.interval(statement.expression)
+            # the statement does not keep the sign of a negated reference, function call or if_expression
+            assigned = hull([assigned, negate(assigned)])
+
+        if disjoint(assigned, declared):
+            problems.append('  The values of the expression assigned to %s (line %s) lie in [%s, %s], out of its range [%s, %s] ' % (assignedName(statement.reference), statement.line, assigned.low, assigned.high, declared.low, declared.high))
+        return problems
+
+    def checkIndexes(self, access):
+
+        """
+        Checks the number of indexes of a reference to an array element and that the indexes stay within the
+        dimensions of the array
+
+        :param access: The index access (of type IndexAccess)
+        :return: a list of faced errors
+
+        """
+
+        problems = []
+        varTypeCausality = self.lookup(access.name)
+        if varTypeCausality is None or len(varTypeCausality.dimensions) == 0:
+            # undeclared variables are reported by checkExprVarsDelaration
+            return problems
+        dimensions = varTypeCausality.dimensions
+        if len(access.indexes) != len(dimensions):
+            problems.append('  The reference to the %s array (line %s) has %s indexes, the array has %s dimensions ' % (access.name, access.line, len(access.indexes), len(dimensions)))
+            return problems
+
+        indexes = self.loopIndexes(access.loops)
+        if indexes is None:
+            return problems
+        for i in range(len(dimensions)):
+            index = self.interval(access.indexes[i], indexes)
+            if math.isinf(index.low) or math.isinf(index.high) or not isinstance(dimensions[i], int):
+                continue
+            if index.low < 1 or index.high > dimensions[i]:
+                if index.low == index.high:
+                    values = 'is %s' % index.low
+                else:
+                    values = 'lies in [%s, %s]' % (index.low, index.high)
+                problems.append('  The index %s of the reference to the %s array (line %s) %s, out of the dimension 1:%s ' % (i + 1, access.name, access.line, values, dimensions[i]))
+        return problems
+
+    def __result(self, node, indexes):
+        if node is None:
+            return UNBOUNDED
+        key = (id(node), id(indexes))
+        result = self.results.get(key)
+        if result is None:
+            result = (node, indexes, (yield from self.__intervalNode(node, indexes)))
+            self.results[key] = result
+        return result[2]
+
+    def __intervalNode(self, node, indexes):
+        if isinstance(node, BinaryOperation):
+            interval1 = yield self.__result(node.expression1, indexes)
+            interval2 = yield self.__result(node.expression2, indexes)
+            return combine(node.operation, interval1, interval2)
+        if isinstance(node, FunctionCall):
+            arguments = []
+            for argument in node.expression:
+                arguments.append((yield self.__result(argument, indexes)))
+            return builtinFunction(node.name, arguments)
+        if isinstance(node, If_Expression):
+            branches = list(node.getExpressions().values())
+            branches += [elseIf.expression for elseIf in node.getElseIfs().values()]
+            branches += list(node.getElseExpr().values())
+            intervals = []
+            for branch in branches:
+                intervals.append((yield self.__result(branch, indexes)))
+            return hull(intervals)
+        if node[0] == 'constant':
+            if isinstance(node[2], (int, float)) and not isinstance(node[2], bool) and node[1] != "Boolean":
+                return Interval(node[2], node[2])
+            return UNBOUNDED
+        if node[0] == 'reference':
+            return self.referenceInterval(node[1], indexes)
+        if node[0] == 'dimension_query':
+            dimension = yield self.__result(node[2], indexes)
+            return self.sizeInterval(node[1], dimension)
+        if node[0] in ['binary_operation', 'function_call', 'if_expression']:
+            return (yield self.__result(node[1], indexes))
+        if node[0] == 'unary_operation':
+            return (yield from self.__unaryOperation(node, indexes))
+        if node[0] == 'multi_dimension_constructor':
+            return (yield from self.__multiDimensionConstructor(node[1], indexes))
+        return UNBOUNDED
+
+    def __unaryOperation(self, expression, indexes):
+        kind = expression[1]
+        operand = expression[2]
+        if expression[3] != "-":
+            return UNBOUNDED
+
+        if kind == 'reference':
+            interval = self.referenceInterval(operand, indexes)
+        elif kind == 'multi_dimension_constructor':
+            interval = yield from self.__multiDimensionConstructor(operand, indexes)
+        elif kind in ['constant', 'binary_operation', 'function_call', 'if_expression', 'dimension_query'] and not isinstance(operand, str):
+            interval = yield self.__result(operand, indexes)
+        else:
+            # a parenthesized constant only keeps its type
+            interval = UNBOUNDED
+        return negate(interval)
+
+    def __multiDimensionConstructor(self, elements, indexes):
+        intervals = []
+        for element in elements:
+            if len(element) > 0 and isinstance(element[0], str):
+                intervals.append((yield self.__result(element, indexes)))
+            else:
+                # a nested multi_dimension_constructor is stored as the plain list of its elements
+                intervals.append((yield from self.__multiDimensionConstructor(element, indexes)))
+        return hull(intervals)
@@ -0,0 +1,180 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+from concurrent.futures import ProcessPoolExecutor
+from data.SymbolTable import LOCAL_SCOPE
+from validate.type_inference import TypeInference
+from validate.interval_analysis import IntervalAnalysis
+from validate.validate_functions import validate_function, validate_statements, getStatements, orderProblems, \
+                    printFunctionSummary, STATEMENT_KINDS
+
+# Number of statements of the same kind which are validated by one task
+STATEMENT_GROUP_SIZE = 2000
+
+# The read-only data of a worker process, it is set once per worker by _initWorker
+_functions = {}
+_blockSymbols = None
+_statements = {}
+_types = {}
+_ranges = {}
+
+
+def _initWorker(functions, blockSymbols):
+
+    """
+    Stores the functions and the symbol table of the block in the worker process. It is run once per worker: on
+    platforms which fork the workers, the data is inherited from the parent process without pickling; otherwise it is
+    pickled once per worker and not once per task.
+
+    """
+
+    global _functions, _blockSymbols
+    _functions = functions
+    _blockSymbols = blockSymbols
+    _statements.clear()
+    _types.clear()
+    _ranges.clear()
+
+
+def _validateGroup(task):
+    functionName, kind, start, stop = task
+    function = _functions[functionName]
+
+    if (functionName, kind) not in _statements:
+        _statements[(functionName, kind)] = getStatements(function, kind)
+    if functionName not in _types:
+        _types[functionName] = TypeInference(_blockSymbols.newScope(function.getLocalVariables(), LOCAL_SCOPE))
+    types = _types[functionName]
+    if functionName not in _ranges:
+        _ranges[functionName] = IntervalAnalysis(types.varList)
+
+    return validate_statements(kind, _statements[(functionName, kind)][start:stop], types.varList, types, start, _ranges[functionName])
+
+
+def statementGroups(functionName, function, groupSize=STATEMENT_GROUP_SIZE):
+
+    """
+    Splits the statements of a function into independent groups of statements of the same kind
+
+    :param functionName: The name of the function
+    :param function: The function object (of type Function)
+    :param groupSize: The maximum number of statements in a group
+    :return: the list of tasks (function name, kind, index of the first statement, index after the last statement)
+
+    """
+
+    tasks = []
+    for kind in range(len(STATEMENT_KINDS)):
+        count = len(getStatements(function, kind))
+        for start in range(0, count, groupSize):
+            tasks.append((functionName, kind, start, min(start + groupSize, count)))
+    return tasks
+
+
+def reportedFunctions(funcList, counts, maxProblems=None):
+
+    """
+    Lists the functions whose errors are reported: the validated functions in the order of the block, up to the first
+    function which is not validated yet or up to the function whose errors reach maxProblems
+
+    :param funcList: Dictionary of all functions of the block (function name -> Function)
+    :param counts: Dictionary of the number of faced errors of the validated functions (function name -> count)
+    :param maxProblems: The maximum number of reported errors, None for no limit
+    :return: (list of the names of the functions, True if the errors of these functions reach maxProblems)
+
+    """
+
+    names = []
+    count = 0
+    for x in funcList.keys():
+        if x not in counts or (maxProblems is not None and count >= maxProblems):
+            break
+        names.append(x)
+        count += counts[x]
+    return names, maxProblems is not None and count >= maxProblems
+
+
+def validate_functions(funcList, blockSymbols, jobs=1, groupSize=STATEMENT_GROUP_SIZE, known=None, maxProblems=None):
+
+    """
+    Validates all functions of a block (see validate_function). With more than one job the functions, and the groups
+    of statements inside large functions, are validated in parallel worker processes. The faced errors are merged per
+    function and ordered by line, so the result is the same as when validating the functions one after another.
+
+    :param funcList: Dictionary of all functions of the block (function name -> Function)
+    :param blockSymbols: The symbol table of the block (public and protected variables)
+    :param jobs: The number of worker processes
+    :param groupSize: The maximum number of statements validated by one task
+    :param known: Dictionary of the faced errors of functions which are known to be unchanged (function name -> list
+        of errors), these functions are not validated again, their errors are printed in the same way
+    :param maxProblems: The functions after the one whose errors reach this number are not validated (the pending
+        tasks of the workers are cancelled), None to validate all functions
+    :return: a list of faced errors when running the validations, and a dictionary of the faced errors per function
+        (the functions which were not validated are missing)
+
+    """
+
+    if known is None:
+        known = {}
+    perFunction = {}
+    if jobs <= 1:
+        count = 0
+        for x in funcList.keys():
+            if maxProblems is not None and count >= maxProblems:
+                break
+            if x in known:
+                print("The %s function\n" % funcList[x].name)
+                printFunctionSummary(known[x])
+                perFunction[x] = known[x]
+            else:
+                perFunction[x] = validate_function(funcList[x], blockSymbols.newScope(funcList[x].getLocalVariables(), LOCAL_SCOPE))
+            count += len(perFunction[x])
+        return [problem for x in perFunction.keys() for problem in perFunction[x]], perFunction
+
+    tasks = []
+    for x in funcList.keys():
+        if x not in known:
+            tasks += statementGroups(x, funcList[x], groupSize)
+
+    located = {}
+    counts = {x: len(known[x]) for x in known}
+    # a function without statements nor index accesses has no task, it is validated without errors
+    planned = {task[0] for task in tasks}
+    for x in funcList.keys():
+        if x not in known and x not in planned:
+            counts[x] = 0
+    if len(tasks) > 0:
+        lastTask = {task[0]: i for i, task in enumerate(tasks)}
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_initWorker, initargs=(funcList, blockSymbols))
+        try:
+            for i, (task, result) in enumerate(zip(tasks, executor.map(_validateGroup, tasks))):
+                located.setdefault(task[0], []).extend(result)
+                if lastTask[task[0]] == i:
+                    counts[task[0]] = len(orderProblems(located[task[0]]))
+                    if maxProblems is not None and reportedFunctions(funcList, counts, maxProblems)[1]:
+                        break
+        finally:
+            # the tasks which did not start yet are cancelled once the limit is reached
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    for x in reportedFunctions(funcList, counts, maxProblems)[0]:
+        print("The %s function\n" % funcList[x].name)
+        perFunction[x] = known[x] if x in known else orderProblems(located.get(x, []))
+        printFunctionSummary(perFunction[x])
+
+    return [problem for x in perFunction.keys() for problem in perFunction[x]], perFunction
@@ -0,0 +1,351 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+from collections import namedtuple
+from data.AlgorithmCodeData import BinaryOperation, FunctionCall, If_Expression, absoluteLine
+from data.Trampoline import trampoline
+
+"""
+The ExpressionType tuple is the result of the type inference for one expression node:
+
+- type: the primitive type of the expression (Boolean, Integer or Real), None if it cannot be inferred (for example an
+  undeclared variable or a call of a function with unknown signature)
+- shape: the dimensions of the expression, () for scalars and None if it cannot be inferred
+
+"""
+
+ExpressionType = namedtuple('ExpressionType', ['type', 'shape'])
+
+UNKNOWN_TYPE = ExpressionType(None, None)
+
+# The problems of a node are kept as (message, arguments) and formatted when they are read (see getProblems). The nodes
+# store their lines relative to the line of their statement (see the ExpressionPool class), so a node shared by
+# statements on different lines is typed once: the lines are kept as NodeLine arguments and the line of the statement
+# is added when the problems are read; a node which does not store a line (e.g. a multi_dimension_constructor) gets the
+# line of the statement
+NodeLine = namedtuple('NodeLine', ['offset'])
+STATEMENT_LINE = NodeLine(None)
+
+NUMERIC_TYPES = ["Integer", "Real"]
+ARITHMETIC_OPERATORS = ["+", "-", "*", "/", "^"]
+RELATIONAL_OPERATORS = ["<=", ">=", "<>", "<", ">", "=="]
+LOGICAL_OPERATORS = ["and", "or"]
+
+# Signatures of the built-in functions: (allowed numbers of arguments, allowed argument types, return type),
+# the return type None means that the function returns the type of its first argument
+BUILTIN_FUNCTIONS = {
+    'abs': ([1], NUMERIC_TYPES, None),
+    'sign': ([1], NUMERIC_TYPES, None),
+    'min': ([1, 2], NUMERIC_TYPES, None),
+    'max': ([1, 2], NUMERIC_TYPES, None),
+    'sqrt': ([1], ["Real"], "Real"),
+    'sin': ([1], ["Real"], "Real"),
+    'cos': ([1], ["Real"], "Real"),
+    'tan': ([1], ["Real"], "Real"),
+    'asin': ([1], ["Real"], "Real"),
+    'acos': ([1], ["Real"], "Real"),
+    'atan': ([1], ["Real"], "Real"),
+    'atan2': ([2], ["Real"], "Real"),
+    'sinh': ([1], ["Real"], "Real"),
+    'cosh': ([1], ["Real"], "Real"),
+    'tanh': ([1], ["Real"], "Real"),
+    'exp': ([1], ["Real"], "Real"),
+    'log': ([1], ["Real"], "Real"),
+    'log10': ([1], ["Real"], "Real"),
+    'floor': ([1], ["Real"], "Real"),
+    'ceil': ([1], ["Real"], "Real"),
+    'real': ([1], NUMERIC_TYPES, "Real"),
+    'integer': ([1], NUMERIC_TYPES, "Integer"),
+}
+
+
+class TypeInference:
+
+    """
+    Class TypeInference gives a type (see the ExpressionType tuple) to every expression node of a function. The types
+    are inferred bottom-up: the type of a node is computed from the types of its operands, so each node is visited only
+    once. The result of each node is memoized together with the problems found in the sub-tree of the node, so the
+    validate_refTo* checks can ask for the type of any (sub-)expression without evaluating it again. The expressions
+    of a function are shared (see the ExpressionPool class), so a node repeated in many statements is typed once.
+
+    The expressions are not walked recursively, a sum of thousands of terms is as deep as it is long: the inference of
+    a node is a generator which yields the inference of a child node (see the trampoline function), the helpers of one
+    node are delegated to with "yield from".
+
+    Expression nodes are the expressions created by the ReadTree class (['constant', ...], ['reference', ...], ...) and
+    the BinaryOperation, FunctionCall and If_Expression objects they contain.
+
+    """
+
+    def __init__(self, varList):
+        # the symbol table of the function (see the SymbolTable class) or a dictionary of all declared variables
+        self.varList = varList
+        # id of the node -> (node, ExpressionType, problems of the sub-tree as (message, arguments)); the node is kept
+        # to keep its id unique
+        self.results = {}
+
+    def lookup(self, name):
+        return self.varList.get(name)
+
+    def referenceType(self, name):
+        varTypeCausality = self.lookup(name)
+        if varTypeCausality is None:
+            # undeclared variables are reported by checkExprVarsDelaration
+            return UNKNOWN_TYPE
+        return ExpressionType(varTypeCausality.type, tuple(varTypeCausality.dimensions))
+
+    def infer(self, expression):
+
+        """
+        Returns the inferred type of an expression node
+
+        :param expression: an expression (list) or a BinaryOperation, FunctionCall or If_Expression object
+        :return: the ExpressionType of the node
+
+        """
+
+        return trampoline(self.__result(expression))[1]
+
+    def getProblems(self, expression, line=None):
+
+        """
+        Returns the problems found while inferring the types of the expression and all its sub-expressions
+
+        :param expression: an expression (list) or a BinaryOperation, FunctionCall or If_Expression object
+        :param line: The line of the statement which contains the expression, the lines of the nodes are relative to it
+        :return: a list of faced errors
+
+        """
+
+        return [message % tuple(absoluteLine(x.offset, line) if isinstance(x, NodeLine) else x for x in arguments)
+                for message, arguments in trampoline(self.__result(expression))[2]]
+
+    def __result(self, node):
+        if node is None:
+            return (None, UNKNOWN_TYPE, ())
+        result = self.results.get(id(node))
+        if result is None:
+            exprType, problems = yield from self.__inferNode(node)
+            result = (node, exprType, tuple(problems))
+            self.results[id(node)] = result
+        return result
+
+    def __child(self, node, problems):
+        result = yield from self.__result(node)
+        problems += result[2]
+        return result[1]
+
+    def __inferNode(self, node):
+        problems = []
+        if isinstance(node, BinaryOperation):
+            exprType = yield from self.__binaryOperation(node, problems)
+        elif isinstance(node, FunctionCall):
+            exprType = yield from self.__functionCall(node, problems)
+        elif isinstance(node, If_Expression):
+            exprType = yield from self.__ifExpression(node, problems)
+        elif node[0] == 'constant':
+            exprType = ExpressionType(node[1], ())
+        elif node[0] == 'reference':
+            exprType = self.referenceType(node[1])
+        elif node[0] == 'dimension_query':
+            yield self.__child(node[2], problems)
+            exprType = ExpressionType("Integer", ())
+        elif node[0] in ['binary_operation', 'function_call', 'if_expression']:
+            exprType = yield self.__child(node[1], problems)
+        elif node[0] == 'unary_operation':
+            exprType = yield from self.__unaryOperation(node, problems)
+        elif node[0] == 'multi_dimension_constructor':
+            exprType = yield from self.__multiDimensionConstructor(node[1], problems)
+        else:
+            exprType = UNKNOWN_TYPE
+        return exprType, problems
+
+    def __binaryOperation(self, binaryOperation, problems):
+        type1 = yield self.__child(binaryOperation.expression1, problems)
+        type2 = yield self.__child(binaryOperation.expression2, problems)
+        operation = binaryOperation.operation
+
+        if operation in LOGICAL_OPERATORS:
+            if (type1.type not in [None, "Boolean"]) or (type2.type not in [None, "Boolean"]):
+                problems.append(('The binary operation in line %s cannot be evaluated as a logical expression ', (NodeLine(binaryOperation.line),)))
+            return ExpressionType("Boolean", ())
+
+        if type1.type is None or type2.type is None:
+            if operation in RELATIONAL_OPERATORS:
+                return ExpressionType("Boolean", ())
+            return UNKNOWN_TYPE
+
+        if type1.type == "Boolean" or type2.type == "Boolean":
+            problems.append(('The binary operation in line %s cannot be applied to operands of type Boolean ', (NodeLine(binaryOperation.line),)))
+            if operation in RELATIONAL_OPERATORS:
+                return ExpressionType("Boolean", ())
+            return UNKNOWN_TYPE
+
+        if type1.type != type2.type:
+            problems.append(('Expression in line %s contains variables type mismatch: The operands of the %s operation are of type %s and %s, types must match ', (NodeLine(binaryOperation.line), operation, type1.type, type2.type)))
+            resultType = None
+        else:
+            resultType = type1.type
+
+        if operation in RELATIONAL_OPERATORS:
+            return ExpressionType("Boolean", ())
+
+        shape = self.__combineShapes(type1.shape, type2.shape, operation, NodeLine(binaryOperation.line), problems)
+        return ExpressionType(resultType, shape)
+
+    def __combineShapes(self, shape1, shape2, operation, line, problems):
+        if shape1 is None or shape2 is None:
+            return None
+        if len(shape1) == 0:
+            return shape2
+        if len(shape2) == 0:
+            return shape1
+        if operation in ["+", "-"] and shape1 != shape2:
+            problems.append(('Expression in line %s contains operands of different dimensions %s and %s ', (line, list(shape1), list(shape2))))
+            return None
+        return shape1
+
+    def __unaryOperation(self, expression, problems):
+        kind = expression[1]
+        operand = expression[2]
+        operation = expression[3]
+        line = NodeLine(expression[4])
+
+        if kind == 'reference':
+            operandType = self.referenceType(operand)
+        elif kind == 'constant' and isinstance(operand, str):
+            # a parenthesized constant only keeps its type
+            operandType = ExpressionType(operand, ())
+        else:
+            operandType = yield self.__child(operand, problems)
+
+        if operation == "not":
+            if operandType.type not in [None, "Boolean"]:
+                problems.append(('The unary operation in line %s cannot be evaluated as a logical expression ', (line,)))
+            return ExpressionType("Boolean", ())
+
+        if operandType.type == "Boolean":
+            problems.append(('The unary operation in line %s cannot be applied to an operand of type Boolean ', (line,)))
+            return UNKNOWN_TYPE
+        return operandType
+
+    def __functionCall(self, functionCall, problems):
+        argumentTypes = []
+        for argument in functionCall.expression:
+            argumentTypes.append((yield self.__child(argument, problems)))
+
+        if functionCall.name not in BUILTIN_FUNCTIONS:
+            # the signatures of functions which are not built-in are not known
+            return UNKNOWN_TYPE
+
+        numbersOfArguments, allowedTypes, returnType = BUILTIN_FUNCTIONS[functionCall.name]
+        if len(argumentTypes) not in numbersOfArguments:
+            problems.append(('The function call %s in line %s has %s arguments, the expected number of arguments is %s ', (functionCall.name, NodeLine(functionCall.line), len(argumentTypes), ' or '.join(str(x) for x in numbersOfArguments))))
+            return ExpressionType(returnType, ()) if returnType is not None else UNKNOWN_TYPE
+
+        for argumentType in argumentTypes:
+            if argumentType.type is not None and argumentType.type not in allowedTypes:
+                problems.append(('The function call %s in line %s has an argument of type %s, the expected argument type is %s ', (functionCall.name, NodeLine(functionCall.line), argumentType.type, ' or '.join(allowedTypes))))
+
+        if returnType is not None:
+            return ExpressionType(returnType, ())
+
+        knownTypes = [x.type for x in argumentTypes if x.type is not None]
+        if len(knownTypes) == 0 or any(x != knownTypes[0] for x in knownTypes):
+            return UNKNOWN_TYPE
+        if functionCall.name in ['min', 'max'] and len(argumentTypes) == 1:
+            # min/max of the elements of an array
+            return ExpressionType(knownTypes[0], ())
+        return ExpressionType(knownTypes[0], argumentTypes[0].shape)
+
+    def __ifExpression(self, ifExpression, problems):
+        conditions = list(ifExpression.getConditions().values())
+        branches = list(ifExpression.getExpressions().values())
+        for elseIf in ifExpression.getElseIfs().values():
+            conditions.append(elseIf.condition)
+            branches.append(elseIf.expression)
+        branches += list(ifExpression.getElseExpr().values())
+
+        for condition in conditions:
+            conditionType = yield self.__child(condition, problems)
+            if conditionType.type not in [None, "Boolean"]:
+                problems.append(('The condition of the if_expression in line %s is not of type Boolean ', (self.nodeLine(condition),)))
+
+        branchTypes = []
+        for branch in branches:
+            branchTypes.append((yield self.__child(branch, problems)))
+
+        return self.__commonType(branchTypes, problems, 'The branches of the if_expression in line %s are of different types %s and %s ', self.nodeLine(conditions[0]) if conditions else STATEMENT_LINE)
+
+    def __multiDimensionConstructor(self, elements, problems):
+        elementTypes = []
+        for element in elements:
+            if len(element) > 0 and isinstance(element[0], str):
+                elementTypes.append((yield self.__child(element, problems)))
+            else:
+                # a nested multi_dimension_constructor is stored as the plain list of its elements
+                elementTypes.append((yield self.__multiDimensionConstructor(element, problems)))
+
+        elementType = self.__commonType(elementTypes, problems, 'The elements of the multi_dimension_constructor in line %s are of different types %s and %s ', STATEMENT_LINE)
+        if elementType.shape is None:
+            return ExpressionType(elementType.type, None)
+        return ExpressionType(elementType.type, (len(elements),) + elementType.shape)
+
+    def __commonType(self, exprTypes, problems, message, line):
+        commonType = None
+        commonShape = ()
+        for exprType in exprTypes:
+            if exprType.type is None:
+                return UNKNOWN_TYPE
+            if commonType is None:
+                commonType = exprType.type
+                commonShape = exprType.shape
+            elif commonType != exprType.type:
+                problems.append((message, (line, commonType, exprType.type)))
+                return UNKNOWN_TYPE
+        if commonType is None:
+            return UNKNOWN_TYPE
+        return ExpressionType(commonType, commonShape)
+
+    @staticmethod
+    def nodeLine(expression):
+        # the line of a node for the messages, see getProblems
+        return NodeLine(TypeInference.line(expression))
+
+    @staticmethod
+    def line(expression):
+
+        """
+        Returns the line number of an expression node, relative to the line of its statement (see absoluteLine)
+
+        :param expression: an expression (list) or a BinaryOperation, FunctionCall or If_Expression object
+        :return: the relative line number or None if the node does not store one
+
+        """
+
+        if isinstance(expression, (BinaryOperation, FunctionCall)):
+            return expression.line
+        if expression is None or isinstance(expression, If_Expression) or len(expression) < 3:
+            return None
+        if expression[0] == 'constant':
+            return expression[3]
+        if expression[0] == 'unary_operation':
+            return expression[4]
+        if expression[0] == 'dimension_query':
+            return expression[3]
+        return expression[2]
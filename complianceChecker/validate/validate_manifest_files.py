@@ -0,0 +1,62 @@
+# Copyright (c) 2021, ESI ITI GmbH, Modelica Association and contributors
+#
+# Licensed under the 3-Clause BSD license (the "License");
+# you may not use this software except in compliance with
+# the "License".
+#
+# This software is not fully developed or tested.
+#
+# THE SOFTWARE IS PROVIDED "as is", WITHOUT ANY WARRANTY
+# of any kind, either express or implied, and the use is
+# completely at your own risk.
+#
+# The software can be redistributed and/or modified under
+# the terms of the "License".
+#
+# See the "License" for the specific language governing
+# permissions and limitations under the "License".
+
+import os
+from data.Representations import Representation
+
+
+def validateListedFile(rep, listedFile):
+
+    """
+    Checks if a file listed in the manifest of a representation exists and if its checksum matches the checksum
+    listed in the manifest
+
+    :param rep: The representation (of type Representation)
+    :param listedFile: The listed file (of type ManifestFile)
+    :return: the faced error, None if the file is valid
+
+    """
+
+    if not listedFile.name:
+        return "A file listed in the %s manifest file (line %s) has no name" % (rep.getManifest(), listedFile.line)
+
+    efmuDir = os.path.realpath(os.path.join(Representation.workingDir, Representation.efmuContent))
+    path = os.path.realpath(os.path.join(efmuDir, rep.getName(), listedFile.name))
+    if os.path.commonpath([efmuDir, path]) != efmuDir:
+        return "The %s file listed in the %s manifest file (line %s) is not located in the eFMU" % (listedFile.name, rep.getManifest(), listedFile.line)
+    if not os.path.isfile(path):
+        return "The %s file listed in the %s manifest file (line %s) does not exist in the %s folder" % (listedFile.name, rep.getManifest(), listedFile.line, rep.getName())
+    if listedFile.checksum:
+        if not Representation.checksums.matches(path, listedFile.checksum):
+            return "The checksum [%s] of the %s file listed in the %s manifest file (line %s) does not match the calculated checksum" % (listedFile.checksum, listedFile.name, rep.getManifest(), listedFile.line)
+    return None
+
+
+def validateListedFiles(rep, executor):
+
+    """
+    Schedules the checks of all files listed in the manifest of a representation (see validateListedFile), the files
+    are hashed by the threads of the executor
+
+    :param rep: The representation (of type Representation)
+    :param executor: The thread pool which runs the checks
+    :return: a list of futures, one per listed file, each future results in the faced error or None
+
+    """
+
+    return [executor.submit(validateListedFile, rep, listedFile) for listedFile in rep.getListedFiles()]
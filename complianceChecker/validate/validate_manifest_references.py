@@ -20,7 +20,8 @@ import os
 from data.Representations import Representation
 from lxml import etree as ET
 
-from data.Representations import sha_hash, LineNumberingParser
+from data.Representations import LineNumberingParser
+from data.Checksums import algorithmOf
 
 def validateReferences (representations):
     messages = {}
@@ -41,8 +42,8 @@ def validateReferences (representations):
                         if id == ref.getManifestRefId():
                             refIdFound = 1
                             if ref.getChecksum() != "":
-                                calculatedChecksum = sha_hash(os.path.join(Representation.workingDir, Representation.efmuContent, rep1.getName(), rep1.getManifest()))
-                                if ref.getChecksum() != calculatedChecksum:
+                                calculatedChecksum = Representation.checksums.digest(os.path.join(Representation.workingDir, Representation.efmuContent, rep1.getName(), rep1.getManifest()), algorithmOf(ref.getChecksum()))
+                                if ref.getChecksum().strip().lower() != calculatedChecksum:
                                     s = "The checksum [" + ref.getChecksum() + "] of the ManifestReference [" + ref.getId() + "] in the [" + rep.getName() + "] container does not match the calculated checksum [" + calculatedChecksum + "]."
                                     if rep.getName() in messages.keys():
                                         messages[rep.getName()].update({ref.getId() : s})